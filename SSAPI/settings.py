@@ -38,6 +38,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'activos',
     'core',
     'reportes',
@@ -46,6 +47,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.PerformanceMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -136,6 +138,44 @@ handler400 = 'core.views.custom_400_view'
 STATIC_URL = 'static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
+# Reportes generados en segundo plano (ver reportes.tareas)
+REPORTES_DIR = BASE_DIR / 'reportes_generados'
+# La cola la procesa el comando `python manage.py procesar_reportes --continuo`,
+# que se ejecuta aparte del servidor web. En True, cada proceso web la atiende
+# además con un hilo propio (útil en desarrollo, sin ese comando)
+REPORTES_WORKER_LOCAL = False
+# Caché de reportes PDF en disco (ver reportes.cache)
+REPORTES_CACHE_DIR = REPORTES_DIR / 'cache'
+REPORTES_CACHE_MAX_MB = 200
+# ReportLab se importa al generar el primer PDF. En True se importa al iniciar
+# la aplicación, útil si el servidor la carga en el proceso maestro antes de
+# crear los workers (gunicorn --preload), que comparten así esa memoria
+REPORTES_PRECARGAR_PDF = False
+
+
+# Caché de Django: versiones de los catálogos de los formularios y del
+# inventario, y el tablero de inicio (ver core.catalogos y core.tablero).
+# Con varios procesos debe ser compartida, p. ej.
+# django.core.cache.backends.redis.RedisCache
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+# Antigüedad máxima (segundos) de las opciones en memoria de cada proceso
+CATALOGOS_TTL = 300
+# Vida máxima (segundos) del tablero de inicio en caché; None: solo por versión
+TABLERO_TTL = 60
+
+# Métricas por solicitud (ver core.middleware.PerformanceMiddleware): se
+# registran en el logger `core.rendimiento` las solicitudes más lentas que el
+# umbral (None para desactivar) y se guardan las últimas muestras por vista.
+# El header Server-Timing solo se envía en DEBUG, a usuarios staff o si se
+# activa RENDIMIENTO_SERVER_TIMING
+RENDIMIENTO_UMBRAL_LENTO_MS = 500
+RENDIMIENTO_MUESTRAS = 500
+RENDIMIENTO_SERVER_TIMING = False
+
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
@@ -0,0 +1,69 @@
+"""
+Acciones masivas sobre activos.
+
+Aplican un nuevo usuario asignado, ubicación o estado a un conjunto de
+activos con un único UPDATE dentro de una transacción, ajustando los
+contadores de inventario y registrando el historial en lote.
+"""
+from collections import Counter
+
+from django.utils import timezone
+
+from . import contadores
+from .historial import CAMPOS_HISTORIAL, lote_historial
+from .models import Activo
+
+# Acción -> campo del activo que modifica
+ACCIONES = {
+    'reasignar': 'usuario_asignado_id',
+    'reubicar': 'ubicacion_id',
+    'estado': 'estado',
+}
+
+ACTUALIZADO = 'actualizado'
+SIN_CAMBIOS = 'sin_cambios'
+NO_ENCONTRADO = 'no_encontrado'
+
+
+def actualizar_activos(ids, campo, valor, usuario=None):
+    """
+    Asigna `valor` a `campo` en los activos `ids`.
+
+    Retorna un diccionario {id: resultado} donde el resultado es
+    'actualizado', 'sin_cambios' o 'no_encontrado'.
+    """
+    ids = {int(pk) for pk in ids}
+    resultados = dict.fromkeys(ids, NO_ENCONTRADO)
+
+    with lote_historial(usuario) as lote:
+        filas = list(
+            Activo.objects.select_for_update()
+            .filter(pk__in=ids)
+            .values('pk', campo)
+        )
+        cambiar = []
+        for fila in filas:
+            if fila[campo] == valor:
+                resultados[fila['pk']] = SIN_CAMBIOS
+            else:
+                resultados[fila['pk']] = ACTUALIZADO
+                cambiar.append(fila)
+
+        if cambiar:
+            Activo.objects.filter(pk__in=[fila['pk'] for fila in cambiar]).update(
+                **{campo: valor, 'fecha_actualizacion': timezone.now()}
+            )
+
+            deltas = Counter()
+            for dimension, campo_dimension in contadores.DIMENSIONES.items():
+                if campo_dimension == campo:
+                    for fila in cambiar:
+                        deltas[(dimension, fila[campo])] -= 1
+                        deltas[(dimension, valor)] += 1
+            contadores.aplicar_deltas(deltas)
+
+            nombre, tipo, _modelo = CAMPOS_HISTORIAL[campo]
+            for fila in cambiar:
+                lote.agregar(fila['pk'], tipo, nombre, fila[campo], valor)
+
+    return resultados
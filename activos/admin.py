@@ -1,5 +1,7 @@
 from django.contrib import admin
+from core.catalogos import CatalogoListFilter
 from .models import Categoria, SubCategoria, Ubicacion, Activo
+from .historial import lote_historial
 
 
 @admin.register(Categoria)
@@ -14,6 +16,10 @@ class SubCategoriaAdmin(admin.ModelAdmin):
     list_filter = ['categoria']
     search_fields = ['nombre', 'categoria__nombre']
     autocomplete_fields = ['categoria']
+    
+    def get_queryset(self, request):
+        """__str__ usa la categoría: se trae en la misma consulta (lista y autocompletado)"""
+        return super().get_queryset(request).select_related('categoria')
 
 
 @admin.register(Ubicacion)
@@ -29,7 +35,8 @@ class ActivoAdmin(admin.ModelAdmin):
         'subcategoria', 'ubicacion', 'estado', 
         'usuario_asignado', 'fecha_creacion'
     ]
-    list_filter = ['estado', 'subcategoria__categoria', 'subcategoria', 'ubicacion']
+    list_select_related = ['subcategoria__categoria', 'ubicacion', 'usuario_asignado']
+    list_filter = ['estado', 'subcategoria__categoria', ('subcategoria', CatalogoListFilter), 'ubicacion']
     search_fields = [
         'codigo_inventario', 'marca', 'modelo', 
         'numero_serial', 'observaciones'
@@ -52,3 +59,8 @@ class ActivoAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
     )
+    
+    def save_model(self, request, obj, form, change):
+        """Registrar el historial con el usuario del admin"""
+        with lote_historial(request.user):
+            super().save_model(request, obj, form, change)
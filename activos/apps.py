@@ -4,3 +4,15 @@ from django.apps import AppConfig
 class ActivosConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'activos'
+    
+    def ready(self):
+        from . import signals  # noqa: F401
+        from core import catalogos
+        from .models import Categoria, SubCategoria, Ubicacion
+        
+        # Tablas de referencia de los <select> (ver core.catalogos)
+        catalogos.registrar(Categoria)
+        catalogos.registrar(
+            SubCategoria, SubCategoria.objects.select_related('categoria'), depende_de=[Categoria]
+        )
+        catalogos.registrar(Ubicacion)
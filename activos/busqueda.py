@@ -0,0 +1,107 @@
+"""
+Búsqueda de activos sobre un documento de búsqueda precalculado.
+
+Cada activo guarda en `documento_busqueda` la concatenación normalizada
+(minúsculas, sin acentos) de código, marca, modelo y serial. En PostgreSQL
+la columna tiene un índice GIN con `gin_trgm_ops`, de modo que los filtros
+`LIKE '%termino%'` usan el índice y la relevancia se calcula con
+`word_similarity`. En otros motores (SQLite en pruebas) se usa el mismo
+filtro con una relevancia aproximada basada en el código de inventario.
+"""
+import unicodedata
+from decimal import Decimal, InvalidOperation
+
+from django.db import connection
+from django.db.models import Case, F, FloatField, Value, When
+
+# Campos del activo que forman el documento de búsqueda
+CAMPOS_BUSQUEDA = ['codigo_inventario', 'marca', 'modelo', 'numero_serial']
+
+
+def normalizar_texto(texto):
+    """Convierte el texto a minúsculas, sin acentos y con espacios simples"""
+    if not texto:
+        return ''
+    texto = unicodedata.normalize('NFKD', str(texto))
+    texto = ''.join(c for c in texto if not unicodedata.combining(c))
+    return ' '.join(texto.lower().split())
+
+
+def construir_documento(*valores):
+    """Construye el documento de búsqueda a partir de los valores dados"""
+    return normalizar_texto(' '.join(v for v in valores if v))
+
+
+def buscar_activos(queryset, termino, ordenar=True):
+    """
+    Filtra el queryset de activos por el término de búsqueda.
+
+    Todas las palabras del término deben aparecer en el documento. Si
+    `ordenar` es True los resultados se ordenan por relevancia y luego por
+    el orden por defecto del modelo.
+    """
+    termino = normalizar_texto(termino)
+    if not termino:
+        return queryset
+
+    for palabra in termino.split():
+        queryset = queryset.filter(documento_busqueda__contains=palabra)
+
+    if not ordenar:
+        return queryset
+
+    codigo = termino.upper()
+    bonificacion = Case(
+        When(codigo_inventario=codigo, then=Value(2.0)),
+        When(codigo_inventario__startswith=codigo, then=Value(1.0)),
+        default=Value(0.0),
+        output_field=FloatField(),
+    )
+
+    if connection.vendor == 'postgresql':
+        from django.contrib.postgres.search import TrigramWordSimilarity
+        queryset = queryset.annotate(
+            relevancia=TrigramWordSimilarity(termino, 'documento_busqueda') + bonificacion
+        )
+    else:
+        queryset = queryset.annotate(relevancia=bonificacion)
+
+    orden = [F('relevancia').desc()] + list(queryset.model._meta.ordering)
+    return queryset.order_by(*orden)
+
+
+def filtrar_activos(queryset, params, ordenar=True):
+    """
+    Aplica al queryset los filtros del listado de activos.
+
+    `params` es un QueryDict (p. ej. request.GET) con las claves categoria,
+    subcategoria, ubicacion, estado, usuario_asignado, costo_min y buscar. Lo usan el
+    listado, el reporte PDF y las exportaciones, de modo que todos muestran
+    el mismo conjunto de activos.
+    """
+    categoria_id = params.get('categoria')
+    subcategoria_id = params.get('subcategoria')
+    ubicacion_id = params.get('ubicacion')
+    estado = params.get('estado')
+    usuario_asignado_id = params.get('usuario_asignado')
+    buscar = params.get('buscar')
+    try:
+        costo_min = Decimal(params.get('costo_min') or '')
+    except InvalidOperation:
+        costo_min = None
+
+    if categoria_id:
+        queryset = queryset.filter(subcategoria__categoria_id=categoria_id)
+    if subcategoria_id:
+        queryset = queryset.filter(subcategoria_id=subcategoria_id)
+    if ubicacion_id:
+        queryset = queryset.filter(ubicacion_id=ubicacion_id)
+    if estado:
+        queryset = queryset.filter(estado=estado)
+    if usuario_asignado_id:
+        queryset = queryset.filter(usuario_asignado_id=usuario_asignado_id)
+    if costo_min is not None and costo_min.is_finite():
+        queryset = queryset.filter(costo_mantenimiento_total__gte=costo_min)
+    if buscar:
+        queryset = buscar_activos(queryset, buscar, ordenar=ordenar)
+    return queryset
@@ -0,0 +1,213 @@
+"""
+Contadores de inventario mantenidos de forma incremental.
+
+En lugar de agregar toda la tabla de activos en cada vista, se mantienen:
+
+- `total_activos` en Categoria, SubCategoria y Ubicacion.
+- Una fila de `ContadorEstado` por cada estado de activo.
+
+Los contadores se ajustan con UPDATE ... SET total = total + delta (uno por
+dimensión, con el delta de cada fila en un CASE) desde las señales de Activo
+(ver activos.signals), dentro de la misma transacción que el cambio del
+activo y a partir de la fila bloqueada que se reemplaza (ver Activo.save),
+de modo que dos guardados concurrentes no aplican el mismo delta. Las
+operaciones masivas que no disparan señales deben
+llamar a `aplicar_deltas` con los cambios correspondientes. El comando
+`contadores_inventario` permite verificarlos y reconstruirlos.
+
+Cada cambio en los contadores renueva, al confirmarse la transacción, la
+versión del inventario (`version_inventario`), que usan las cachés de los
+datos derivados de ellos, como el tablero de inicio (ver core.tablero) y los
+reportes PDF (ver reportes.cache). También la renuevan los cambios en los
+catálogos (ver activos.signals).
+"""
+import uuid
+from collections import Counter, defaultdict
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, Count, F, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce
+
+from .models import Activo, Categoria, ContadorEstado, SubCategoria, Ubicacion
+
+# Dimensión del contador -> campo del activo que la determina
+DIMENSIONES = {
+    'subcategoria': 'subcategoria_id',
+    'ubicacion': 'ubicacion_id',
+    'estado': 'estado',
+}
+
+MODELOS = {
+    'categoria': Categoria,
+    'subcategoria': SubCategoria,
+    'ubicacion': Ubicacion,
+}
+
+
+CLAVE_VERSION = 'activos:inventario:version'
+
+
+def version_inventario():
+    """Versión actual del inventario según la caché compartida"""
+    actual = cache.get(CLAVE_VERSION)
+    if actual is None:
+        cache.add(CLAVE_VERSION, uuid.uuid4().hex, None)
+        actual = cache.get(CLAVE_VERSION)
+    return actual
+
+
+def invalidar_inventario():
+    """Renueva la versión del inventario al confirmarse la transacción actual"""
+    transaction.on_commit(lambda: cache.set(CLAVE_VERSION, uuid.uuid4().hex, None))
+
+
+def deltas_activo(valores, signo=1):
+    """Deltas {(dimensión, clave): n} que aporta un activo con `valores`"""
+    return Counter({
+        (dimension, valores[campo]): signo
+        for dimension, campo in DIMENSIONES.items()
+    })
+
+
+def aplicar_deltas(deltas):
+    """
+    Aplica los deltas a los contadores.
+
+    Los deltas por subcategoría se propagan también a su categoría.
+    """
+    deltas = Counter({clave: delta for clave, delta in deltas.items() if delta})
+    if not deltas:
+        return
+    invalidar_inventario()
+    por_subcategoria = {
+        clave: delta for (dimension, clave), delta in deltas.items()
+        if dimension == 'subcategoria'
+    }
+    if por_subcategoria:
+        categorias = dict(
+            SubCategoria.objects.filter(pk__in=por_subcategoria).values_list('pk', 'categoria_id')
+        )
+        for subcategoria_id, delta in por_subcategoria.items():
+            deltas[('categoria', categorias[subcategoria_id])] += delta
+
+    # Un UPDATE por dimensión, con el delta de cada fila en un CASE
+    por_dimension = defaultdict(dict)
+    for (dimension, clave), delta in deltas.items():
+        if delta:
+            por_dimension[dimension][clave] = delta
+
+    for dimension, valores in por_dimension.items():
+        if dimension == 'estado':
+            modelo, campo_clave, campo_total = ContadorEstado, 'estado', 'total'
+        else:
+            modelo, campo_clave, campo_total = MODELOS[dimension], 'pk', 'total_activos'
+        delta = Case(
+            *[When(**{campo_clave: clave}, then=Value(n)) for clave, n in valores.items()],
+            default=Value(0),
+        )
+        actualizados = modelo.objects.filter(**{f'{campo_clave}__in': valores}).update(
+            **{campo_total: F(campo_total) + delta}
+        )
+        if dimension == 'estado' and actualizados < len(valores):
+            existentes = set(
+                ContadorEstado.objects.filter(estado__in=valores).values_list('estado', flat=True)
+            )
+            ContadorEstado.objects.bulk_create([
+                ContadorEstado(estado=clave, total=max(n, 0))
+                for clave, n in valores.items() if clave not in existentes
+            ])
+
+
+def registrar_alta(activo):
+    valores = {campo: getattr(activo, campo) for campo in DIMENSIONES.values()}
+    aplicar_deltas(deltas_activo(valores, 1))
+
+
+def registrar_baja(activo):
+    valores = {campo: getattr(activo, campo) for campo in DIMENSIONES.values()}
+    valores.update(activo.valores_originales or {})
+    aplicar_deltas(deltas_activo(valores, -1))
+
+
+def registrar_cambio(activo, update_fields=None):
+    """Ajusta los contadores según los campos que cambiaron en el activo"""
+    cambios = activo.campos_modificados(update_fields)
+    deltas = Counter()
+    for dimension, campo in DIMENSIONES.items():
+        if campo in cambios:
+            anterior, nuevo = cambios[campo]
+            deltas[(dimension, anterior)] -= 1
+            deltas[(dimension, nuevo)] += 1
+    if deltas:
+        aplicar_deltas(deltas)
+
+
+def mover_subcategoria(subcategoria, categoria_anterior_id):
+    """Traslada los activos de una subcategoría que cambió de categoría"""
+    total = SubCategoria.objects.filter(pk=subcategoria.pk).values_list('total_activos', flat=True).get()
+    if total:
+        Categoria.objects.filter(pk=categoria_anterior_id).update(total_activos=F('total_activos') - total)
+        Categoria.objects.filter(pk=subcategoria.categoria_id).update(total_activos=F('total_activos') + total)
+        invalidar_inventario()
+
+
+def resumen_estados():
+    """Retorna {estado: total} leyendo los contadores"""
+    return dict(ContadorEstado.objects.values_list('estado', 'total'))
+
+
+def _conteos_reales():
+    """Cuenta el inventario real agrupando la tabla de activos"""
+    base = Activo.objects.order_by()
+    return {
+        'categoria': dict(base.values_list('subcategoria__categoria_id').annotate(n=Count('pk'))),
+        'subcategoria': dict(base.values_list('subcategoria_id').annotate(n=Count('pk'))),
+        'ubicacion': dict(base.values_list('ubicacion_id').annotate(n=Count('pk'))),
+        'estado': dict(base.values_list('estado').annotate(n=Count('pk'))),
+    }
+
+
+def verificar():
+    """
+    Compara los contadores con el inventario real.
+
+    Retorna una lista de tuplas (descripción, valor almacenado, valor real)
+    con las diferencias encontradas.
+    """
+    reales = _conteos_reales()
+    diferencias = []
+    for dimension, modelo in MODELOS.items():
+        for pk, nombre, total in modelo.objects.values_list('pk', 'nombre', 'total_activos'):
+            real = reales[dimension].get(pk, 0)
+            if total != real:
+                diferencias.append((f'{modelo._meta.verbose_name} "{nombre}"', total, real))
+    almacenados = resumen_estados()
+    for estado, etiqueta in Activo.EstadoActivo.choices:
+        real = reales['estado'].get(estado, 0)
+        if almacenados.get(estado, 0) != real:
+            diferencias.append((f'Estado "{etiqueta}"', almacenados.get(estado, 0), real))
+    return diferencias
+
+
+@transaction.atomic
+def reconstruir():
+    """Recalcula todos los contadores a partir del inventario"""
+    for modelo, relacion in (
+        (Categoria, 'subcategoria__categoria'),
+        (SubCategoria, 'subcategoria'),
+        (Ubicacion, 'ubicacion'),
+    ):
+        conteo = (
+            Activo.objects.order_by()
+            .filter(**{relacion: OuterRef('pk')})
+            .values(relacion)
+            .annotate(n=Count('pk'))
+            .values('n')
+        )
+        modelo.objects.update(total_activos=Coalesce(Subquery(conteo), 0))
+
+    reales = _conteos_reales()['estado']
+    for estado in Activo.EstadoActivo.values:
+        ContadorEstado.objects.update_or_create(estado=estado, defaults={'total': reales.get(estado, 0)})
+    invalidar_inventario()
@@ -1,4 +1,7 @@
 from django import forms
+from core.autocompletar import AutocompletarSelect, DependienteSelect
+from core.catalogos import CatalogoChoiceField
+from usuarios.models import UsuarioAsignado
 from .models import Categoria, SubCategoria, Ubicacion, Activo
 
 
@@ -20,6 +23,7 @@ class SubCategoriaForm(forms.ModelForm):
     class Meta:
         model = SubCategoria
         fields = ['nombre', 'categoria']
+        field_classes = {'categoria': CatalogoChoiceField}
         widgets = {
             'nombre': forms.TextInput(attrs={
                 'class': 'form-control',
@@ -44,8 +48,23 @@ class UbicacionForm(forms.ModelForm):
         }
 
 
+class SubCategoriaChoiceField(forms.ModelChoiceField):
+    """Subcategoría elegida dentro de una categoría: la etiqueta es solo el nombre"""
+    
+    def label_from_instance(self, obj):
+        return obj.nombre
+
+
 class ActivoForm(forms.ModelForm):
     """Formulario para Activo"""
+    # Solo filtra las subcategorías ofrecidas; no se guarda en el activo
+    categoria = CatalogoChoiceField(
+        queryset=Categoria.objects.all(),
+        required=False,
+        empty_label="Seleccione categoría",
+        widget=forms.Select(attrs={'class': 'form-select'})
+    )
+    
     class Meta:
         model = Activo
         fields = [
@@ -53,8 +72,14 @@ class ActivoForm(forms.ModelForm):
             'codigo_inventario', 'usuario_asignado', 'ubicacion',
             'observaciones', 'estado'
         ]
+        # Opciones desde la caché de catálogos (ver core.catalogos)
+        field_classes = {
+            'subcategoria': SubCategoriaChoiceField,
+            'ubicacion': CatalogoChoiceField,
+        }
         widgets = {
-            'subcategoria': forms.Select(attrs={
+            # Las opciones se cargan según la categoría elegida (ver core.autocompletar)
+            'subcategoria': DependienteSelect('activos:subcategoria-api', 'categoria', attrs={
                 'class': 'form-select',
                 'id': 'id_subcategoria'
             }),
@@ -74,7 +99,8 @@ class ActivoForm(forms.ModelForm):
                 'class': 'form-control',
                 'placeholder': 'Código único de inventario'
             }),
-            'usuario_asignado': forms.Select(attrs={
+            # Las opciones se buscan a medida que se escribe (ver core.autocompletar)
+            'usuario_asignado': AutocompletarSelect('usuarios:usuario-autocompletar', attrs={
                 'class': 'form-select'
             }),
             'ubicacion': forms.Select(attrs={
@@ -89,23 +115,36 @@ class ActivoForm(forms.ModelForm):
                 'class': 'form-select'
             })
         }
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.subcategoria_id:
+            self.initial.setdefault('categoria', self.instance.subcategoria.categoria_id)
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        categoria = cleaned_data.get('categoria')
+        subcategoria = cleaned_data.get('subcategoria')
+        if categoria and subcategoria and subcategoria.categoria_id != categoria.pk:
+            self.add_error('subcategoria', 'La subcategoría no pertenece a la categoría seleccionada.')
+        return cleaned_data
 
 
 class ActivoFilterForm(forms.Form):
     """Formulario para filtrar activos"""
-    categoria = forms.ModelChoiceField(
+    categoria = CatalogoChoiceField(
         queryset=Categoria.objects.all(),
         required=False,
         empty_label="Todas las categorías",
         widget=forms.Select(attrs={'class': 'form-select'})
     )
-    subcategoria = forms.ModelChoiceField(
+    subcategoria = SubCategoriaChoiceField(
         queryset=SubCategoria.objects.all(),
         required=False,
         empty_label="Todas las subcategorías",
-        widget=forms.Select(attrs={'class': 'form-select'})
+        widget=DependienteSelect('activos:subcategoria-api', 'categoria', attrs={'class': 'form-select'})
     )
-    ubicacion = forms.ModelChoiceField(
+    ubicacion = CatalogoChoiceField(
         queryset=Ubicacion.objects.all(),
         required=False,
         empty_label="Todas las ubicaciones",
@@ -123,6 +162,20 @@ class ActivoFilterForm(forms.Form):
             'placeholder': 'Buscar por código, marca o modelo...'
         })
     )
+    costo_min = forms.DecimalField(
+        required=False,
+        min_value=0,
+        widget=forms.NumberInput(attrs={
+            'class': 'form-control',
+            'placeholder': 'Costo mínimo en mantenimientos',
+            'step': '0.01'
+        })
+    )
+    orden = forms.ChoiceField(
+        choices=[('', 'Más recientes'), ('costo', 'Mayor costo de mantenimiento')],
+        required=False,
+        widget=forms.Select(attrs={'class': 'form-select'})
+    )
 
 
 class ReasignarActivoForm(forms.ModelForm):
@@ -131,7 +184,7 @@ class ReasignarActivoForm(forms.ModelForm):
         model = Activo
         fields = ['usuario_asignado']
         widgets = {
-            'usuario_asignado': forms.Select(attrs={
+            'usuario_asignado': AutocompletarSelect('usuarios:usuario-autocompletar', attrs={
                 'class': 'form-select'
             })
         }
@@ -142,6 +195,7 @@ class ReubicarActivoForm(forms.ModelForm):
     class Meta:
         model = Activo
         fields = ['ubicacion']
+        field_classes = {'ubicacion': CatalogoChoiceField}
         widgets = {
             'ubicacion': forms.Select(attrs={
                 'class': 'form-select'
@@ -149,3 +203,51 @@ class ReubicarActivoForm(forms.ModelForm):
         }
 
 
+class AccionMasivaForm(forms.Form):
+    """Formulario para aplicar una acción a varios activos seleccionados"""
+    ACCIONES = [
+        ('reasignar', 'Reasignar a usuario'),
+        ('reubicar', 'Reubicar'),
+        ('estado', 'Cambiar estado'),
+    ]
+    
+    accion = forms.ChoiceField(
+        choices=ACCIONES,
+        widget=forms.Select(attrs={'class': 'form-select form-select-sm'})
+    )
+    usuario_asignado = forms.ModelChoiceField(
+        queryset=UsuarioAsignado.objects.all(),
+        required=False,
+        empty_label="Sin asignar",
+        widget=AutocompletarSelect('usuarios:usuario-autocompletar', attrs={'class': 'form-select form-select-sm'})
+    )
+    ubicacion = CatalogoChoiceField(
+        queryset=Ubicacion.objects.all(),
+        required=False,
+        empty_label="Seleccione ubicación",
+        widget=forms.Select(attrs={'class': 'form-select form-select-sm'})
+    )
+    estado = forms.ChoiceField(
+        choices=[('', 'Seleccione estado')] + list(Activo.EstadoActivo.choices),
+        required=False,
+        widget=forms.Select(attrs={'class': 'form-select form-select-sm'})
+    )
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        accion = cleaned_data.get('accion')
+        if accion == 'reubicar' and not cleaned_data.get('ubicacion'):
+            self.add_error('ubicacion', 'Debe seleccionar la nueva ubicación.')
+        if accion == 'estado' and not cleaned_data.get('estado'):
+            self.add_error('estado', 'Debe seleccionar el nuevo estado.')
+        return cleaned_data
+    
+    def valor(self):
+        """Valor a asignar en el campo del activo según la acción"""
+        accion = self.cleaned_data['accion']
+        if accion == 'reasignar':
+            usuario = self.cleaned_data.get('usuario_asignado')
+            return usuario.pk if usuario else None
+        if accion == 'reubicar':
+            return self.cleaned_data['ubicacion'].pk
+        return self.cleaned_data['estado']
@@ -0,0 +1,177 @@
+"""
+Registro automático del historial de movimientos de los activos.
+
+Las señales de Activo comparan los campos rastreados con los valores leídos
+de la base de datos y generan un movimiento por cada campo modificado. Dentro
+de `lote_historial()` los movimientos se acumulan en memoria y se insertan con
+un único `bulk_create` justo antes de confirmar la transacción; fuera de un
+lote se insertan al final de cada `save()`.
+
+Uso en una vista:
+
+    with lote_historial(request.user):
+        form.save()
+"""
+import threading
+from contextlib import contextmanager
+
+from django.db import transaction
+
+from usuarios.models import UsuarioAsignado
+
+from .models import Activo, HistorialMovimiento, SubCategoria, Ubicacion
+
+Tipo = HistorialMovimiento.TipoMovimiento
+
+# Campo rastreado -> (nombre del campo, tipo de movimiento, modelo relacionado)
+CAMPOS_HISTORIAL = {
+    'usuario_asignado_id': ('usuario_asignado', Tipo.REASIGNACION, UsuarioAsignado),
+    'ubicacion_id': ('ubicacion', Tipo.REUBICACION, Ubicacion),
+    'estado': ('estado', Tipo.CAMBIO_ESTADO, None),
+    'subcategoria_id': ('subcategoria', Tipo.ACTUALIZACION, SubCategoria),
+    'codigo_inventario': ('codigo_inventario', Tipo.ACTUALIZACION, None),
+    'marca': ('marca', Tipo.ACTUALIZACION, None),
+    'modelo': ('modelo', Tipo.ACTUALIZACION, None),
+    'numero_serial': ('numero_serial', Tipo.ACTUALIZACION, None),
+    'observaciones': ('observaciones', Tipo.ACTUALIZACION, None),
+}
+
+DESCRIPCIONES = {
+    Tipo.REASIGNACION: 'Activo reasignado de {anterior} a {nuevo}',
+    Tipo.REUBICACION: 'Activo reubicado de {anterior} a {nuevo}',
+    Tipo.CAMBIO_ESTADO: 'Estado cambiado de {anterior} a {nuevo}',
+    Tipo.ACTUALIZACION: 'Se actualizó {campo}',
+}
+
+SIN_VALOR = {
+    'usuario_asignado': 'Sin asignar',
+}
+
+_local = threading.local()
+
+
+class LoteHistorial:
+    """Movimientos pendientes de insertar, con sus valores aún sin resolver"""
+
+    def __init__(self, usuario=None):
+        self.usuario = usuario if usuario is not None and usuario.is_authenticated else None
+        self.pendientes = []
+
+    def agregar(self, activo_id, tipo, campo=None, anterior=None, nuevo=None, descripcion=None):
+        self.pendientes.append({
+            'activo_id': activo_id,
+            'tipo': tipo,
+            'campo': campo,
+            'anterior': anterior,
+            'nuevo': nuevo,
+            'descripcion': descripcion,
+        })
+
+    def guardar(self):
+        """Resuelve las etiquetas e inserta los movimientos con un solo INSERT"""
+        if not self.pendientes:
+            return []
+        etiquetas = self._resolver_etiquetas()
+        movimientos = []
+        for pendiente in self.pendientes:
+            campo = pendiente['campo']
+            anterior = self._etiqueta(etiquetas, campo, pendiente['anterior'])
+            nuevo = self._etiqueta(etiquetas, campo, pendiente['nuevo'])
+            verbose = Activo._meta.get_field(campo).verbose_name if campo else None
+            descripcion = pendiente['descripcion'] or DESCRIPCIONES[pendiente['tipo']].format(
+                anterior=anterior, nuevo=nuevo, campo=verbose
+            )
+            movimientos.append(HistorialMovimiento(
+                activo_id=pendiente['activo_id'],
+                tipo_movimiento=pendiente['tipo'],
+                descripcion=descripcion,
+                campo_modificado=verbose,
+                valor_anterior=anterior if campo else None,
+                valor_nuevo=nuevo if campo else None,
+                usuario=self.usuario,
+            ))
+        self.pendientes = []
+        return HistorialMovimiento.objects.bulk_create(movimientos)
+
+    def _resolver_etiquetas(self):
+        """Obtiene las etiquetas de los objetos relacionados con una consulta por modelo"""
+        ids_por_campo = {}
+        for pendiente in self.pendientes:
+            if pendiente['campo']:
+                ids = ids_por_campo.setdefault(pendiente['campo'], set())
+                ids.update(v for v in (pendiente['anterior'], pendiente['nuevo']) if v is not None)
+
+        etiquetas = {}
+        for nombre, _tipo, modelo in CAMPOS_HISTORIAL.values():
+            if modelo is None or not ids_por_campo.get(nombre):
+                continue
+            queryset = modelo.objects.all()
+            if modelo is SubCategoria:
+                queryset = queryset.select_related('categoria')
+            etiquetas[nombre] = {pk: str(obj) for pk, obj in queryset.in_bulk(ids_por_campo[nombre]).items()}
+        return etiquetas
+
+    @staticmethod
+    def _etiqueta(etiquetas, campo, valor):
+        if valor is None or valor == '':
+            return SIN_VALOR.get(campo, '—')
+        if campo in etiquetas:
+            return etiquetas[campo].get(valor, str(valor))
+        if campo == 'estado':
+            return Activo.EstadoActivo(valor).label
+        return str(valor)
+
+
+def lote_actual():
+    return getattr(_local, 'lote', None)
+
+
+@contextmanager
+def lote_historial(usuario=None):
+    """
+    Ejecuta el bloque en una transacción y registra sus movimientos en lote.
+
+    Los lotes anidados se unen al lote exterior.
+    """
+    lote = lote_actual()
+    if lote is not None:
+        if lote.usuario is None and usuario is not None and usuario.is_authenticated:
+            lote.usuario = usuario
+        inicio = len(lote.pendientes)
+        try:
+            with transaction.atomic():
+                yield lote
+        except Exception:
+            # El savepoint se revirtió: descartar sus movimientos
+            del lote.pendientes[inicio:]
+            raise
+        return
+
+    lote = LoteHistorial(usuario)
+    _local.lote = lote
+    try:
+        with transaction.atomic():
+            yield lote
+            lote.guardar()
+    finally:
+        _local.lote = None
+
+
+def registrar_guardado(activo, created, update_fields=None):
+    """Registra la creación o los cambios de un activo recién guardado"""
+    lote = lote_actual() or LoteHistorial()
+    if created:
+        lote.agregar(
+            activo.pk, Tipo.CREACION,
+            descripcion=f'Activo {activo.codigo_inventario} registrado',
+        )
+    else:
+        for campo, (anterior, nuevo) in activo.campos_modificados(update_fields).items():
+            if not anterior and not nuevo:
+                # None y '' son equivalentes en los campos de texto opcionales
+                continue
+            nombre, tipo, _modelo = CAMPOS_HISTORIAL[campo]
+            lote.agregar(activo.pk, tipo, nombre, anterior, nuevo)
+
+    if lote is not lote_actual():
+        lote.guardar()
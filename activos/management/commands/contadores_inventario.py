@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from activos import contadores
+
+
+class Command(BaseCommand):
+    help = 'Verifica (o reconstruye) los contadores de inventario usados por los dashboards'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reconstruir',
+            action='store_true',
+            help='Recalcula todos los contadores a partir de la tabla de activos',
+        )
+
+    def handle(self, *args, **options):
+        if options['reconstruir']:
+            contadores.reconstruir()
+            self.stdout.write(self.style.SUCCESS('Contadores reconstruidos.'))
+            return
+
+        diferencias = contadores.verificar()
+        if not diferencias:
+            self.stdout.write(self.style.SUCCESS('Los contadores coinciden con el inventario.'))
+            return
+
+        for descripcion, almacenado, real in diferencias:
+            self.stdout.write(f'{descripcion}: almacenado={almacenado} real={real}')
+        raise CommandError(
+            f'{len(diferencias)} contadores desincronizados. '
+            'Ejecute con --reconstruir para corregirlos.'
+        )
@@ -0,0 +1,311 @@
+"""
+Genera un inventario sintético para pruebas de rendimiento a escala.
+
+Las filas se insertan por lotes con `bulk_create` y una semilla fija, de modo
+que la misma semilla, tamaños y fecha `--hasta` producen el mismo conjunto de
+datos en SQLite o PostgreSQL. La distribución imita un inventario real: pocas
+categorías, subcategorías y ubicaciones concentran la mayoría de los activos,
+y unos pocos activos acumulan muchos mantenimientos y movimientos.
+
+`bulk_create` no dispara señales, así que al terminar se reconstruyen los
+contadores de inventario y los resúmenes de costos, se marca en
+mantenimiento a los activos con mantenimientos en proceso y se invalidan las
+cachés de catálogos. Los nombres y códigos llevan el prefijo `--prefijo`.
+"""
+import itertools
+import random
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import models, transaction
+from django.utils import timezone
+
+from activos import contadores
+from activos.models import Activo, Categoria, HistorialMovimiento, SubCategoria, Ubicacion
+from core import catalogos
+from mantenimientos import costos
+from mantenimientos.models import Mantenimiento
+from usuarios.models import UsuarioAsignado
+
+CATEGORIAS = [
+    'Cómputo', 'Mobiliario', 'Redes', 'Impresión', 'Telefonía', 'Audiovisual',
+    'Vehículos', 'Herramientas', 'Laboratorio', 'Climatización', 'Seguridad', 'Energía',
+]
+SUBCATEGORIAS = [
+    'Laptop', 'Escritorio', 'Monitor', 'Servidor', 'Switch', 'Router', 'Silla', 'Mesa',
+    'Archivador', 'Impresora', 'Escáner', 'Teléfono IP', 'Proyector', 'Cámara', 'UPS', 'Tablet',
+]
+SEDES = ['Caracas', 'Valencia', 'Maracay', 'Barquisimeto', 'Maracaibo', 'Mérida', 'Puerto La Cruz']
+MARCAS = ['Dell', 'HP', 'Lenovo', 'Cisco', 'Epson', 'Samsung', 'LG', 'Apple', 'APC', 'Logitech']
+NOMBRES = ['Ana', 'Luis', 'María', 'José', 'Carmen', 'Pedro', 'Rosa', 'Jorge', 'Elena', 'Miguel']
+APELLIDOS = ['Pérez', 'González', 'Rodríguez', 'Hernández', 'García', 'Martínez', 'López', 'Díaz']
+DEPARTAMENTOS = ['Administración', 'Finanzas', 'Operaciones', 'Tecnología', 'Ventas', 'Logística']
+TECNICOS = ['Servicios Técnicos CA', 'Soporte Integral', 'TecnoRed', 'Mantenimiento Express']
+
+Estado = Activo.EstadoActivo
+Tipo = HistorialMovimiento.TipoMovimiento
+
+# Tipos de los movimientos posteriores a la creación y su frecuencia relativa
+TIPOS_MOVIMIENTO = [
+    (Tipo.REASIGNACION, 35, 'usuario_asignado'),
+    (Tipo.REUBICACION, 25, 'ubicacion'),
+    (Tipo.ACTUALIZACION, 25, 'observaciones'),
+    (Tipo.CAMBIO_ESTADO, 15, 'estado'),
+]
+
+# Mantenimientos recientes que quedan en proceso
+DIAS_EN_PROCESO = 30
+PROBABILIDAD_EN_PROCESO = 0.3
+
+
+def pesos_zipf(n, rng, exponente=1.0):
+    """Pesos acumulados de n elementos con frecuencias 1/rango^exponente en orden aleatorio"""
+    pesos = [1 / rango ** exponente for rango in range(1, n + 1)]
+    rng.shuffle(pesos)
+    return list(itertools.accumulate(pesos))
+
+
+def pesos_lognormales(n, rng, sigma=1.0):
+    """Pesos acumulados de n elementos con una cola larga moderada"""
+    return list(itertools.accumulate(rng.lognormvariate(0, sigma) for _ in range(n)))
+
+
+def lotes(total, tamano):
+    """Rangos [inicio, fin) de hasta `tamano` elementos"""
+    for inicio in range(0, total, tamano):
+        yield inicio, min(inicio + tamano, total)
+
+
+@contextmanager
+def fechas_manuales(*campos):
+    """Desactiva auto_now/auto_now_add de los campos para asignar fechas históricas"""
+    originales = [(campo, campo.auto_now, campo.auto_now_add) for campo in campos]
+    for campo in campos:
+        campo.auto_now = campo.auto_now_add = False
+    try:
+        yield
+    finally:
+        for campo, auto_now, auto_now_add in originales:
+            campo.auto_now, campo.auto_now_add = auto_now, auto_now_add
+
+
+class Command(BaseCommand):
+    help = 'Genera un inventario sintético reproducible para pruebas de rendimiento'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--categorias', type=int, default=12)
+        parser.add_argument('--subcategorias', type=int, default=8, help='Subcategorías por categoría')
+        parser.add_argument('--ubicaciones', type=int, default=40)
+        parser.add_argument('--usuarios', type=int, default=2000)
+        parser.add_argument('--activos', type=int, default=50000)
+        parser.add_argument('--mantenimientos', type=int, default=200000)
+        parser.add_argument(
+            '--movimientos', type=int, default=200000,
+            help='Movimientos de historial además del de creación de cada activo',
+        )
+        parser.add_argument('--anios', type=int, default=5, help='Años de antigüedad del inventario')
+        parser.add_argument(
+            '--hasta', type=lambda valor: datetime.strptime(valor, '%Y-%m-%d').date(),
+            default=None, help='Fecha más reciente de los datos (AAAA-MM-DD); por defecto, hoy',
+        )
+        parser.add_argument('--semilla', type=int, default=42)
+        parser.add_argument('--lote', type=int, default=5000, help='Filas por INSERT')
+        parser.add_argument('--prefijo', default='SIN', help='Prefijo de nombres y códigos generados')
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['semilla'])
+        self.lote = options['lote']
+        self.prefijo = options['prefijo']
+        if Activo.objects.filter(codigo_inventario__startswith=f'{self.prefijo}-').exists():
+            raise CommandError(
+                f'Ya existen activos con el prefijo "{self.prefijo}". '
+                'Use otro --prefijo o una base de datos vacía.'
+            )
+
+        hasta = options['hasta'] or timezone.localdate()
+        self.fin = timezone.make_aware(datetime.combine(hasta, datetime.max.time().replace(microsecond=0)))
+        self.duracion = timedelta(days=365 * options['anios']).total_seconds()
+        self.usuarios_sistema = list(User.objects.order_by('pk').values_list('pk', flat=True)) or [None]
+
+        self.etapa('catálogos', self.crear_catalogos, options)
+        self.etapa('usuarios asignados', self.crear_usuarios, options['usuarios'])
+        self.etapa('activos', self.crear_activos, options['activos'])
+        self.etapa('mantenimientos', self.crear_mantenimientos, options['mantenimientos'])
+        self.etapa('movimientos', self.crear_movimientos, options['movimientos'])
+        self.etapa('resúmenes y contadores', self.reconstruir)
+        self.stdout.write(self.style.SUCCESS('Datos sintéticos generados.'))
+
+    def etapa(self, nombre, funcion, *args):
+        inicio = time.perf_counter()
+        total = funcion(*args)
+        detalle = f'{total} filas, ' if total is not None else ''
+        self.stdout.write(f'{nombre}: {detalle}{time.perf_counter() - inicio:.1f} s')
+
+    def fecha(self, desde=None):
+        """Fecha aleatoria entre `desde` (o el inicio del período) y el final"""
+        inicio = desde if desde is not None else self.fin - timedelta(seconds=self.duracion)
+        return inicio + (self.fin - inicio) * self.rng.random()
+
+    def crear_catalogos(self, options):
+        categorias = Categoria.objects.bulk_create([
+            Categoria(nombre=f'{self.prefijo} {CATEGORIAS[i % len(CATEGORIAS)]} {i + 1}')
+            for i in range(options['categorias'])
+        ])
+        subcategorias = SubCategoria.objects.bulk_create([
+            SubCategoria(
+                nombre=f'{SUBCATEGORIAS[(i + j) % len(SUBCATEGORIAS)]} {j + 1}', categoria=categoria
+            )
+            for i, categoria in enumerate(categorias)
+            for j in range(options['subcategorias'])
+        ])
+        ubicaciones = Ubicacion.objects.bulk_create([
+            Ubicacion(nombre=f'{self.prefijo} {SEDES[i % len(SEDES)]} - Piso {i // len(SEDES) + 1}')
+            for i in range(options['ubicaciones'])
+        ])
+        # Unos pocos catálogos concentran la mayoría de los activos
+        self.subcategorias = self.ids(SubCategoria, categoria__in=categorias)
+        self.pesos_subcategorias = pesos_zipf(len(self.subcategorias), self.rng)
+        self.ubicaciones = self.ids(Ubicacion, nombre__startswith=f'{self.prefijo} ')
+        self.pesos_ubicaciones = pesos_zipf(len(self.ubicaciones), self.rng)
+        return len(categorias) + len(subcategorias) + len(ubicaciones)
+
+    def ids(self, modelo, **filtros):
+        return list(modelo.objects.filter(**filtros).order_by('pk').values_list('pk', flat=True))
+
+    def crear_usuarios(self, cantidad):
+        rng = self.rng
+        for inicio, fin in lotes(cantidad, self.lote):
+            UsuarioAsignado.objects.bulk_create([
+                UsuarioAsignado(
+                    nombres=rng.choice(NOMBRES),
+                    apellidos=f'{rng.choice(APELLIDOS)} {rng.choice(APELLIDOS)}',
+                    identificacion=f'{self.prefijo}{i:08d}',
+                    email=f'usuario{i}@ejemplo.com',
+                    departamento=rng.choice(DEPARTAMENTOS),
+                    activo=rng.random() > 0.05,
+                )
+                for i in range(inicio, fin)
+            ])
+        self.usuarios = self.ids(UsuarioAsignado, identificacion__startswith=self.prefijo)
+        self.pesos_usuarios = pesos_lognormales(len(self.usuarios), self.rng) if self.usuarios else None
+        return cantidad
+
+    def crear_activos(self, cantidad):
+        rng = self.rng
+        campos = [Activo._meta.get_field(nombre) for nombre in ('fecha_creacion', 'fecha_actualizacion')]
+        self.creacion_activos = []
+        with fechas_manuales(*campos):
+            for inicio, fin in lotes(cantidad, self.lote):
+                subcategorias = rng.choices(self.subcategorias, cum_weights=self.pesos_subcategorias, k=fin - inicio)
+                ubicaciones = rng.choices(self.ubicaciones, cum_weights=self.pesos_ubicaciones, k=fin - inicio)
+                objetos = []
+                for i, subcategoria_id, ubicacion_id in zip(range(inicio, fin), subcategorias, ubicaciones):
+                    creacion = self.fecha()
+                    self.creacion_activos.append(creacion)
+                    usuario_id = None
+                    if self.usuarios and rng.random() < 0.85:
+                        usuario_id = rng.choices(self.usuarios, cum_weights=self.pesos_usuarios)[0]
+                    activo = Activo(
+                        subcategoria_id=subcategoria_id,
+                        ubicacion_id=ubicacion_id,
+                        usuario_asignado_id=usuario_id,
+                        marca=rng.choice(MARCAS),
+                        modelo=f'M{rng.randint(100, 999)}',
+                        numero_serial=f'SN{rng.getrandbits(40):010X}',
+                        codigo_inventario=f'{self.prefijo}-{i + 1:07d}',
+                        estado=Estado.INACTIVO if rng.random() < 0.05 else Estado.ACTIVO,
+                        fecha_creacion=creacion,
+                        fecha_actualizacion=creacion,
+                    )
+                    activo.documento_busqueda = activo.construir_documento_busqueda()
+                    objetos.append(activo)
+                Activo.objects.bulk_create(objetos)
+        self.activos = self.ids(Activo, codigo_inventario__startswith=f'{self.prefijo}-')
+        # Unos pocos activos acumulan muchos mantenimientos y movimientos
+        self.pesos_activos = pesos_lognormales(len(self.activos), self.rng)
+        self.indices_activos = range(len(self.activos))
+        return cantidad
+
+    def crear_mantenimientos(self, cantidad):
+        if not self.activos:
+            return 0
+        rng = self.rng
+        recientes = self.fin - timedelta(days=DIAS_EN_PROCESO)
+        campos = [
+            Mantenimiento._meta.get_field(nombre)
+            for nombre in ('fecha', 'fecha_creacion', 'fecha_actualizacion')
+        ]
+        # Sin las operaciones de MantenimientoQuerySet.bulk_create, que recalcularían
+        # los resúmenes en cada lote: se reconstruyen una sola vez al final
+        queryset = models.QuerySet(Mantenimiento)
+        with fechas_manuales(*campos):
+            for inicio, fin in lotes(cantidad, self.lote):
+                objetos = []
+                for indice in rng.choices(self.indices_activos, cum_weights=self.pesos_activos, k=fin - inicio):
+                    momento = self.fecha(self.creacion_activos[indice])
+                    en_proceso = momento > recientes and rng.random() < PROBABILIDAD_EN_PROCESO
+                    objetos.append(Mantenimiento(
+                        activo_id=self.activos[indice],
+                        tecnico=rng.choice(TECNICOS),
+                        telefono=f'0212{rng.randint(1000000, 9999999)}',
+                        descripcion='Mantenimiento preventivo' if rng.random() < 0.7 else 'Reparación',
+                        costo=Decimal(f'{rng.lognormvariate(4, 0.8):.2f}'),
+                        fecha=timezone.localtime(momento).date(),
+                        estado=(
+                            Mantenimiento.EstadoMantenimiento.EN_PROCESO if en_proceso
+                            else Mantenimiento.EstadoMantenimiento.FINALIZADO
+                        ),
+                        fecha_creacion=momento,
+                        fecha_actualizacion=momento,
+                    ))
+                queryset.bulk_create(objetos)
+        return cantidad
+
+    def crear_movimientos(self, cantidad):
+        rng = self.rng
+        tipos = [tipo for tipo, _peso, _campo in TIPOS_MOVIMIENTO]
+        pesos = [peso for _tipo, peso, _campo in TIPOS_MOVIMIENTO]
+        campos = {tipo: campo for tipo, _peso, campo in TIPOS_MOVIMIENTO}
+        with fechas_manuales(HistorialMovimiento._meta.get_field('fecha_movimiento')):
+            # Movimiento de creación de cada activo
+            for inicio, fin in lotes(len(self.activos), self.lote):
+                HistorialMovimiento.objects.bulk_create([
+                    HistorialMovimiento(
+                        activo_id=self.activos[indice],
+                        tipo_movimiento=Tipo.CREACION,
+                        descripcion='Activo creado',
+                        usuario_id=rng.choice(self.usuarios_sistema),
+                        fecha_movimiento=self.creacion_activos[indice],
+                    )
+                    for indice in range(inicio, fin)
+                ])
+            if not self.activos:
+                return 0
+            for inicio, fin in lotes(cantidad, self.lote):
+                objetos = []
+                for indice in rng.choices(self.indices_activos, cum_weights=self.pesos_activos, k=fin - inicio):
+                    tipo = rng.choices(tipos, weights=pesos)[0]
+                    objetos.append(HistorialMovimiento(
+                        activo_id=self.activos[indice],
+                        tipo_movimiento=tipo,
+                        descripcion=f'{tipo.label} del activo',
+                        campo_modificado=campos[tipo],
+                        usuario_id=rng.choice(self.usuarios_sistema),
+                        fecha_movimiento=self.fecha(self.creacion_activos[indice]),
+                    ))
+                HistorialMovimiento.objects.bulk_create(objetos)
+        return len(self.activos) + cantidad
+
+    @transaction.atomic
+    def reconstruir(self):
+        Activo.objects.filter(
+            mantenimientos__estado=Mantenimiento.EstadoMantenimiento.EN_PROCESO
+        ).exclude(estado=Estado.EN_MANTENIMIENTO).update(estado=Estado.EN_MANTENIMIENTO)
+        costos.reconstruir()
+        contadores.reconstruir()
+        for modelo in (Categoria, SubCategoria, Ubicacion):
+            transaction.on_commit(lambda modelo=modelo: catalogos.invalidar(modelo))
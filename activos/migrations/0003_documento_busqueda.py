@@ -0,0 +1,67 @@
+# Generated by Django 5.2.7 on 2026-10-18 08:14
+
+import unicodedata
+
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+# Copia congelada de activos.busqueda al momento de esta migración: los
+# cambios posteriores en el documento de búsqueda no deben alterarla
+CAMPOS_BUSQUEDA = ['codigo_inventario', 'marca', 'modelo', 'numero_serial']
+
+
+def construir_documento(*valores):
+    """Documento normalizado: minúsculas, sin acentos y con espacios simples"""
+    texto = unicodedata.normalize('NFKD', ' '.join(v for v in valores if v))
+    texto = ''.join(c for c in texto if not unicodedata.combining(c))
+    return ' '.join(texto.lower().split())
+
+
+def poblar_documento_busqueda(apps, schema_editor):
+    """Calcula el documento de búsqueda de los activos existentes"""
+    Activo = apps.get_model('activos', 'Activo')
+    lote = []
+    for activo in Activo.objects.only('pk', *CAMPOS_BUSQUEDA).iterator(chunk_size=2000):
+        activo.documento_busqueda = construir_documento(
+            *(getattr(activo, campo) for campo in CAMPOS_BUSQUEDA)
+        )
+        lote.append(activo)
+        if len(lote) >= 2000:
+            Activo.objects.bulk_update(lote, ['documento_busqueda'])
+            lote = []
+    if lote:
+        Activo.objects.bulk_update(lote, ['documento_busqueda'])
+
+
+def crear_indice_trigram(apps, schema_editor):
+    """Índice GIN trigram sobre el documento (solo PostgreSQL)"""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS activos_activo_documento_trgm '
+        'ON activos_activo USING gin (documento_busqueda gin_trgm_ops)'
+    )
+
+
+def eliminar_indice_trigram(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS activos_activo_documento_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activos', '0002_historialmovimiento'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='activo',
+            name='documento_busqueda',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.RunPython(poblar_documento_busqueda, migrations.RunPython.noop),
+        migrations.RunPython(crear_indice_trigram, eliminar_indice_trigram),
+    ]
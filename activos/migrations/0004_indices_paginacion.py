@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 08:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activos', '0003_documento_busqueda'),
+        ('usuarios', '0002_indices_paginacion'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='activo',
+            index=models.Index(fields=['-fecha_creacion', '-id'], name='activos_act_fecha_c_b2f32f_idx'),
+        ),
+    ]
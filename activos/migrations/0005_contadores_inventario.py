@@ -0,0 +1,67 @@
+# Generated by Django 5.2.7 on 2026-10-18 08:17
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def calcular_contadores(apps, schema_editor):
+    """Inicializa los contadores con el inventario existente"""
+    Activo = apps.get_model('activos', 'Activo')
+    ContadorEstado = apps.get_model('activos', 'ContadorEstado')
+    for nombre, relacion in (
+        ('Categoria', 'subcategoria__categoria'),
+        ('SubCategoria', 'subcategoria'),
+        ('Ubicacion', 'ubicacion'),
+    ):
+        conteo = (
+            Activo.objects.order_by()
+            .filter(**{relacion: OuterRef('pk')})
+            .values(relacion)
+            .annotate(n=Count('pk'))
+            .values('n')
+        )
+        apps.get_model('activos', nombre).objects.update(total_activos=Coalesce(Subquery(conteo), 0))
+
+    reales = dict(Activo.objects.order_by().values_list('estado').annotate(n=Count('pk')))
+    for estado in ('AC', 'IN', 'EM'):
+        ContadorEstado.objects.create(estado=estado, total=reales.get(estado, 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activos', '0004_indices_paginacion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContadorEstado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('estado', models.CharField(choices=[('AC', 'Activo'), ('IN', 'Inactivo'), ('EM', 'En Mantenimiento')], max_length=2, unique=True)),
+                ('total', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Contador por Estado',
+                'verbose_name_plural': 'Contadores por Estado',
+                'ordering': ['estado'],
+            },
+        ),
+        migrations.AddField(
+            model_name='categoria',
+            name='total_activos',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='subcategoria',
+            name='total_activos',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='ubicacion',
+            name='total_activos',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(calcular_contadores, migrations.RunPython.noop),
+    ]
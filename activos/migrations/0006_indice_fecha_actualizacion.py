@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 08:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activos', '0005_contadores_inventario'),
+        ('usuarios', '0002_indices_paginacion'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='activo',
+            index=models.Index(fields=['fecha_actualizacion'], name='activos_act_fecha_a_2cb55c_idx'),
+        ),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 5.2.7 on 2026-10-18 08:28
+
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import Count, Max, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def calcular_resumen(apps, schema_editor):
+    """Inicializa el resumen de mantenimientos de cada activo"""
+    Activo = apps.get_model('activos', 'Activo')
+    Mantenimiento = apps.get_model('mantenimientos', 'Mantenimiento')
+    del_activo = Mantenimiento.objects.filter(activo_id=OuterRef('pk')).order_by().values('activo_id')
+
+    def agregado(expresion):
+        return Subquery(del_activo.annotate(valor=expresion).values('valor'))
+
+    Activo.objects.update(
+        cantidad_mantenimientos=Coalesce(agregado(Count('pk')), 0),
+        mantenimientos_abiertos=Coalesce(agregado(Count('pk', filter=Q(estado='EP'))), 0),
+        costo_mantenimiento_total=Coalesce(agregado(Sum('costo')), Decimal('0')),
+        costo_mantenimiento_finalizado=Coalesce(agregado(Sum('costo', filter=Q(estado='FI'))), Decimal('0')),
+        fecha_ultimo_mantenimiento=agregado(Max('fecha')),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activos', '0006_indice_fecha_actualizacion'),
+        ('mantenimientos', '0004_indice_estado_fecha'),
+        ('usuarios', '0002_indices_paginacion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='activo',
+            name='cantidad_mantenimientos',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Cantidad de Mantenimientos'),
+        ),
+        migrations.AddField(
+            model_name='activo',
+            name='costo_mantenimiento_finalizado',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=14, verbose_name='Costo de Mantenimientos Finalizados'),
+        ),
+        migrations.AddField(
+            model_name='activo',
+            name='costo_mantenimiento_total',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=14, verbose_name='Costo Total de Mantenimientos'),
+        ),
+        migrations.AddField(
+            model_name='activo',
+            name='fecha_ultimo_mantenimiento',
+            field=models.DateField(blank=True, editable=False, null=True, verbose_name='Último Mantenimiento'),
+        ),
+        migrations.AddField(
+            model_name='activo',
+            name='mantenimientos_abiertos',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Mantenimientos en Proceso'),
+        ),
+        migrations.AddIndex(
+            model_name='activo',
+            index=models.Index(fields=['-costo_mantenimiento_total', '-id'], name='activos_act_costo_m_bd15b5_idx'),
+        ),
+        migrations.RunPython(calcular_resumen, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.7 on 2026-10-18 10:13
+
+import core.indices
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.db import migrations
+
+# Índices de prefijo para el autocompletado (ver core.indices)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activos', '0007_resumen_mantenimientos'),
+        ('usuarios', '0003_indices_autocompletar'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='activo',
+            index=core.indices.IndicePrefijo(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('codigo_inventario'), name='text_pattern_ops'), name='activos_activo_codigo_prefijo'),
+        ),
+        migrations.AddIndex(
+            model_name='activo',
+            index=core.indices.IndicePrefijo(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('numero_serial'), name='text_pattern_ops'), name='activos_activo_serial_prefijo'),
+        ),
+    ]
@@ -1,11 +1,39 @@
-from django.db import models
+from django.db import models, transaction
 from django.core.exceptions import ValidationError
 from django.contrib.auth.models import User
+from core.indices import indice_prefijo
+from core.rastreo import RastreoCambiosMixin
+from .busqueda import CAMPOS_BUSQUEDA, construir_documento
 
 
-class Categoria(models.Model):
+class CamposResumenMixin:
+    """
+    Evita que un `save()` sobrescriba los campos de resumen con valores desactualizados.
+
+    Los campos listados en `campos_resumen` solo se modifican con UPDATE
+    atómicos (ver activos.contadores y mantenimientos.costos).
+    """
+    campos_resumen = ()
+    
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                campo.name for campo in self._meta.concrete_fields
+                if not campo.primary_key and campo.name not in self.campos_resumen
+            ]
+        super().save(*args, **kwargs)
+
+
+class ConTotalActivosMixin(CamposResumenMixin):
+    """Modelos con el contador `total_activos` mantenido por activos.contadores"""
+    campos_resumen = ('total_activos',)
+
+
+class Categoria(ConTotalActivosMixin, models.Model):
     """Categoría principal de activos"""
     nombre = models.CharField(max_length=100, unique=True)
+    # Contador mantenido por activos.contadores
+    total_activos = models.PositiveIntegerField(default=0, editable=False)
     
     class Meta:
         verbose_name = "Categoría"
@@ -16,14 +44,18 @@ class Categoria(models.Model):
         return self.nombre
 
 
-class SubCategoria(models.Model):
+class SubCategoria(RastreoCambiosMixin, ConTotalActivosMixin, models.Model):
     """Subcategoría de activos"""
+    campos_rastreados = ('categoria_id',)
+    
     nombre = models.CharField(max_length=100)
     categoria = models.ForeignKey(
         Categoria, 
         on_delete=models.PROTECT,
         related_name='subcategorias'
     )
+    # Contador mantenido por activos.contadores
+    total_activos = models.PositiveIntegerField(default=0, editable=False)
     
     class Meta:
         verbose_name = "Subcategoría"
@@ -33,11 +65,18 @@ class SubCategoria(models.Model):
     
     def __str__(self):
         return f"{self.categoria.nombre} - {self.nombre}"
+    
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+        self.guardar_valores_originales(kwargs.get('update_fields'))
 
 
-class Ubicacion(models.Model):
+class Ubicacion(ConTotalActivosMixin, models.Model):
     """Ubicación física de los activos"""
     nombre = models.CharField(max_length=100, unique=True)
+    # Contador mantenido por activos.contadores
+    total_activos = models.PositiveIntegerField(default=0, editable=False)
     
     class Meta:
         verbose_name = "Ubicación"
@@ -48,8 +87,19 @@ class Ubicacion(models.Model):
         return self.nombre
 
 
-class Activo(models.Model):
+class Activo(RastreoCambiosMixin, CamposResumenMixin, models.Model):
     """Activo del sistema"""
+    campos_rastreados = (
+        'subcategoria_id', 'ubicacion_id', 'estado', 'usuario_asignado_id',
+        'codigo_inventario', 'marca', 'modelo', 'numero_serial', 'observaciones',
+    )
+    # Campos que determinan los contadores de inventario (ver activos.contadores)
+    campos_contadores = ('subcategoria_id', 'ubicacion_id', 'estado')
+    # Resumen de mantenimientos, mantenido por mantenimientos.costos
+    campos_resumen = (
+        'cantidad_mantenimientos', 'mantenimientos_abiertos', 'costo_mantenimiento_total',
+        'costo_mantenimiento_finalizado', 'fecha_ultimo_mantenimiento',
+    )
     
     class EstadoActivo(models.TextChoices):
         ACTIVO = 'AC', 'Activo'
@@ -87,6 +137,28 @@ class Activo(models.Model):
         default=EstadoActivo.ACTIVO
     )
     
+    # Documento normalizado para búsquedas (ver activos.busqueda)
+    documento_busqueda = models.TextField(blank=True, default='', editable=False)
+    
+    # Resumen de mantenimientos (ver campos_resumen)
+    cantidad_mantenimientos = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name='Cantidad de Mantenimientos'
+    )
+    mantenimientos_abiertos = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name='Mantenimientos en Proceso'
+    )
+    costo_mantenimiento_total = models.DecimalField(
+        max_digits=14, decimal_places=2, default=0, editable=False,
+        verbose_name='Costo Total de Mantenimientos'
+    )
+    costo_mantenimiento_finalizado = models.DecimalField(
+        max_digits=14, decimal_places=2, default=0, editable=False,
+        verbose_name='Costo de Mantenimientos Finalizados'
+    )
+    fecha_ultimo_mantenimiento = models.DateField(
+        null=True, blank=True, editable=False, verbose_name='Último Mantenimiento'
+    )
+    
     # Campos de auditoría
     fecha_creacion = models.DateTimeField(auto_now_add=True)
     fecha_actualizacion = models.DateTimeField(auto_now=True)
@@ -99,6 +171,12 @@ class Activo(models.Model):
             models.Index(fields=['codigo_inventario']),
             models.Index(fields=['estado']),
             models.Index(fields=['subcategoria']),
+            models.Index(fields=['-fecha_creacion', '-id']),
+            models.Index(fields=['fecha_actualizacion']),
+            models.Index(fields=['-costo_mantenimiento_total', '-id']),
+            # Autocompletado por prefijo (ver core.indices)
+            indice_prefijo('codigo_inventario', 'activos_activo_codigo_prefijo'),
+            indice_prefijo('numero_serial', 'activos_activo_serial_prefijo'),
         ]
     
     def __str__(self):
@@ -114,6 +192,48 @@ class Activo(models.Model):
         super().clean()
         if self.codigo_inventario:
             self.codigo_inventario = self.codigo_inventario.upper().strip()
+    
+    def construir_documento_busqueda(self):
+        """Retorna el documento de búsqueda normalizado del activo"""
+        return construir_documento(*(getattr(self, campo) for campo in CAMPOS_BUSQUEDA))
+    
+    def save(self, *args, **kwargs):
+        self.documento_busqueda = self.construir_documento_busqueda()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and set(update_fields) & set(CAMPOS_BUSQUEDA):
+            kwargs['update_fields'] = set(update_fields) | {'documento_busqueda'}
+        # Contadores e historial se actualizan en post_save, dentro de la misma
+        # transacción y con los valores de la fila bloqueada que se reemplaza
+        with transaction.atomic():
+            if not self._state.adding and self.pk is not None:
+                self.recargar_valores_originales(self.campos_contadores)
+            super().save(*args, **kwargs)
+        self.guardar_valores_originales(kwargs.get('update_fields'))
+    
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            if not self.recargar_valores_originales(self.campos_contadores):
+                # Otra transacción ya lo eliminó y descontó de los contadores
+                return 0, {}
+            return super().delete(*args, **kwargs)
+
+
+class ContadorEstado(models.Model):
+    """Total de activos por estado, mantenido por activos.contadores"""
+    estado = models.CharField(
+        max_length=2,
+        choices=Activo.EstadoActivo.choices,
+        unique=True
+    )
+    total = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        verbose_name = "Contador por Estado"
+        verbose_name_plural = "Contadores por Estado"
+        ordering = ['estado']
+    
+    def __str__(self):
+        return f"{self.get_estado_display()}: {self.total}"
 
 
 class HistorialMovimiento(models.Model):
@@ -0,0 +1,54 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import contadores, historial
+from .models import Activo, Categoria, SubCategoria, Ubicacion
+
+
+@receiver(post_save, sender=Activo)
+def actualizar_contadores_activo(sender, instance, created, update_fields, raw, **kwargs):
+    """Ajusta los contadores de inventario al crear o modificar un activo"""
+    if raw:
+        return
+    if created:
+        contadores.registrar_alta(instance)
+    else:
+        contadores.registrar_cambio(instance, update_fields)
+
+
+@receiver(post_save, sender=Activo)
+def registrar_historial_activo(sender, instance, created, update_fields, raw, **kwargs):
+    """Registra en el historial la creación o los campos modificados"""
+    if raw:
+        return
+    historial.registrar_guardado(instance, created, update_fields)
+
+
+@receiver(post_delete, sender=Activo)
+def descontar_activo(sender, instance, **kwargs):
+    """Descuenta el activo eliminado de los contadores"""
+    contadores.registrar_baja(instance)
+
+
+@receiver(post_save, sender=SubCategoria)
+def mover_contadores_subcategoria(sender, instance, created, update_fields, raw, **kwargs):
+    """Traslada el total de la subcategoría si cambió de categoría"""
+    if raw or created:
+        return
+    cambios = instance.campos_modificados(update_fields)
+    if 'categoria_id' in cambios:
+        contadores.mover_subcategoria(instance, cambios['categoria_id'][0])
+
+
+@receiver(post_save, sender=Categoria)
+@receiver(post_delete, sender=Categoria)
+@receiver(post_save, sender=SubCategoria)
+@receiver(post_delete, sender=SubCategoria)
+@receiver(post_save, sender=Ubicacion)
+@receiver(post_delete, sender=Ubicacion)
+def invalidar_inventario_catalogo(sender, **kwargs):
+    """
+    Los nombres de los catálogos forman parte de los datos del inventario en
+    caché (tablero de inicio y reportes PDF)
+    """
+    contadores.invalidar_inventario()
@@ -1,3 +1,907 @@
+import io
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection, transaction
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from core.autocompletar import LIMITE
+from core.testing import PresupuestoConsultasTestCase
+from mantenimientos import costos
+from mantenimientos.models import Mantenimiento
+from usuarios.models import UsuarioAsignado
+
+from . import contadores
+from .acciones import ACTUALIZADO, NO_ENCONTRADO, SIN_CAMBIOS, actualizar_activos
+from .busqueda import buscar_activos, normalizar_texto
+from .forms import ActivoFilterForm, ActivoForm, SubCategoriaForm
+from .historial import lote_historial
+from .models import Activo, Categoria, HistorialMovimiento, SubCategoria, Ubicacion
+from .views import ActivoListView
+
+Tipo = HistorialMovimiento.TipoMovimiento
+
+
+class ConsultasConstantesTests(TestCase):
+    """
+    Los formularios y las listas del admin no deben hacer una consulta por
+    fila al construir etiquetas (p. ej. SubCategoria.__str__ usa la categoría).
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'clave')
+        cls.ubicacion = Ubicacion.objects.create(nombre='Sede')
+        cls.agregar_datos(0)
+
+    @classmethod
+    def agregar_datos(cls, inicio, cantidad=3):
+        for i in range(inicio, inicio + cantidad):
+            categoria = Categoria.objects.create(nombre=f'Categoría {i}')
+            subcategoria = SubCategoria.objects.create(nombre=f'Sub {i}', categoria=categoria)
+            usuario = UsuarioAsignado.objects.create(
+                nombres='Usuario', apellidos=str(i), identificacion=f'ID{i}'
+            )
+            Activo.objects.create(
+                subcategoria=subcategoria,
+                ubicacion=cls.ubicacion,
+                usuario_asignado=usuario,
+                marca='Marca',
+                modelo='Modelo',
+                codigo_inventario=f'COD{i:03d}',
+            )
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def contar(self, funcion):
+        """Consultas de `funcion` con la caché de catálogos vacía"""
+        cache.clear()
+        with CaptureQueriesContext(connection) as consultas:
+            funcion()
+        return len(consultas)
+
+    def assertConsultasConstantes(self, funcion):
+        antes = self.contar(funcion)
+        self.agregar_datos(100, cantidad=5)
+        self.assertEqual(self.contar(funcion), antes)
+
+    def get(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_formulario_activo(self):
+        self.assertConsultasConstantes(lambda: str(ActivoForm()))
+
+    def test_formulario_filtro_activos(self):
+        self.assertConsultasConstantes(lambda: str(ActivoFilterForm()))
+
+    def test_formulario_subcategoria(self):
+        self.assertConsultasConstantes(lambda: str(SubCategoriaForm()))
+
+    def test_admin_lista_activos(self):
+        url = reverse('admin:activos_activo_changelist')
+        self.assertConsultasConstantes(lambda: self.get(url))
+
+    def test_admin_lista_subcategorias(self):
+        url = reverse('admin:activos_subcategoria_changelist')
+        self.assertConsultasConstantes(lambda: self.get(url))
+
+    def test_admin_autocompletado_subcategorias(self):
+        url = reverse('admin:autocomplete') + '?app_label=activos&model_name=activo&field_name=subcategoria'
+        self.assertConsultasConstantes(lambda: self.get(url))
+
+
+class PresupuestoConsultasTests(PresupuestoConsultasTestCase):
+    """Máximo de consultas SQL de cada vista de activos (ver core.testing)"""
+
+    def ids_activos(self):
+        return [str(pk) for pk in Activo.objects.values_list('pk', flat=True)]
+
+    def test_categorias(self):
+        self.assertPresupuesto(reverse('activos:categoria-list'), 4)
+        self.assertPresupuesto(reverse('activos:categoria-create'), 2)
+        self.assertPresupuesto(reverse('activos:categoria-update', args=[self.categoria.pk]), 3)
+        self.assertPresupuesto(reverse('activos:categoria-delete', args=[self.categoria.pk]), 3)
+
+    def test_subcategorias(self):
+        self.assertPresupuesto(reverse('activos:subcategoria-list'), 5)
+        self.assertPresupuesto(reverse('activos:subcategoria-create'), 3)
+        self.assertPresupuesto(reverse('activos:subcategoria-update', args=[self.subcategoria.pk]), 4)
+        self.assertPresupuesto(reverse('activos:subcategoria-delete', args=[self.subcategoria.pk]), 4)
+        self.assertPresupuesto(reverse('activos:subcategoria-api'), 4)
+        self.assertPresupuesto(reverse('activos:subcategoria-api') + f'?categoria={self.categoria.pk}', 4)
+
+    def test_ubicaciones(self):
+        self.assertPresupuesto(reverse('activos:ubicacion-list'), 4)
+        self.assertPresupuesto(reverse('activos:ubicacion-create'), 2)
+        self.assertPresupuesto(reverse('activos:ubicacion-update', args=[self.ubicacion.pk]), 3)
+        self.assertPresupuesto(reverse('activos:ubicacion-delete', args=[self.ubicacion.pk]), 3)
+
+    def test_lista_activos(self):
+        url = reverse('activos:activo-list')
+        self.assertPresupuesto(url, 11)
+        self.assertPresupuesto(url + '?paginacion=cursor', 11)
+        self.assertPresupuesto(url + '?orden=costo', 11)
+        self.assertPresupuesto(url + f'?buscar=cod&categoria={self.categoria.pk}', 12)
+
+    def test_activo(self):
+        pk = self.activo.pk
+        self.assertPresupuesto(reverse('activos:activo-detail', args=[pk]), 4)
+        self.assertPresupuesto(reverse('activos:activo-create'), 4)
+        self.assertPresupuesto(reverse('activos:activo-update', args=[pk]), 7)
+        self.assertPresupuesto(reverse('activos:activo-delete', args=[pk]), 3)
+        self.assertPresupuesto(reverse('activos:activo-reasignar', args=[pk]), 5)
+        self.assertPresupuesto(reverse('activos:activo-reubicar', args=[pk]), 5)
+        self.assertPresupuesto(reverse('activos:activo-historial', args=[pk]), 4)
+        self.assertPresupuesto(reverse('activos:activo-autocompletar') + '?q=cod', 3)
+
+    def test_crear_activo(self):
+        datos = {
+            'categoria': self.categoria.pk,
+            'subcategoria': self.subcategoria.pk,
+            'ubicacion': self.ubicacion.pk,
+            'marca': 'Marca',
+            'modelo': 'Modelo',
+            'codigo_inventario': 'NUEVO',
+            'estado': Activo.EstadoActivo.ACTIVO,
+        }
+        self.assertPresupuesto(reverse('activos:activo-create'), 19, 'post', datos, estado=302)
+
+    def test_reasignar_activo(self):
+        url = reverse('activos:activo-reasignar', args=[self.activo.pk])
+        self.assertPresupuesto(url, 11, 'post', {'usuario_asignado': ''}, estado=302)
+
+    def test_acciones_masivas(self):
+        url = reverse('activos:activo-acciones-masivas')
+        self.assertPresupuesto(url, 8, 'post', lambda: {
+            'activos_seleccionados': self.ids_activos(),
+            'accion': 'estado',
+            'estado': Activo.EstadoActivo.INACTIVO,
+        }, estado=302)
+        # Los contadores de todas las ubicaciones afectadas se ajustan en un UPDATE
+        self.assertPresupuesto(url, 10, 'post', lambda: {
+            'activos_seleccionados': self.ids_activos(),
+            'accion': 'reubicar',
+            'ubicacion': self.ubicacion.pk,
+        }, estado=302)
+
+
+class ContadoresInventarioTests(TestCase):
+    """
+    Los contadores mantenidos por las señales coinciden con el inventario
+    real (la misma verificación del comando `contadores_inventario`).
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.computo = Categoria.objects.create(nombre='Cómputo')
+        cls.mobiliario = Categoria.objects.create(nombre='Mobiliario')
+        cls.laptop = SubCategoria.objects.create(nombre='Laptop', categoria=cls.computo)
+        cls.silla = SubCategoria.objects.create(nombre='Silla', categoria=cls.mobiliario)
+        cls.sede = Ubicacion.objects.create(nombre='Sede')
+        cls.bodega = Ubicacion.objects.create(nombre='Bodega')
+
+    def crear(self, codigo, subcategoria=None, ubicacion=None, **campos):
+        return Activo.objects.create(
+            subcategoria=subcategoria or self.laptop,
+            ubicacion=ubicacion or self.sede,
+            marca='Marca',
+            modelo='Modelo',
+            codigo_inventario=codigo,
+            **campos,
+        )
+
+    def assertContadoresCorrectos(self):
+        self.assertEqual(contadores.verificar(), [])
+        reales = contadores._conteos_reales()
+        for dimension, modelo in contadores.MODELOS.items():
+            self.assertEqual(
+                {pk: total for pk, total in modelo.objects.values_list('pk', 'total_activos') if total},
+                reales[dimension],
+                dimension,
+            )
+        self.assertEqual(
+            {estado: total for estado, total in contadores.resumen_estados().items() if total},
+            reales['estado'],
+        )
+
+    def test_alta_y_baja(self):
+        activos = [self.crear(f'COD{i}') for i in range(3)]
+        self.crear('SILLA', subcategoria=self.silla, ubicacion=self.bodega,
+                   estado=Activo.EstadoActivo.INACTIVO)
+        self.assertContadoresCorrectos()
+        self.assertEqual(Categoria.objects.get(pk=self.computo.pk).total_activos, 3)
+
+        activos[0].delete()
+        self.assertContadoresCorrectos()
+
+    def test_baja_con_cambios_sin_guardar(self):
+        # Se descuentan los valores leídos de la base de datos, no los de memoria
+        activo = Activo.objects.get(pk=self.crear('COD').pk)
+        activo.ubicacion = self.bodega
+        activo.estado = Activo.EstadoActivo.INACTIVO
+        activo.delete()
+        self.assertContadoresCorrectos()
+
+    def test_modificacion(self):
+        activo = self.crear('COD')
+        activo.ubicacion = self.bodega
+        activo.subcategoria = self.silla
+        activo.estado = Activo.EstadoActivo.INACTIVO
+        activo.save()
+        self.assertContadoresCorrectos()
+
+        # Guardar de nuevo sin cambios no altera los contadores
+        activo.save()
+        self.assertContadoresCorrectos()
+
+        # Una instancia leída de la base de datos parte de su foto de from_db
+        activo = Activo.objects.get(pk=activo.pk)
+        activo.ubicacion = self.sede
+        activo.save()
+        self.assertContadoresCorrectos()
+
+    def test_modificacion_parcial(self):
+        activo = self.crear('COD')
+        activo.ubicacion = self.bodega
+        activo.estado = Activo.EstadoActivo.INACTIVO
+        # Solo se escribe la ubicación: el estado sigue siendo el original
+        activo.save(update_fields=['ubicacion'])
+        self.assertContadoresCorrectos()
+        self.assertEqual(activo.campos_modificados(), {
+            'estado': (Activo.EstadoActivo.ACTIVO, Activo.EstadoActivo.INACTIVO),
+        })
+
+        activo.save(update_fields=['estado'])
+        self.assertContadoresCorrectos()
+        self.assertEqual(activo.campos_modificados(), {})
+
+    def test_instancia_diferida(self):
+        self.crear('COD')
+        activo = Activo.objects.only('pk', 'ubicacion').get(codigo_inventario='COD')
+        self.assertEqual(activo.valores_originales, {'ubicacion_id': self.sede.pk})
+        activo.ubicacion = self.bodega
+        activo.save(update_fields=['ubicacion'])
+        self.assertContadoresCorrectos()
+
+    def test_instancias_desactualizadas(self):
+        # Dos solicitudes cargan el mismo activo y lo guardan una tras otra:
+        # los deltas se calculan contra la fila bloqueada, no contra la foto
+        # tomada al cargar cada instancia
+        pk = self.crear('COD').pk
+        primera, segunda = Activo.objects.get(pk=pk), Activo.objects.get(pk=pk)
+        for activo in (primera, segunda):
+            activo.ubicacion = self.bodega
+            activo.estado = Activo.EstadoActivo.INACTIVO
+            activo.save()
+            self.assertContadoresCorrectos()
+
+        tercera = Activo.objects.get(pk=pk)
+        primera.subcategoria = self.silla
+        primera.save(update_fields=['subcategoria'])
+        tercera.subcategoria = self.silla
+        tercera.save()
+        self.assertContadoresCorrectos()
+
+        segunda.delete()
+        self.assertContadoresCorrectos()
+        self.assertEqual(tercera.delete(), (0, {}))
+        self.assertContadoresCorrectos()
+
+    def test_acciones_masivas(self):
+        activos = [self.crear(f'COD{i}', ubicacion=self.sede if i % 2 else self.bodega) for i in range(4)]
+        ids = [activo.pk for activo in activos]
+
+        actualizar_activos(ids, 'ubicacion_id', self.bodega.pk)
+        self.assertContadoresCorrectos()
+        actualizar_activos(ids[:3], 'estado', Activo.EstadoActivo.EN_MANTENIMIENTO)
+        self.assertContadoresCorrectos()
+        actualizar_activos(ids, 'estado', Activo.EstadoActivo.INACTIVO)
+        self.assertContadoresCorrectos()
+
+    def test_subcategoria_cambia_de_categoria(self):
+        for i in range(3):
+            self.crear(f'COD{i}')
+        self.laptop.categoria = self.mobiliario
+        self.laptop.save()
+        self.assertContadoresCorrectos()
+        self.assertEqual(Categoria.objects.get(pk=self.mobiliario.pk).total_activos, 3)
+
+        subcategoria = SubCategoria.objects.get(pk=self.laptop.pk)
+        subcategoria.categoria = self.computo
+        subcategoria.save(update_fields=['categoria'])
+        self.assertContadoresCorrectos()
+
+        # Un activo nuevo suma en la categoría actual de su subcategoría
+        self.crear('NUEVO', subcategoria=subcategoria)
+        self.assertContadoresCorrectos()
+
+
+class BusquedaActivosTests(TestCase):
+    """Búsqueda sobre el documento precalculado (ver activos.busqueda)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.subcategoria = SubCategoria.objects.create(
+            nombre='Laptop', categoria=Categoria.objects.create(nombre='Cómputo')
+        )
+        cls.ubicacion = Ubicacion.objects.create(nombre='Sede')
+        cls.usuario = UsuarioAsignado.objects.create(nombres='Ana', apellidos='Pérez', identificacion='1')
+        ahora = timezone.now()
+        cls.activos = {}
+        for i, (codigo, marca, modelo, serial) in enumerate([
+            ('LAP-001', 'Lenovo', 'ThinkPad Señal', 'SN-Ñandú'),
+            ('LAP-0010', 'Dell', 'Latitude', None),
+            ('IMP-001', 'Epson', 'Ecotank LAP', ''),
+            ('MON-001', 'Lenovo', 'Monitor', 'XYZ'),
+        ]):
+            activo = Activo.objects.create(
+                subcategoria=cls.subcategoria, ubicacion=cls.ubicacion, usuario_asignado=cls.usuario,
+                marca=marca, modelo=modelo, numero_serial=serial, codigo_inventario=codigo,
+            )
+            # Orden por defecto (-fecha_creacion) determinista: el último es el más reciente
+            Activo.objects.filter(pk=activo.pk).update(fecha_creacion=ahora + timedelta(minutes=i))
+            cls.activos[codigo] = activo
+
+    def codigos(self, termino, ordenar=True):
+        queryset = buscar_activos(Activo.objects.all(), termino, ordenar=ordenar)
+        return list(queryset.values_list('codigo_inventario', flat=True))
+
+    def test_normalizacion(self):
+        self.assertEqual(normalizar_texto('  ThinkPad   SEÑAL\tÁrea '), 'thinkpad senal area')
+        self.assertEqual(normalizar_texto(None), '')
+        self.assertEqual(
+            self.activos['LAP-001'].documento_busqueda, 'lap-001 lenovo thinkpad senal sn-nandu'
+        )
+        # Sin acentos ni mayúsculas en el término
+        self.assertEqual(self.codigos('señal'), ['LAP-001'])
+        self.assertEqual(self.codigos('ÑANDU'), ['LAP-001'])
+        self.assertEqual(self.codigos('  '), ['MON-001', 'IMP-001', 'LAP-0010', 'LAP-001'])
+
+    def test_varias_palabras(self):
+        # Todas las palabras deben aparecer, en cualquier campo y orden
+        self.assertEqual(sorted(self.codigos('lenovo')), ['LAP-001', 'MON-001'])
+        self.assertEqual(self.codigos('thinkpad LENOVO'), ['LAP-001'])
+        self.assertEqual(self.codigos('lenovo latitude'), [])
+
+    def test_orden_por_relevancia(self):
+        # Sin trigramas: código exacto, luego prefijo del código, luego el
+        # orden por defecto del modelo
+        self.assertEqual(self.codigos('lap-001'), ['LAP-001', 'LAP-0010'])
+        self.assertEqual(self.codigos('lap'), ['LAP-0010', 'LAP-001', 'IMP-001'])
+        self.assertEqual(self.codigos('lap', ordenar=False), ['IMP-001', 'LAP-0010', 'LAP-001'])
+
+    def test_documento_actualizado(self):
+        activo = Activo.objects.get(pk=self.activos['MON-001'].pk)
+        activo.modelo = 'Pantalla Curva'
+        activo.save()
+        self.assertEqual(self.codigos('curva'), ['MON-001'])
+
+        # Con update_fields el documento se guarda junto con los campos
+        activo.numero_serial = 'ABC-999'
+        activo.save(update_fields=['numero_serial'])
+        self.assertEqual(self.codigos('abc-999'), ['MON-001'])
+        self.assertEqual(
+            Activo.objects.get(pk=activo.pk).documento_busqueda, 'mon-001 lenovo pantalla curva abc-999'
+        )
+
+        # Los catálogos y el usuario no forman parte del documento
+        for relacionado in (self.subcategoria, self.ubicacion, self.usuario):
+            relacionado.save()
+        self.assertEqual(
+            Activo.objects.get(pk=activo.pk).documento_busqueda, 'mon-001 lenovo pantalla curva abc-999'
+        )
+
+    def test_listado(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'clave'))
+        response = self.client.get(reverse('activos:activo-list'), {'buscar': 'LÁP'})
+        self.assertEqual(
+            [activo.codigo_inventario for activo in response.context['activos']],
+            ['LAP-0010', 'LAP-001', 'IMP-001'],
+        )
+
+
+class AutocompletarActivosTests(TestCase):
+    """Endpoint JSON del selector de activos (ver core.autocompletar)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'clave')
+        subcategoria = SubCategoria.objects.create(
+            nombre='Laptop', categoria=Categoria.objects.create(nombre='Cómputo')
+        )
+        ubicacion = Ubicacion.objects.create(nombre='Sede')
+        for codigo, serial in [('LAP-002', 'SN-1'), ('LAP-001', None), ('IMP-001', 'LAP-XYZ'), ('MON-001', 'ABC')]:
+            Activo.objects.create(
+                subcategoria=subcategoria, ubicacion=ubicacion, marca='Marca', modelo='Modelo',
+                codigo_inventario=codigo, numero_serial=serial,
+            )
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def buscar(self, q):
+        response = self.client.get(reverse('activos:activo-autocompletar'), {'q': q})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_prefijo_de_codigo_o_serial(self):
+        datos = self.buscar('lap')
+        self.assertEqual(set(datos), {'resultados', 'mas'})
+        self.assertEqual(
+            [r['texto'] for r in datos['resultados']],
+            ['IMP-001 - Marca Modelo', 'LAP-001 - Marca Modelo', 'LAP-002 - Marca Modelo'],
+        )
+        activo = Activo.objects.get(codigo_inventario='IMP-001')
+        self.assertEqual(datos['resultados'][0], {'id': activo.pk, 'texto': str(activo)})
+        self.assertFalse(datos['mas'])
+
+        # Por prefijo, no por subcadena
+        self.assertEqual(self.buscar('001')['resultados'], [])
+        self.assertEqual([r['texto'] for r in self.buscar('abc')['resultados']], ['MON-001 - Marca Modelo'])
+
+    def test_limite(self):
+        activo = Activo.objects.get(codigo_inventario='MON-001')
+        Activo.objects.bulk_create([
+            Activo(
+                subcategoria_id=activo.subcategoria_id, ubicacion_id=activo.ubicacion_id,
+                marca='Marca', modelo='Modelo', codigo_inventario=f'MON-{i:03d}',
+            )
+            for i in range(2, LIMITE + 1)
+        ])
+        datos = self.buscar('mon')
+        self.assertEqual(len(datos['resultados']), LIMITE)
+        self.assertFalse(datos['mas'])
+        datos = self.buscar('')
+        self.assertEqual(len(datos['resultados']), LIMITE)
+        self.assertTrue(datos['mas'])
+
+
+class SubcategoriasApiTests(TestCase):
+    """Árbol de subcategorías en JSON, revalidado por el navegador con ETag"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'clave')
+        cls.computo = Categoria.objects.create(nombre='Cómputo')
+        cls.mobiliario = Categoria.objects.create(nombre='Mobiliario')
+        cls.laptop = SubCategoria.objects.create(nombre='Laptop', categoria=cls.computo)
+        cls.silla = SubCategoria.objects.create(nombre='Silla', categoria=cls.mobiliario)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.admin)
+
+    def get(self, **headers):
+        return self.client.get(reverse('activos:subcategoria-api'), {'categoria': self.computo.pk}, headers=headers)
+
+    def test_respuesta(self):
+        response = self.client.get(reverse('activos:subcategoria-api'))
+        self.assertEqual(response.json(), {'categorias': [
+            [self.computo.pk, 'Cómputo', [[self.laptop.pk, 'Laptop']]],
+            [self.mobiliario.pk, 'Mobiliario', [[self.silla.pk, 'Silla']]],
+        ]})
+        self.assertEqual(self.get().json(), {'subcategorias': [[self.laptop.pk, 'Laptop']]})
+        # Cada categoría tiene su propio ETag
+        self.assertNotEqual(response['ETag'], self.get()['ETag'])
+
+    def test_no_modificado(self):
+        etag = self.get()['ETag']
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.get(if_none_match=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertFalse([q for q in consultas if SubCategoria._meta.db_table in q['sql']])
+
+    def test_etag_cambia_al_editar(self):
+        etag = self.get()['ETag']
+        self.laptop.nombre = 'Portátil'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.laptop.save()
+
+        response = self.get(if_none_match=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.json(), {'subcategorias': [[self.laptop.pk, 'Portátil']]})
+        self.assertEqual(self.get(if_none_match=response['ETag']).status_code, 304)
+
+
+class HistorialMovimientosTests(TestCase):
+    """Historial automático de los activos (ver activos.historial)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'clave')
+        cls.subcategoria = SubCategoria.objects.create(
+            nombre='Laptop', categoria=Categoria.objects.create(nombre='Cómputo')
+        )
+        cls.sede = Ubicacion.objects.create(nombre='Sede')
+        cls.bodega = Ubicacion.objects.create(nombre='Bodega')
+        cls.ana = UsuarioAsignado.objects.create(nombres='Ana', apellidos='Pérez', identificacion='1')
+        cls.activo = Activo.objects.create(
+            subcategoria=cls.subcategoria, ubicacion=cls.sede,
+            marca='Marca', modelo='Modelo', codigo_inventario='COD',
+        )
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+        self.ultimo = HistorialMovimiento.objects.order_by('-pk').values_list('pk', flat=True).first()
+
+    def movimientos(self):
+        """Movimientos nuevos como (tipo, campo, anterior, nuevo, usuario)"""
+        return set(
+            HistorialMovimiento.objects.filter(pk__gt=self.ultimo).values_list(
+                'tipo_movimiento', 'campo_modificado', 'valor_anterior', 'valor_nuevo', 'usuario__username'
+            )
+        )
+
+    def datos_formulario(self, **cambios):
+        datos = {
+            'subcategoria': self.subcategoria.pk,
+            'marca': 'Marca',
+            'modelo': 'Modelo',
+            'numero_serial': '',
+            'codigo_inventario': 'COD',
+            'usuario_asignado': '',
+            'ubicacion': self.sede.pk,
+            'observaciones': '',
+            'estado': Activo.EstadoActivo.ACTIVO,
+        }
+        datos.update(cambios)
+        return datos
+
+    def test_creacion(self):
+        movimiento = HistorialMovimiento.objects.get(activo=self.activo)
+        self.assertEqual(movimiento.tipo_movimiento, Tipo.CREACION)
+        self.assertIsNone(movimiento.usuario)
+
+    def test_edicion(self):
+        response = self.client.post(reverse('activos:activo-update', args=[self.activo.pk]), self.datos_formulario(
+            marca='Otra', ubicacion=self.bodega.pk, estado=Activo.EstadoActivo.INACTIVO,
+        ))
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.movimientos(), {
+            (Tipo.ACTUALIZACION, 'marca', 'Marca', 'Otra', 'admin'),
+            (Tipo.REUBICACION, 'ubicacion', 'Sede', 'Bodega', 'admin'),
+            (Tipo.CAMBIO_ESTADO, 'estado', 'Activo', 'Inactivo', 'admin'),
+        })
+
+        # Guardar sin cambios no agrega movimientos
+        self.ultimo = HistorialMovimiento.objects.order_by('-pk').values_list('pk', flat=True).first()
+        self.client.post(reverse('activos:activo-update', args=[self.activo.pk]), self.datos_formulario(
+            marca='Otra', ubicacion=self.bodega.pk, estado=Activo.EstadoActivo.INACTIVO,
+        ))
+        self.assertEqual(self.movimientos(), set())
+
+    def test_reasignar_y_reubicar(self):
+        self.client.post(reverse('activos:activo-reasignar', args=[self.activo.pk]), {
+            'usuario_asignado': self.ana.pk,
+        })
+        self.client.post(reverse('activos:activo-reubicar', args=[self.activo.pk]), {
+            'ubicacion': self.bodega.pk,
+        })
+        self.assertEqual(self.movimientos(), {
+            (Tipo.REASIGNACION, 'usuario asignado', 'Sin asignar', 'Ana Pérez', 'admin'),
+            (Tipo.REUBICACION, 'ubicacion', 'Sede', 'Bodega', 'admin'),
+        })
+
+    def test_admin(self):
+        response = self.client.post(
+            reverse('admin:activos_activo_change', args=[self.activo.pk]),
+            self.datos_formulario(usuario_asignado=self.ana.pk, modelo='Nuevo'),
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.movimientos(), {
+            (Tipo.REASIGNACION, 'usuario asignado', 'Sin asignar', 'Ana Pérez', 'admin'),
+            (Tipo.ACTUALIZACION, 'modelo', 'Modelo', 'Nuevo', 'admin'),
+        })
+
+    def test_estado_por_mantenimiento(self):
+        response = self.client.post(reverse('mantenimientos:mantenimiento-create'), {
+            'activo': self.activo.pk,
+            'tecnico': 'Técnico',
+            'telefono': '123',
+            'descripcion': 'Revisión',
+            'costo': '10',
+            'estado': Mantenimiento.EstadoMantenimiento.EN_PROCESO,
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.movimientos(), {
+            (Tipo.CAMBIO_ESTADO, 'estado', 'Activo', 'En Mantenimiento', 'admin'),
+        })
+
+    def test_guardado_sin_lote(self):
+        # Fuera de un lote cada save() inserta sus movimientos, sin usuario
+        self.activo.ubicacion = self.bodega
+        self.activo.save()
+        self.assertEqual(self.movimientos(), {
+            (Tipo.REUBICACION, 'ubicacion', 'Sede', 'Bodega', None),
+        })
+
+    def test_un_insert_por_lote(self):
+        otro = Activo.objects.create(
+            subcategoria=self.subcategoria, ubicacion=self.sede,
+            marca='Marca', modelo='Modelo', codigo_inventario='OTRO',
+        )
+        self.ultimo = HistorialMovimiento.objects.order_by('-pk').values_list('pk', flat=True).first()
+        with CaptureQueriesContext(connection) as consultas:
+            with lote_historial(self.admin) as lote:
+                for activo in (self.activo, otro):
+                    activo.ubicacion = self.bodega
+                    activo.usuario_asignado = self.ana
+                    activo.save()
+                self.assertEqual(len(lote.pendientes), 4)
+                # Una consulta por modelo relacionado para las etiquetas y un INSERT
+                with self.assertNumQueries(3):
+                    lote.guardar()
+        inserciones = [
+            q for q in consultas.captured_queries
+            if q['sql'].startswith('INSERT') and HistorialMovimiento._meta.db_table in q['sql']
+        ]
+        self.assertEqual(len(inserciones), 1)
+        self.assertEqual(HistorialMovimiento.objects.filter(pk__gt=self.ultimo).count(), 4)
+
+    def test_lote_anidado_revertido(self):
+        with lote_historial(self.admin) as lote:
+            self.activo.ubicacion = self.bodega
+            self.activo.save()
+            try:
+                with lote_historial():
+                    self.activo.estado = Activo.EstadoActivo.INACTIVO
+                    self.activo.save()
+                    raise ValueError
+            except ValueError:
+                pass
+            self.assertEqual(len(lote.pendientes), 1)
+        self.assertEqual(self.movimientos(), {
+            (Tipo.REUBICACION, 'ubicacion', 'Sede', 'Bodega', 'admin'),
+        })
+
+
+class AccionesMasivasTests(TestCase):
+    """Acciones masivas: cambio en lote, historial y redirección segura"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'clave')
+        subcategoria = SubCategoria.objects.create(
+            nombre='Laptop', categoria=Categoria.objects.create(nombre='Cómputo')
+        )
+        cls.sede = Ubicacion.objects.create(nombre='Sede')
+        cls.bodega = Ubicacion.objects.create(nombre='Bodega')
+        cls.activos = [
+            Activo.objects.create(
+                subcategoria=subcategoria,
+                ubicacion=cls.bodega if i == 0 else cls.sede,
+                marca='Marca',
+                modelo='Modelo',
+                codigo_inventario=f'COD{i}',
+            )
+            for i in range(3)
+        ]
+
+    def test_actualizar_activos(self):
+        ids = [activo.pk for activo in self.activos]
+        inexistente = max(ids) + 100
+        historial_antes = HistorialMovimiento.objects.count()
+
+        with CaptureQueriesContext(connection) as consultas:
+            resultados = actualizar_activos(ids + [inexistente], 'ubicacion_id', self.bodega.pk, self.admin)
+
+        self.assertEqual(resultados, {
+            ids[0]: SIN_CAMBIOS, ids[1]: ACTUALIZADO, ids[2]: ACTUALIZADO, inexistente: NO_ENCONTRADO,
+        })
+        self.assertEqual(
+            set(Activo.objects.values_list('ubicacion_id', flat=True)), {self.bodega.pk}
+        )
+        # Un movimiento por activo modificado, insertados con un solo INSERT
+        movimientos = HistorialMovimiento.objects.order_by('pk')[historial_antes:]
+        self.assertEqual(sorted(m.activo_id for m in movimientos), ids[1:])
+        for movimiento in movimientos:
+            self.assertEqual(movimiento.tipo_movimiento, HistorialMovimiento.TipoMovimiento.REUBICACION)
+            self.assertEqual((movimiento.valor_anterior, movimiento.valor_nuevo), ('Sede', 'Bodega'))
+            self.assertEqual(movimiento.usuario, self.admin)
+        inserciones = [
+            q for q in consultas.captured_queries
+            if q['sql'].startswith('INSERT') and HistorialMovimiento._meta.db_table in q['sql']
+        ]
+        self.assertEqual(len(inserciones), 1)
+
+    def post_accion(self, **extra):
+        self.client.force_login(self.admin)
+        datos = {
+            'activos_seleccionados': [str(self.activos[1].pk)],
+            'accion': 'estado',
+            'estado': Activo.EstadoActivo.INACTIVO,
+        }
+        datos.update(extra.pop('datos', {}))
+        return self.client.post(reverse('activos:activo-acciones-masivas'), datos, **extra)
+
+    def test_ids_invalidos(self):
+        # isdigit() acepta '²', que int() no convierte
+        response = self.post_accion(datos={'activos_seleccionados': ['²', 'x']})
+        self.assertRedirects(response, reverse('activos:activo-list'), fetch_redirect_response=False)
+        response = self.post_accion(
+            datos={'activos_seleccionados': ['²', str(self.activos[1].pk)]}, HTTP_ACCEPT='application/json'
+        )
+        self.assertEqual(response.json()['resultados'], {str(self.activos[1].pk): ACTUALIZADO})
+
+    def test_redireccion_interna(self):
+        lista = reverse('activos:activo-list') + '?estado=AC'
+        response = self.post_accion(datos={'next': lista})
+        self.assertRedirects(response, lista, fetch_redirect_response=False)
+        response = self.post_accion(HTTP_REFERER=f'http://testserver{lista}')
+        self.assertRedirects(response, f'http://testserver{lista}', fetch_redirect_response=False)
+
+    def test_redireccion_externa(self):
+        lista = reverse('activos:activo-list')
+        for extra in (
+            {'HTTP_REFERER': 'https://otro.example.com/'},
+            {'datos': {'next': '//otro.example.com/'}},
+            {'datos': {'next': 'https://otro.example.com/'}, 'HTTP_REFERER': 'javascript:alert(1)'},
+        ):
+            response = self.post_accion(**extra)
+            self.assertRedirects(response, lista, fetch_redirect_response=False)
+        # Con un error de validación también se vuelve a una URL segura
+        response = self.post_accion(
+            datos={'activos_seleccionados': []}, HTTP_REFERER='https://otro.example.com/'
+        )
+        self.assertRedirects(response, lista, fetch_redirect_response=False)
+
+
+@mock.patch.object(ActivoListView, 'paginate_by', 3)
+class PaginacionCursorTests(TestCase):
+    """Paginación por cursor del listado de activos (ver core.paginacion)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'clave')
+        subcategoria = SubCategoria.objects.create(
+            nombre='Laptop', categoria=Categoria.objects.create(nombre='Cómputo')
+        )
+        ubicacion = Ubicacion.objects.create(nombre='Sede')
+        activos = [
+            Activo.objects.create(
+                subcategoria=subcategoria,
+                ubicacion=ubicacion,
+                marca='Marca',
+                modelo='Modelo',
+                codigo_inventario=f'COD{i}',
+            )
+            for i in range(8)
+        ]
+        # Empates en la primera columna del orden: varias páginas comparten
+        # la misma fecha de creación y el mismo costo
+        ahora = timezone.now()
+        for i, activo in enumerate(activos):
+            Activo.objects.filter(pk=activo.pk).update(
+                fecha_creacion=ahora - timedelta(days=i // 5),
+                costo_mantenimiento_total=Decimal(100 * (i % 2)),
+            )
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def pagina(self, **parametros):
+        parametros['paginacion'] = 'cursor'
+        response = self.client.get(reverse('activos:activo-list'), parametros)
+        self.assertEqual(response.status_code, 200)
+        return response.context['page_obj']
+
+    def recorrer(self, orden_esperado, **parametros):
+        """Avanza hasta la última página y vuelve a la primera"""
+        paginas = [self.pagina(**parametros)]
+        self.assertFalse(paginas[0].has_previous())
+        while paginas[-1].has_next():
+            self.assertLess(len(paginas), 3, 'El cursor no avanza')
+            paginas.append(self.pagina(cursor=paginas[-1].cursor_siguiente, **parametros))
+        vistos = [activo.pk for pagina in paginas for activo in pagina]
+        self.assertEqual(vistos, orden_esperado)
+
+        ids_por_pagina = [[activo.pk for activo in pagina] for pagina in paginas]
+        pagina = paginas[-1]
+        for esperados in reversed(ids_por_pagina[:-1]):
+            self.assertTrue(pagina.has_previous())
+            pagina = self.pagina(cursor=pagina.cursor_anterior, **parametros)
+            self.assertEqual([activo.pk for activo in pagina], esperados)
+        self.assertFalse(pagina.has_previous())
+        self.assertTrue(pagina.has_next())
+
+    def test_orden_por_fecha(self):
+        esperado = list(Activo.objects.order_by('-fecha_creacion', '-id').values_list('pk', flat=True))
+        self.recorrer(esperado)
+
+    def test_orden_por_costo(self):
+        esperado = list(
+            Activo.objects.order_by('-costo_mantenimiento_total', '-id').values_list('pk', flat=True)
+        )
+        self.recorrer(esperado, orden='costo')
+
+    def test_conteo_opcional(self):
+        self.assertIsNone(self.pagina().total)
+        self.assertEqual(self.pagina(contar=1).total, 8)
+
+    def test_cursor_invalido(self):
+        valido = self.pagina().cursor_siguiente
+        url = reverse('activos:activo-list')
+        for cursor in (
+            'no-es-base64!',
+            valido[:-4],
+            'WzAsIjIwMjQtMDEtMDEiXQ',  # [0,"2024-01-01"]: falta una columna
+            'WzAsImF5ZXIiLCIxIl0',  # [0,"ayer","1"]: fecha inválida
+            'eyJhIjoxfQ',  # {"a":1}: no es una lista
+            'MQ',  # 1
+        ):
+            response = self.client.get(url, {'paginacion': 'cursor', 'cursor': cursor})
+            self.assertEqual(response.status_code, 404, cursor)
+
+
+class GenerarDatosSinteticosTests(TestCase):
+    """Comando `generar_datos_sinteticos` con tamaños mínimos"""
+
+    opciones = {
+        'categorias': 2, 'subcategorias': 2, 'ubicaciones': 3, 'usuarios': 5, 'activos': 20,
+        'mantenimientos': 40, 'movimientos': 30, 'lote': 7, 'hasta': '2024-06-30', 'semilla': 7,
+    }
+
+    def generar(self, **opciones):
+        argumentos = []
+        for nombre, valor in {**self.opciones, **opciones}.items():
+            argumentos += [f'--{nombre}', str(valor)]
+        call_command('generar_datos_sinteticos', *argumentos, stdout=io.StringIO())
+
+    def datos(self):
+        """Activos y mantenimientos generados, sin ids"""
+        activos = list(Activo.objects.order_by('codigo_inventario').values_list(
+            'codigo_inventario', 'marca', 'modelo', 'numero_serial', 'estado', 'fecha_creacion',
+            'costo_mantenimiento_total',
+        ))
+        mantenimientos = list(Mantenimiento.objects.order_by(
+            'activo__codigo_inventario', 'fecha', 'costo', 'estado'
+        ).values_list('activo__codigo_inventario', 'fecha', 'costo', 'estado'))
+        return activos, mantenimientos
+
+    def test_reproducible(self):
+        with transaction.atomic():
+            self.generar()
+            primera = self.datos()
+            transaction.set_rollback(True)
+        self.generar()
+        self.assertEqual(self.datos(), primera)
+        activos, mantenimientos = primera
+        self.assertEqual((len(activos), len(mantenimientos)), (20, 40))
+        self.assertTrue(all(codigo.startswith('SIN-') for codigo, *_resto in activos))
+        self.assertLessEqual(max(fila[5] for fila in activos).date(), date(2024, 6, 30))
+
+        with transaction.atomic():
+            self.generar(prefijo='OTRO', semilla=8)
+            self.assertNotEqual(
+                [fila[1:] for fila in self.datos()[0] if fila[0].startswith('OTRO-')],
+                [fila[1:] for fila in activos],
+            )
+            transaction.set_rollback(True)
+
+    def test_resumenes_consistentes(self):
+        self.generar()
+        self.assertEqual(contadores.verificar(), [])
+        self.assertEqual(costos.verificar(), [])
+        self.assertEqual(sum(contadores.resumen_estados().values()), Activo.objects.count())
+        # Los activos con mantenimientos abiertos quedan en mantenimiento
+        self.assertFalse(
+            Activo.objects.filter(mantenimientos_abiertos__gt=0).exclude(
+                estado=Activo.EstadoActivo.EN_MANTENIMIENTO
+            ).exists()
+        )
 
-# Create your tests here.
+    def test_prefijo_existente(self):
+        self.generar(activos=1, mantenimientos=0, movimientos=0)
+        with self.assertRaises(CommandError):
+            self.generar(activos=1, mantenimientos=0, movimientos=0)
@@ -15,6 +15,7 @@ urlpatterns = [
     path('subcategorias/crear/', views.SubCategoriaCreateView.as_view(), name='subcategoria-create'),
     path('subcategorias/<int:pk>/editar/', views.SubCategoriaUpdateView.as_view(), name='subcategoria-update'),
     path('subcategorias/<int:pk>/eliminar/', views.SubCategoriaDeleteView.as_view(), name='subcategoria-delete'),
+    path('subcategorias/api/', views.subcategorias_api, name='subcategoria-api'),
     
     # URLs de Ubicación
     path('ubicaciones/', views.UbicacionListView.as_view(), name='ubicacion-list'),
@@ -33,5 +34,7 @@ urlpatterns = [
     path('<int:pk>/reasignar/', views.reasignar_activo, name='activo-reasignar'),
     path('<int:pk>/reubicar/', views.reubicar_activo, name='activo-reubicar'),
     path('<int:pk>/historial/', views.ActivoHistorialView.as_view(), name='activo-historial'),
+    path('acciones-masivas/', views.acciones_masivas, name='activo-acciones-masivas'),
+    path('autocompletar/', views.autocompletar_activos, name='activo-autocompletar'),
 ]
 
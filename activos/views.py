@@ -1,3 +1,4 @@
+from collections import Counter, defaultdict
 from django.shortcuts import render, redirect, get_object_or_404
 from django.urls import reverse_lazy
 from django.views.generic import (
@@ -7,11 +8,25 @@ from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib import messages
 from django.db.models import Q, Count
 from .models import Categoria, SubCategoria, Ubicacion, Activo, HistorialMovimiento
+from .busqueda import filtrar_activos
+from . import contadores
+from .historial import lote_historial
+from .acciones import ACCIONES, ACTUALIZADO, SIN_CAMBIOS, NO_ENCONTRADO, actualizar_activos
 from .forms import (
     CategoriaForm, SubCategoriaForm, UbicacionForm, 
-    ActivoForm, ActivoFilterForm, ReasignarActivoForm, ReubicarActivoForm
+    ActivoForm, ActivoFilterForm, ReasignarActivoForm, ReubicarActivoForm,
+    AccionMasivaForm
 )
 from django.contrib.auth.decorators import login_required
+from django.http import HttpResponseRedirect, JsonResponse
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition, require_POST
+from core import catalogos
+from core.autocompletar import respuesta_autocompletar, terminos
+from core.navegacion import url_de_retorno
+from core.paginacion import CursorPaginationMixin
 
 # ============== VISTAS DE CATEGORÍA ==============
 class CategoriaListView(LoginRequiredMixin, ListView):
@@ -19,6 +34,12 @@ class CategoriaListView(LoginRequiredMixin, ListView):
     template_name = 'activos/categoria_list.html'
     context_object_name = 'categorias'
     paginate_by = 20
+    
+    def get_queryset(self):
+        # Con GROUP BY Django no aplica el orden del Meta
+        return super().get_queryset().annotate(
+            total_subcategorias=Count('subcategorias')
+        ).order_by('nombre')
 
 
 class CategoriaCreateView(LoginRequiredMixin, CreateView):
@@ -48,6 +69,9 @@ class CategoriaDeleteView(LoginRequiredMixin, DeleteView):
     template_name = 'activos/categoria_confirm_delete.html'
     success_url = reverse_lazy('activos:categoria-list')
     
+    def get_queryset(self):
+        return super().get_queryset().annotate(total_subcategorias=Count('subcategorias'))
+    
     def delete(self, request, *args, **kwargs):
         self.object = self.get_object()
         
@@ -170,11 +194,19 @@ class UbicacionDeleteView(LoginRequiredMixin, DeleteView):
 
 # ============== VISTAS DE ACTIVO ==============
 
-class ActivoListView(LoginRequiredMixin, ListView):
+class ActivoListView(LoginRequiredMixin, CursorPaginationMixin, ListView):
     model = Activo
     template_name = 'activos/activo_list.html'
     context_object_name = 'activos'
     paginate_by = 25
+    cursor_ordering = ['-fecha_creacion', '-id']
+    # Órdenes alternativos del listado (parámetro `orden`)
+    ordenes = {
+        'costo': ['-costo_mantenimiento_total', '-id'],
+    }
+    
+    def get_cursor_ordering(self):
+        return self.ordenes.get(self.request.GET.get('orden'), super().get_cursor_ordering())
     
     def get_queryset(self):
         queryset = super().get_queryset().select_related(
@@ -182,50 +214,38 @@ class ActivoListView(LoginRequiredMixin, ListView):
         )
         
         # Filtros
-        categoria_id = self.request.GET.get('categoria')
-        subcategoria_id = self.request.GET.get('subcategoria')
-        ubicacion_id = self.request.GET.get('ubicacion')
-        estado = self.request.GET.get('estado')
-        buscar = self.request.GET.get('buscar')
-        
-        if categoria_id:
-            queryset = queryset.filter(subcategoria__categoria_id=categoria_id)
-        if subcategoria_id:
-            queryset = queryset.filter(subcategoria_id=subcategoria_id)
-        if ubicacion_id:
-            queryset = queryset.filter(ubicacion_id=ubicacion_id)
-        if estado:
-            queryset = queryset.filter(estado=estado)
-        if buscar:
-            queryset = queryset.filter(
-                Q(codigo_inventario__icontains=buscar) |
-                Q(marca__icontains=buscar) |
-                Q(modelo__icontains=buscar) |
-                Q(numero_serial__icontains=buscar)
-            )
-        
+        orden = self.ordenes.get(self.request.GET.get('orden'))
+        queryset = filtrar_activos(
+            queryset, self.request.GET, ordenar=not self.usar_cursor() and orden is None
+        )
+        if orden is not None:
+            queryset = queryset.order_by(*orden)
         return queryset
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['filter_form'] = ActivoFilterForm(self.request.GET or None)
-        context['total_activos'] = self.get_queryset().count()
+        context['accion_masiva_form'] = AccionMasivaForm()
+        if context['paginacion_cursor']:
+            context['total_activos'] = context['page_obj'].total
+        else:
+            context['total_activos'] = context['paginator'].count
         
         # Estadísticas para el dashboard
         # Total de activos por categoría (top 5 con activos)
-        context['activos_por_categoria'] = Categoria.objects.annotate(
-            total_activos=Count('subcategorias__activos')
-        ).filter(total_activos__gt=0).order_by('-total_activos')[:5]
+        context['activos_por_categoria'] = Categoria.objects.filter(
+            total_activos__gt=0
+        ).order_by('-total_activos')[:5]
         
         # Total de activos por ubicación (top 5 con activos)
-        context['activos_por_ubicacion'] = Ubicacion.objects.annotate(
-            total_activos=Count('activos')
-        ).filter(total_activos__gt=0).order_by('-total_activos')[:5]
+        context['activos_por_ubicacion'] = Ubicacion.objects.filter(
+            total_activos__gt=0
+        ).order_by('-total_activos')[:5]
         
         # Estadísticas generales
         context['total_categorias'] = Categoria.objects.count()
         context['total_ubicaciones'] = Ubicacion.objects.count()
-        context['total_activos_sistema'] = Activo.objects.count()
+        context['total_activos_sistema'] = sum(contadores.resumen_estados().values())
         
         return context
 
@@ -248,8 +268,10 @@ class ActivoCreateView(LoginRequiredMixin, CreateView):
     success_url = reverse_lazy('activos:activo-list')
     
     def form_valid(self, form):
+        with lote_historial(self.request.user):
+            response = super().form_valid(form)
         messages.success(self.request, 'Activo creado exitosamente.')
-        return super().form_valid(form)
+        return response
 
 
 class ActivoUpdateView(LoginRequiredMixin, UpdateView):
@@ -258,9 +280,15 @@ class ActivoUpdateView(LoginRequiredMixin, UpdateView):
     template_name = 'activos/activo_form.html'
     success_url = reverse_lazy('activos:activo-list')
     
+    def get_queryset(self):
+        # El formulario parte de la categoría de la subcategoría actual
+        return super().get_queryset().select_related('subcategoria')
+    
     def form_valid(self, form):
+        with lote_historial(self.request.user):
+            response = super().form_valid(form)
         messages.success(self.request, 'Activo actualizado exitosamente.')
-        return super().form_valid(form)
+        return response
 
 
 class ActivoDeleteView(LoginRequiredMixin, DeleteView):
@@ -268,6 +296,11 @@ class ActivoDeleteView(LoginRequiredMixin, DeleteView):
     template_name = 'activos/activo_confirm_delete.html'
     success_url = reverse_lazy('activos:activo-list')
     
+    def get_queryset(self):
+        return super().get_queryset().select_related(
+            'subcategoria__categoria', 'ubicacion', 'usuario_asignado'
+        )
+    
     def delete(self, request, *args, **kwargs):
         messages.success(self.request, 'Activo eliminado exitosamente.')
         return super().delete(request, *args, **kwargs)
@@ -283,7 +316,8 @@ def reasignar_activo(request, pk):
     if request.method == 'POST':
         form = ReasignarActivoForm(request.POST, instance=activo)
         if form.is_valid():
-            form.save()
+            with lote_historial(request.user):
+                form.save()
             messages.success(request, f'Activo {activo.codigo_inventario} reasignado exitosamente.')
             return redirect('activos:activo-detail', pk=pk)
     else:
@@ -303,7 +337,8 @@ def reubicar_activo(request, pk):
     if request.method == 'POST':
         form = ReubicarActivoForm(request.POST, instance=activo)
         if form.is_valid():
-            form.save()
+            with lote_historial(request.user):
+                form.save()
             messages.success(request, f'Activo {activo.codigo_inventario} reubicado exitosamente.')
             return redirect('activos:activo-detail', pk=pk)
     else:
@@ -315,14 +350,114 @@ def reubicar_activo(request, pk):
     })
 
 
+@login_required
+@require_POST
+def acciones_masivas(request):
+    """
+    Aplica una reasignación, reubicación o cambio de estado a los activos
+    seleccionados con un único UPDATE.
+    
+    Responde JSON con el resultado por activo si el cliente lo solicita;
+    en caso contrario redirige con un resumen.
+    """
+    form = AccionMasivaForm(request.POST)
+    ids = [pk for pk in request.POST.getlist('activos_seleccionados') if pk.isdecimal()]
+    quiere_json = not request.accepts('text/html')
+    
+    if not ids or not form.is_valid():
+        errores = form.errors.get_json_data() if form.errors else {}
+        if not ids:
+            errores['activos_seleccionados'] = [{'message': 'Debe seleccionar al menos un activo.'}]
+        if quiere_json:
+            return JsonResponse({'errores': errores}, status=400)
+        for lista in errores.values():
+            for error in lista:
+                messages.error(request, error['message'])
+        return HttpResponseRedirect(url_de_retorno(request, 'activos:activo-list'))
+    
+    campo = ACCIONES[form.cleaned_data['accion']]
+    resultados = actualizar_activos(ids, campo, form.valor(), usuario=request.user)
+    resumen = Counter(resultados.values())
+    
+    if quiere_json:
+        return JsonResponse({
+            'resultados': {str(pk): resultado for pk, resultado in resultados.items()},
+            'resumen': dict(resumen),
+        })
+    
+    messages.success(
+        request,
+        f'{resumen[ACTUALIZADO]} activos actualizados, {resumen[SIN_CAMBIOS]} sin cambios.'
+    )
+    if resumen[NO_ENCONTRADO]:
+        messages.warning(request, f'{resumen[NO_ENCONTRADO]} activos no fueron encontrados.')
+    return HttpResponseRedirect(url_de_retorno(request, 'activos:activo-list'))
+
+
 class ActivoHistorialView(LoginRequiredMixin, DetailView):
     """Vista para mostrar el historial de movimientos de un activo"""
     model = Activo
     template_name = 'activos/activo_historial.html'
     context_object_name = 'activo'
     
+    def get_queryset(self):
+        return super().get_queryset().select_related(
+            'subcategoria__categoria', 'ubicacion', 'usuario_asignado'
+        )
+    
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        activo = self.get_object()
-        context['historial'] = activo.historial_movimientos.all().order_by('-fecha_movimiento')
+        context['historial'] = self.object.historial_movimientos.select_related('usuario').order_by('-fecha_movimiento')
         return context
+
+
+@login_required
+def autocompletar_activos(request):
+    """Activos cuyo código de inventario o serial empieza por el texto buscado (JSON)"""
+    queryset = Activo.objects.only('codigo_inventario', 'marca', 'modelo').order_by('codigo_inventario')
+    for termino in terminos(request):
+        queryset = queryset.filter(
+            Q(codigo_inventario__istartswith=termino) | Q(numero_serial__istartswith=termino)
+        )
+    return respuesta_autocompletar(queryset)
+
+
+def _arbol_subcategorias(version):
+    """Lista [id, nombre, [[id, nombre], ...]] de categorías con sus subcategorías"""
+    def construir():
+        por_categoria = defaultdict(list)
+        for pk, nombre, categoria_id in SubCategoria.objects.order_by('nombre').values_list(
+            'pk', 'nombre', 'categoria_id'
+        ):
+            por_categoria[categoria_id].append([pk, nombre])
+        return [
+            [pk, nombre, por_categoria.get(pk, [])]
+            for pk, nombre in Categoria.objects.values_list('pk', 'nombre')
+        ]
+    
+    timeout = getattr(settings, 'CATALOGOS_TTL', 300)
+    return cache.get_or_set(f'activos:arbol-subcategorias:{version}', construir, timeout)
+
+
+def _etag_subcategorias(request):
+    # La versión del catálogo cambia con cualquier alta, cambio o baja de
+    # categorías o subcategorías (ver core.catalogos)
+    return f"{catalogos.version(SubCategoria)}-{request.GET.get('categoria', '')}"
+
+
+@login_required
+@condition(etag_func=_etag_subcategorias)
+def subcategorias_api(request):
+    """
+    Subcategorías de `?categoria=<id>` o, sin parámetro, el árbol completo
+    de categorías y subcategorías (JSON). El navegador revalida con ETag.
+    """
+    arbol = _arbol_subcategorias(catalogos.version(SubCategoria))
+    categoria = request.GET.get('categoria', '')
+    if categoria:
+        subcategorias = next((subs for pk, _nombre, subs in arbol if str(pk) == categoria), [])
+        response = JsonResponse({'subcategorias': subcategorias})
+    else:
+        response = JsonResponse({'categorias': arbol})
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
@@ -0,0 +1,89 @@
+"""
+Selects cuyas opciones se obtienen bajo demanda desde un endpoint JSON.
+
+En lugar de un <select> con todas las filas, estos widgets solo incluyen la
+opción vacía y la opción elegida:
+
+- `AutocompletarSelect` (activos, usuarios): el script
+  `core/js/autocompletar.js` consulta el endpoint de `data-autocompletar` a
+  medida que se escribe. Los endpoints filtran por prefijo (columnas con
+  índices `text_pattern_ops`) y limitan los resultados con
+  `respuesta_autocompletar`.
+- `DependienteSelect` (subcategorías): `core/js/dependiente.js` carga las
+  opciones de `data-opciones` según el valor del campo `data-depende-de`.
+"""
+import copy
+
+from django import forms
+from django.http import JsonResponse
+from django.urls import reverse
+
+LIMITE = 20
+
+
+class OpcionesRemotasSelect(forms.Select):
+    """Select de un ModelChoiceField que solo renderiza las opciones elegidas"""
+
+    def __init__(self, url, attrs=None):
+        super().__init__(attrs)
+        self.url = url
+
+    def atributos_remotos(self):
+        """Atributos data-* que usa el script del widget"""
+        return {}
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        context['widget']['attrs'].update(self.atributos_remotos())
+        return context
+
+    def opciones_seleccionadas(self, valores):
+        """Opción vacía y etiquetas de los valores elegidos (una consulta si hay alguno)"""
+        field = self.choices.field
+        opciones = []
+        if field.empty_label is not None:
+            opciones.append(('', field.empty_label))
+        pks = [valor for valor in valores if str(valor).isdecimal()]
+        if pks:
+            opciones += [
+                (obj.pk, field.label_from_instance(obj))
+                for obj in self.choices.queryset.filter(pk__in=pks)
+            ]
+        return opciones
+
+    def optgroups(self, name, value, attrs=None):
+        widget = copy.copy(self)
+        widget.choices = self.opciones_seleccionadas(value)
+        return super(OpcionesRemotasSelect, widget).optgroups(name, value, attrs)
+
+
+class AutocompletarSelect(OpcionesRemotasSelect):
+    """Select cuyas opciones se buscan en `url` a medida que se escribe"""
+
+    def atributos_remotos(self):
+        return {'data-autocompletar': reverse(self.url)}
+
+
+class DependienteSelect(OpcionesRemotasSelect):
+    """Select cuyas opciones dependen del valor elegido en el campo `depende_de`"""
+
+    def __init__(self, url, depende_de, attrs=None):
+        super().__init__(url, attrs)
+        self.depende_de = depende_de
+
+    def atributos_remotos(self):
+        return {'data-opciones': reverse(self.url), 'data-depende-de': self.depende_de}
+
+
+def terminos(request):
+    """Palabras del parámetro `q`"""
+    return request.GET.get('q', '').split()
+
+
+def respuesta_autocompletar(queryset, limite=LIMITE, etiqueta=str):
+    """JSON con los primeros `limite` resultados y si quedan más"""
+    filas = list(queryset[:limite + 1])
+    return JsonResponse({
+        'resultados': [{'id': obj.pk, 'texto': etiqueta(obj)} for obj in filas[:limite]],
+        'mas': len(filas) > limite,
+    })
@@ -0,0 +1,133 @@
+"""
+Caché de las tablas de referencia usadas en los <select> de los formularios.
+
+Cada catálogo registrado guarda en memoria del proceso la lista de opciones
+(pk, etiqueta) junto con la versión con la que se leyó. La versión vive en
+la caché de Django (`settings.CACHES`) y se renueva al confirmarse cualquier
+alta, cambio o baja del modelo (o de los modelos de los que dependen sus
+etiquetas). Al renderizar, `CatalogoChoiceField` compara la versión (una
+lectura de la caché) y solo vuelve a consultar la base de datos si cambió.
+
+Con varios procesos la caché de Django debe ser compartida (Redis o
+Memcached) para que la invalidación llegue a todos; `CATALOGOS_TTL` acota en
+cualquier caso la antigüedad de las opciones en memoria.
+
+Registro (en `AppConfig.ready`):
+
+    catalogos.registrar(SubCategoria, SubCategoria.objects.select_related('categoria'),
+                        depende_de=[Categoria])
+"""
+import threading
+import time
+import uuid
+
+from django import forms
+from django.conf import settings
+from django.contrib import admin
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.forms.models import ModelChoiceIterator
+
+_registro = {}
+_locales = {}
+_lock = threading.Lock()
+
+
+class Catalogo:
+    """Tabla de referencia registrada y la consulta que obtiene sus filas"""
+
+    def __init__(self, modelo, queryset=None):
+        self.modelo = modelo
+        self.queryset = queryset if queryset is not None else modelo._default_manager.all()
+        self.clave = f'catalogo:{modelo._meta.label_lower}:version'
+
+    def cargar(self):
+        return [(obj.pk, str(obj)) for obj in self.queryset.all()]
+
+
+def registrar(modelo, queryset=None, depende_de=()):
+    """
+    Registra `modelo` como catálogo.
+
+    `queryset` define las filas y el orden (por defecto, el manager del
+    modelo); `depende_de` lista los modelos que también aparecen en la
+    etiqueta.
+    """
+    catalogo = Catalogo(modelo, queryset)
+    _registro[modelo] = catalogo
+
+    def al_modificar(sender, **kwargs):
+        transaction.on_commit(lambda: invalidar(modelo))
+
+    for emisor in (modelo, *depende_de):
+        uid = f'catalogo:{modelo._meta.label_lower}:{emisor._meta.label_lower}'
+        post_save.connect(al_modificar, sender=emisor, weak=False, dispatch_uid=uid)
+        post_delete.connect(al_modificar, sender=emisor, weak=False, dispatch_uid=uid)
+    return catalogo
+
+
+def version(modelo):
+    """Versión actual del catálogo según la caché compartida"""
+    clave = _registro[modelo].clave
+    actual = cache.get(clave)
+    if actual is None:
+        cache.add(clave, uuid.uuid4().hex, None)
+        actual = cache.get(clave)
+    return actual
+
+
+def invalidar(modelo):
+    """Renueva la versión del catálogo; los procesos recargan en la próxima lectura"""
+    cache.set(_registro[modelo].clave, uuid.uuid4().hex, None)
+
+
+def opciones(modelo):
+    """Lista de opciones (pk, etiqueta) del catálogo"""
+    catalogo = _registro[modelo]
+    # La versión se lee antes de consultar: un cambio durante la carga la
+    # renueva y fuerza una nueva lectura en el siguiente acceso
+    vigente = version(modelo)
+    ttl = getattr(settings, 'CATALOGOS_TTL', 300)
+    local = _locales.get(modelo)
+    if local is not None and local[0] == vigente and time.monotonic() - local[2] < ttl:
+        return local[1]
+
+    datos = catalogo.cargar()
+    with _lock:
+        _locales[modelo] = (vigente, datos, time.monotonic())
+    return datos
+
+
+class CatalogoChoiceIterator(ModelChoiceIterator):
+    """Itera las opciones desde la caché del catálogo en lugar del queryset"""
+
+    def _opciones(self):
+        return opciones(self.queryset.model)
+
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ('', self.field.empty_label)
+        yield from self._opciones()
+
+    def __len__(self):
+        return len(self._opciones()) + (self.field.empty_label is not None)
+
+    def __bool__(self):
+        return self.field.empty_label is not None or bool(self._opciones())
+
+
+class CatalogoChoiceField(forms.ModelChoiceField):
+    """
+    ModelChoiceField que renderiza sus opciones desde el catálogo en caché.
+
+    La validación del valor enviado sigue usando el queryset del campo.
+    """
+    iterator = CatalogoChoiceIterator
+
+
+class CatalogoListFilter(admin.RelatedFieldListFilter):
+    """Filtro del admin por un modelo relacionado que toma sus opciones del catálogo"""
+
+    def field_choices(self, field, request, model_admin):
+        return opciones(field.related_model)
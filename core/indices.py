@@ -0,0 +1,32 @@
+"""
+Índices para búsquedas por prefijo sin distinguir mayúsculas.
+
+En PostgreSQL `campo__istartswith='texto'` se traduce a
+`UPPER(campo::text) LIKE UPPER('texto%')`, que solo puede usar un índice
+sobre `UPPER(campo)` con la clase de operadores `text_pattern_ops` (la
+intercalación de la base de datos no garantiza el orden de bytes que
+necesita LIKE). En otros motores (SQLite en desarrollo) el índice se crea
+sobre la expresión, sin la clase de operadores.
+"""
+from django.contrib.postgres.indexes import OpClass
+from django.db import models
+from django.db.models.functions import Upper
+
+
+class IndicePrefijo(models.Index):
+    """Índice cuyas clases de operadores (OpClass) solo se aplican en PostgreSQL"""
+
+    def create_sql(self, model, schema_editor, using='', **kwargs):
+        if schema_editor.connection.vendor == 'postgresql':
+            return super().create_sql(model, schema_editor, using=using, **kwargs)
+        _ruta, expresiones, opciones = self.deconstruct()
+        expresiones = [
+            expresion.get_source_expressions()[0] if isinstance(expresion, OpClass) else expresion
+            for expresion in expresiones
+        ]
+        return models.Index(*expresiones, **opciones).create_sql(model, schema_editor, using=using, **kwargs)
+
+
+def indice_prefijo(campo, name):
+    """Índice para `campo__istartswith`"""
+    return IndicePrefijo(OpClass(Upper(campo), name='text_pattern_ops'), name=name)
@@ -1,11 +1,18 @@
+import json
 import logging
 import traceback
-from django.http import HttpResponseServerError
+from contextlib import ExitStack
+from django.core.exceptions import PermissionDenied
+from django.http import Http404, HttpResponseServerError
 from django.template.loader import render_to_string
 from django.conf import settings
+from django.db import connections
+from django.utils.cache import patch_vary_headers
 from django.utils.deprecation import MiddlewareMixin
+from . import rendimiento
 
 logger = logging.getLogger(__name__)
+logger_rendimiento = logging.getLogger('core.rendimiento')
 
 
 class ErrorHandlingMiddleware(MiddlewareMixin):
@@ -17,6 +24,10 @@ class ErrorHandlingMiddleware(MiddlewareMixin):
         """
         Captura todas las excepciones no manejadas y las registra
         """
+        # 404 y 403 son respuestas esperadas: las resuelve Django
+        if isinstance(exception, (Http404, PermissionDenied)):
+            return None
+        
         # Obtener información del usuario
         user_info = "Anónimo"
         if hasattr(request, 'user') and request.user.is_authenticated:
@@ -88,3 +99,63 @@ class SecurityHeadersMiddleware(MiddlewareMixin):
         response['Referrer-Policy'] = 'strict-origin-when-cross-origin'
         
         return response
+
+
+class PerformanceMiddleware:
+    """
+    Middleware que mide cada solicitud: tiempo total, consultas SQL (cantidad
+    y tiempo) y tiempo de renderizado de plantillas.
+    
+    Registra en el logger `core.rendimiento` las solicitudes que superan
+    `RENDIMIENTO_UMBRAL_LENTO_MS` y acumula las estadísticas por nombre de
+    URL (ver core.rendimiento). El header Server-Timing, que expone tiempos
+    internos, solo se envía en DEBUG, con `RENDIMIENTO_SERVER_TIMING = True`
+    o a usuarios staff (en este caso con `Vary: Cookie`). Debe ir primero en
+    MIDDLEWARE para medir también al resto de los middlewares.
+    """
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+        rendimiento.instrumentar_plantillas()
+    
+    def __call__(self, request):
+        para_todos = settings.DEBUG or getattr(settings, 'RENDIMIENTO_SERVER_TIMING', False)
+        medicion = rendimiento.iniciar()
+        try:
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(connections[alias].execute_wrapper(medicion))
+                response = self.get_response(request)
+                # Dentro de la medición: leer el usuario puede consultar la sesión
+                mostrar = para_todos or self.es_staff(request)
+        finally:
+            rendimiento.finalizar()
+        
+        match = getattr(request, 'resolver_match', None)
+        vista = match.view_name if match else '<sin ruta>'
+        rendimiento.registrar(vista, medicion)
+        if mostrar:
+            response['Server-Timing'] = medicion.server_timing()
+        if not para_todos:
+            # El header depende del usuario de la sesión
+            patch_vary_headers(response, ['Cookie'])
+        
+        umbral = getattr(settings, 'RENDIMIENTO_UMBRAL_LENTO_MS', 500)
+        if umbral is not None and medicion.total * 1000 >= umbral:
+            registro = {
+                'vista': vista,
+                'metodo': request.method,
+                'ruta': request.path,
+                'estado': response.status_code,
+                **medicion.como_dict(),
+            }
+            logger_rendimiento.warning(
+                'Solicitud lenta %s', json.dumps(registro, ensure_ascii=False),
+                extra={'rendimiento': registro},
+            )
+        return response
+    
+    def es_staff(self, request):
+        """Indica si la solicitud es de un usuario staff"""
+        user = getattr(request, 'user', None)
+        return user is not None and user.is_staff
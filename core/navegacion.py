@@ -0,0 +1,20 @@
+"""
+URL de retorno después de una acción por POST.
+
+Se usa el parámetro `next` del formulario o, si no viene, el `Referer`,
+pero solo si apuntan a este mismo sitio; de lo contrario se vuelve a la
+URL por defecto. Así un enlace o un header manipulados no pueden
+redirigir al usuario a otro dominio.
+"""
+from django.shortcuts import resolve_url
+from django.utils.http import url_has_allowed_host_and_scheme
+
+
+def url_de_retorno(request, por_defecto):
+    """Retorna la URL segura a la que volver, o `por_defecto` (nombre de URL o ruta)"""
+    for url in (request.POST.get('next'), request.META.get('HTTP_REFERER')):
+        if url and url_has_allowed_host_and_scheme(
+            url, allowed_hosts={request.get_host()}, require_https=request.is_secure()
+        ):
+            return url
+    return resolve_url(por_defecto)
@@ -0,0 +1,163 @@
+"""
+Paginación por cursor (keyset) para las vistas de lista.
+
+La paginación por OFFSET de Django necesita un COUNT(*) completo y recorre
+todas las filas anteriores a la página pedida, por lo que las páginas
+profundas se vuelven cada vez más lentas. En modo cursor cada página se
+obtiene con un filtro sobre las columnas de ordenamiento del último (o
+primer) registro visto, de modo que la página N cuesta lo mismo que la 1.
+
+El modo es opcional: se activa con `?paginacion=cursor` y el conteo total
+solo se calcula si se pide con `?contar=1`.
+"""
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.http import Http404
+
+
+class PaginaCursor:
+    """Página obtenida con paginación por cursor"""
+
+    def __init__(self, object_list, cursor_anterior, cursor_siguiente, parametros, total=None):
+        self.object_list = object_list
+        self.cursor_anterior = cursor_anterior
+        self.cursor_siguiente = cursor_siguiente
+        self.total = total
+        self._parametros = parametros
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_previous(self):
+        return self.cursor_anterior is not None
+
+    def has_next(self):
+        return self.cursor_siguiente is not None
+
+    def has_other_pages(self):
+        return self.has_previous() or self.has_next()
+
+    def _url(self, cursor=None):
+        parametros = self._parametros.copy()
+        parametros.pop(CursorPaginationMixin.cursor_param, None)
+        if cursor:
+            parametros[CursorPaginationMixin.cursor_param] = cursor
+        return '?' + parametros.urlencode()
+
+    @property
+    def url_primera(self):
+        return self._url()
+
+    @property
+    def url_anterior(self):
+        return self._url(self.cursor_anterior)
+
+    @property
+    def url_siguiente(self):
+        return self._url(self.cursor_siguiente)
+
+
+class CursorPaginationMixin:
+    """
+    Agrega un modo de paginación por cursor a una ListView.
+
+    `cursor_ordering` define las columnas del cursor (p. ej.
+    `['-fecha_creacion', '-id']`); la última debe ser única para que el
+    orden sea estable. Las columnas no pueden contener valores nulos.
+    """
+    cursor_ordering = None
+    cursor_param = 'cursor'
+    modo_param = 'paginacion'
+    contar_param = 'contar'
+
+    def usar_cursor(self):
+        return self.request.GET.get(self.modo_param) == 'cursor'
+
+    def get_cursor_ordering(self):
+        return list(self.cursor_ordering)
+
+    def paginate_queryset(self, queryset, page_size):
+        if not self.usar_cursor():
+            return super().paginate_queryset(queryset, page_size)
+
+        ordenamiento = self.get_cursor_ordering()
+        campos = [(campo.lstrip('-'), campo.startswith('-')) for campo in ordenamiento]
+        total = queryset.count() if self.request.GET.get(self.contar_param) else None
+
+        cursor = self.request.GET.get(self.cursor_param)
+        hacia_atras = False
+        if cursor:
+            hacia_atras, valores = self._decodificar_cursor(queryset.model, campos, cursor)
+            queryset = queryset.filter(self._filtro_keyset(campos, valores, hacia_atras))
+
+        if hacia_atras:
+            invertido = [campo[1:] if campo.startswith('-') else '-' + campo for campo in ordenamiento]
+            queryset = queryset.order_by(*invertido)
+        else:
+            queryset = queryset.order_by(*ordenamiento)
+
+        filas = list(queryset[:page_size + 1])
+        hay_mas = len(filas) > page_size
+        filas = filas[:page_size]
+        if hacia_atras:
+            filas.reverse()
+
+        cursor_anterior = cursor_siguiente = None
+        if filas:
+            if hacia_atras:
+                cursor_anterior = self._codificar_cursor(campos, filas[0], True) if hay_mas else None
+                cursor_siguiente = self._codificar_cursor(campos, filas[-1], False)
+            else:
+                cursor_anterior = self._codificar_cursor(campos, filas[0], True) if cursor else None
+                cursor_siguiente = self._codificar_cursor(campos, filas[-1], False) if hay_mas else None
+
+        pagina = PaginaCursor(filas, cursor_anterior, cursor_siguiente, self.request.GET, total)
+        return (None, pagina, filas, pagina.has_other_pages())
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['paginacion_cursor'] = self.usar_cursor()
+        return context
+
+    @staticmethod
+    def _filtro_keyset(campos, valores, hacia_atras):
+        """Construye (a < x) OR (a = x AND b < y) ... según la dirección"""
+        filtro = Q()
+        for i, (campo, descendente) in enumerate(campos):
+            operador = 'lt' if descendente != hacia_atras else 'gt'
+            condicion = Q(**{f'{campo}__{operador}': valores[i]})
+            for j in range(i):
+                condicion &= Q(**{campos[j][0]: valores[j]})
+            filtro |= condicion
+        return filtro
+
+    @staticmethod
+    def _codificar_cursor(campos, objeto, hacia_atras):
+        valores = []
+        for campo, _ in campos:
+            valor = getattr(objeto, campo)
+            valores.append(valor.isoformat() if hasattr(valor, 'isoformat') else str(valor))
+        datos = json.dumps([int(hacia_atras)] + valores, separators=(',', ':'))
+        return base64.urlsafe_b64encode(datos.encode()).decode().rstrip('=')
+
+    @staticmethod
+    def _decodificar_cursor(modelo, campos, cursor):
+        try:
+            relleno = '=' * (-len(cursor) % 4)
+            datos = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+            if not isinstance(datos, list) or len(datos) != len(campos) + 1:
+                raise ValueError
+            hacia_atras, valores = bool(datos[0]), datos[1:]
+            valores = [
+                modelo._meta.get_field(campo).to_python(valor)
+                for (campo, _), valor in zip(campos, valores)
+            ]
+        except (ValueError, TypeError, IndexError, ValidationError):
+            raise Http404('Cursor de paginación inválido.')
+        return hacia_atras, valores
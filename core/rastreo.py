@@ -0,0 +1,72 @@
+"""
+Rastreo de los valores con los que una instancia fue leída de la base de datos.
+
+Los modelos que heredan de `RastreoCambiosMixin` guardan, al cargarse, los
+valores de `campos_rastreados` (por `attname`, p. ej. `ubicacion_id`). Los
+manejadores de señales comparan esos valores con los actuales para saber
+qué cambió sin volver a consultar la fila.
+"""
+
+
+class RastreoCambiosMixin:
+    """Mixin para modelos que necesitan conocer sus valores originales"""
+    campos_rastreados = ()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instancia = super().from_db(db, field_names, values)
+        instancia.guardar_valores_originales()
+        return instancia
+
+    def guardar_valores_originales(self, update_fields=None):
+        """
+        Toma una foto de los campos rastreados cargados en la instancia.
+
+        Si se indica `update_fields` solo se actualizan esos campos, ya que
+        son los únicos que se escribieron en la base de datos.
+        """
+        campos = self._campos_guardados(update_fields)
+        originales = dict(self.valores_originales or {})
+        originales.update({
+            campo: self.__dict__[campo]
+            for campo in campos
+            if campo in self.__dict__
+        })
+        self._valores_originales = originales
+
+    def recargar_valores_originales(self, campos):
+        """
+        Bloquea la fila (SELECT ... FOR UPDATE) y toma de ella los valores
+        originales de `campos`, de modo que los cambios se calculen contra la
+        fila que se va a reemplazar y no contra la que se leyó al cargar la
+        instancia, que otra solicitud pudo haber modificado. Debe llamarse
+        dentro de una transacción; retorna False si la fila ya no existe.
+        """
+        fila = (
+            type(self)._base_manager.select_for_update()
+            .filter(pk=self.pk).values(*campos).first()
+        )
+        if fila is None:
+            return False
+        self._valores_originales = {**(self.valores_originales or {}), **fila}
+        return True
+
+    @property
+    def valores_originales(self):
+        """Valores leídos de la base de datos, o None si la instancia es nueva"""
+        return getattr(self, '_valores_originales', None)
+
+    def campos_modificados(self, update_fields=None):
+        """Retorna {campo: (anterior, nuevo)} para los campos que cambiaron"""
+        originales = self.valores_originales or {}
+        return {
+            campo: (originales[campo], getattr(self, campo))
+            for campo in self._campos_guardados(update_fields)
+            if campo in originales and getattr(self, campo) != originales[campo]
+        }
+
+    def _campos_guardados(self, update_fields):
+        if update_fields is None:
+            return self.campos_rastreados
+        attnames = {self._meta.get_field(nombre).attname for nombre in update_fields}
+        return [campo for campo in self.campos_rastreados if campo in attnames]
@@ -0,0 +1,162 @@
+"""
+Métricas de rendimiento por solicitud (ver core.middleware.PerformanceMiddleware).
+
+Para cada solicitud se mide el tiempo total, la cantidad y el tiempo de las
+consultas SQL (con `execute_wrapper` sobre cada conexión) y el tiempo de
+renderizado de plantillas. Las mediciones se acumulan, por nombre de URL, en
+un buffer circular en memoria del proceso (`RENDIMIENTO_MUESTRAS` muestras
+por vista) del que se calculan percentiles para la vista de staff
+`core:rendimiento`. Cada proceso lleva sus propias estadísticas.
+"""
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+
+_local = threading.local()
+_lock = threading.Lock()
+_muestras = {}
+_totales = {}
+_plantillas_instrumentadas = False
+
+PERCENTILES = (50, 90, 99)
+
+
+class Medicion:
+    """Tiempos de una solicitud en curso"""
+
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.consultas = 0
+        self.tiempo_sql = 0.0
+        self.tiempo_plantillas = 0.0
+        self.profundidad_plantillas = 0
+        self.total = None
+
+    def __call__(self, execute, sql, params, many, context):
+        # Wrapper de ejecución SQL (connection.execute_wrapper)
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.consultas += 1
+            self.tiempo_sql += time.perf_counter() - inicio
+
+    def terminar(self):
+        self.total = time.perf_counter() - self.inicio
+
+    def server_timing(self):
+        """Valor del header Server-Timing (milisegundos)"""
+        return ', '.join([
+            f'total;dur={self.total * 1000:.1f}',
+            f'db;dur={self.tiempo_sql * 1000:.1f};desc="{self.consultas} consultas"',
+            f'tpl;dur={self.tiempo_plantillas * 1000:.1f}',
+        ])
+
+    def como_dict(self):
+        return {
+            'total_ms': round(self.total * 1000, 1),
+            'consultas': self.consultas,
+            'sql_ms': round(self.tiempo_sql * 1000, 1),
+            'plantillas_ms': round(self.tiempo_plantillas * 1000, 1),
+        }
+
+
+def medicion_actual():
+    return getattr(_local, 'medicion', None)
+
+
+def iniciar():
+    _local.medicion = Medicion()
+    return _local.medicion
+
+
+def finalizar():
+    medicion = _local.medicion
+    _local.medicion = None
+    medicion.terminar()
+    return medicion
+
+
+def instrumentar_plantillas():
+    """
+    Envuelve el render del backend de plantillas de Django para sumar su
+    tiempo a la medición en curso. Solo cuenta la plantilla de nivel superior
+    (los {% include %} y {% extends %} quedan dentro de su tiempo).
+    """
+    global _plantillas_instrumentadas
+    if _plantillas_instrumentadas:
+        return
+    from django.template.backends.django import Template
+
+    render_original = Template.render
+
+    def render(self, context=None, request=None):
+        medicion = medicion_actual()
+        if medicion is None:
+            return render_original(self, context, request)
+        medicion.profundidad_plantillas += 1
+        inicio = time.perf_counter()
+        try:
+            return render_original(self, context, request)
+        finally:
+            medicion.profundidad_plantillas -= 1
+            if not medicion.profundidad_plantillas:
+                medicion.tiempo_plantillas += time.perf_counter() - inicio
+
+    Template.render = render
+    _plantillas_instrumentadas = True
+
+
+def registrar(vista, medicion):
+    """Agrega la medición a las estadísticas de la vista"""
+    maximo = getattr(settings, 'RENDIMIENTO_MUESTRAS', 500)
+    with _lock:
+        muestras = _muestras.get(vista)
+        if muestras is None:
+            muestras = _muestras[vista] = deque(maxlen=maximo)
+        muestras.append((medicion.total, medicion.consultas, medicion.tiempo_sql, medicion.tiempo_plantillas))
+        _totales[vista] = _totales.get(vista, 0) + 1
+
+
+def _percentil(ordenados, p):
+    """Percentil por rango más cercano de una lista ordenada"""
+    indice = max(0, min(len(ordenados) - 1, round(p / 100 * len(ordenados)) - 1))
+    return ordenados[indice]
+
+
+def estadisticas():
+    """
+    Lista de diccionarios por vista con la cantidad de solicitudes, los
+    percentiles del tiempo total (ms) y los promedios de SQL y plantillas,
+    ordenada por el percentil 90 descendente.
+    """
+    with _lock:
+        copia = {vista: list(muestras) for vista, muestras in _muestras.items()}
+        totales = dict(_totales)
+
+    filas = []
+    for vista, muestras in copia.items():
+        tiempos = sorted(m[0] * 1000 for m in muestras)
+        n = len(muestras)
+        fila = {
+            'vista': vista,
+            'solicitudes': totales[vista],
+            'muestras': n,
+            'consultas_promedio': sum(m[1] for m in muestras) / n,
+            'sql_promedio': sum(m[2] for m in muestras) * 1000 / n,
+            'plantillas_promedio': sum(m[3] for m in muestras) * 1000 / n,
+            'maximo': tiempos[-1],
+        }
+        for p in PERCENTILES:
+            fila[f'p{p}'] = _percentil(tiempos, p)
+        filas.append(fila)
+    filas.sort(key=lambda fila: fila['p90'], reverse=True)
+    return filas
+
+
+def reiniciar():
+    with _lock:
+        _muestras.clear()
+        _totales.clear()
@@ -0,0 +1,71 @@
+// Autocompletado para los <select> con atributo data-autocompletar (ver core/autocompletar.py).
+// El select solo trae la opción elegida; al escribir en el buscador se consultan
+// las opciones al endpoint JSON y se reemplazan las del select.
+document.addEventListener('DOMContentLoaded', function() {
+    const ESPERA_MS = 250;
+
+    function opcion(valor, texto) {
+        const elemento = document.createElement('option');
+        elemento.value = valor;
+        elemento.textContent = texto;
+        return elemento;
+    }
+
+    function inicializar(select) {
+        const buscador = document.createElement('input');
+        buscador.type = 'search';
+        buscador.className = 'form-control form-control-sm mb-1';
+        buscador.placeholder = 'Escriba para buscar...';
+        buscador.autocomplete = 'off';
+        select.parentNode.insertBefore(buscador, select);
+
+        const vacia = select.querySelector('option[value=""]');
+        let temporizador = null;
+        let controlador = null;
+
+        function mostrar(datos) {
+            const elegida = select.selectedOptions[0];
+            select.innerHTML = '';
+            if (vacia) select.appendChild(vacia);
+            if (elegida && elegida.value) select.appendChild(elegida);
+            datos.resultados.forEach(function(resultado) {
+                if (!elegida || String(resultado.id) !== elegida.value) {
+                    select.appendChild(opcion(resultado.id, resultado.texto));
+                }
+            });
+            if (datos.mas) {
+                const aviso = opcion('', 'Hay más resultados, refine la búsqueda...');
+                aviso.disabled = true;
+                select.appendChild(aviso);
+            }
+        }
+
+        function buscar() {
+            if (controlador) controlador.abort();
+            controlador = new AbortController();
+            const url = select.dataset.autocompletar + '?q=' + encodeURIComponent(buscador.value.trim());
+            fetch(url, {headers: {'Accept': 'application/json'}, signal: controlador.signal})
+                .then(response => response.json())
+                .then(mostrar)
+                .catch(function(error) {
+                    if (error.name !== 'AbortError') console.error(error);
+                });
+        }
+
+        buscador.addEventListener('input', function() {
+            clearTimeout(temporizador);
+            temporizador = setTimeout(buscar, ESPERA_MS);
+        });
+        // Primeras opciones al entrar al campo sin haber buscado
+        function cargarInicial() {
+            if (!select.dataset.cargado) {
+                select.dataset.cargado = '1';
+                buscar();
+            }
+        }
+        buscador.addEventListener('focus', cargarInicial);
+        select.addEventListener('focus', cargarInicial);
+    }
+
+    document.querySelectorAll('select[data-autocompletar]').forEach(inicializar);
+});
@@ -0,0 +1,52 @@
+// Selects con atributo data-opciones cuyas opciones dependen de otro campo del
+// formulario (data-depende-de), p. ej. subcategorías según la categoría.
+// Con un valor elegido se piden solo sus opciones (?categoria=<id>); sin valor,
+// el árbol completo, que se muestra agrupado. El servidor responde con ETag, por
+// lo que el navegador revalida con un 304 en lugar de volver a descargarlas.
+document.addEventListener('DOMContentLoaded', function() {
+    function opcion(valor, texto) {
+        const elemento = document.createElement('option');
+        elemento.value = valor;
+        elemento.textContent = texto;
+        return elemento;
+    }
+
+    function inicializar(select) {
+        const padre = select.form && select.form.elements.namedItem(select.dataset.dependeDe);
+        if (!padre) return;
+        const vacia = select.querySelector('option[value=""]');
+
+        function mostrar(datos, elegido) {
+            select.innerHTML = '';
+            if (vacia) select.appendChild(vacia);
+            if (datos.subcategorias) {
+                datos.subcategorias.forEach(([id, nombre]) => select.appendChild(opcion(id, nombre)));
+            } else {
+                datos.categorias.forEach(function([, nombreCategoria, hijas]) {
+                    if (!hijas.length) return;
+                    const grupo = document.createElement('optgroup');
+                    grupo.label = nombreCategoria;
+                    hijas.forEach(([id, nombre]) => grupo.appendChild(opcion(id, nombre)));
+                    select.appendChild(grupo);
+                });
+            }
+            // Conserva la elección si sigue siendo válida
+            select.value = elegido;
+            if (select.value !== elegido) select.value = '';
+        }
+
+        function cargar() {
+            const elegido = select.value;
+            const parametro = padre.value ? '?categoria=' + encodeURIComponent(padre.value) : '';
+            fetch(select.dataset.opciones + parametro, {headers: {'Accept': 'application/json'}})
+                .then(response => response.json())
+                .then(datos => mostrar(datos, elegido))
+                .catch(error => console.error(error));
+        }
+
+        padre.addEventListener('change', cargar);
+        cargar();
+    }
+
+    document.querySelectorAll('select[data-opciones][data-depende-de]').forEach(inicializar);
+});
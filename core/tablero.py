@@ -0,0 +1,77 @@
+"""
+Datos del tablero de inicio guardados en la caché de Django.
+
+La clave incluye la versión del inventario (ver activos.contadores), que se
+renueva con cada cambio en los contadores o en los nombres de categorías y
+ubicaciones, de modo que nunca se muestran totales de una versión anterior
+salvo mientras otro proceso recalcula la nueva. `TABLERO_TTL` (segundos,
+None para no vencer) acota además la vida de cada entrada.
+
+Para evitar que varios inicios de sesión simultáneos recalculen lo mismo,
+solo el proceso que obtiene el candado (`cache.add`) consulta la base de
+datos; los demás sirven el último tablero calculado o, si aún no existe,
+esperan brevemente a que aparezca.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from activos import contadores
+from activos.models import Activo, Categoria, Ubicacion
+
+PREFIJO = 'core:tablero'
+CLAVE_ULTIMO = f'{PREFIJO}:ultimo'
+# Segundos que el candado protege el cálculo si el proceso muere a mitad
+DURACION_CANDADO = 30
+ESPERA = 0.05
+INTENTOS = 40
+
+
+def calcular():
+    """Consulta los totales y rankings del tablero"""
+    por_estado = contadores.resumen_estados()
+    return {
+        'total_activos': sum(por_estado.values()),
+        'activos_mantenimiento': por_estado.get(Activo.EstadoActivo.EN_MANTENIMIENTO, 0),
+        'activos_por_categoria': list(
+            Categoria.objects.order_by('-total_activos').values('nombre', 'total_activos')[:5]
+        ),
+        'activos_por_ubicacion': list(
+            Ubicacion.objects.order_by('-total_activos').values('nombre', 'total_activos')[:5]
+        ),
+    }
+
+
+def _guardar(clave, datos):
+    ttl = getattr(settings, 'TABLERO_TTL', None)
+    cache.set(clave, datos, ttl)
+    cache.set(CLAVE_ULTIMO, datos, ttl)
+
+
+def obtener():
+    """Retorna el contexto del tablero para la versión actual del inventario"""
+    clave = f'{PREFIJO}:{contadores.version_inventario()}'
+    datos = cache.get(clave)
+    if datos is not None:
+        return datos
+
+    candado = f'{clave}:calculando'
+    if cache.add(candado, True, DURACION_CANDADO):
+        try:
+            datos = calcular()
+            _guardar(clave, datos)
+        finally:
+            cache.delete(candado)
+        return datos
+
+    # Otro proceso está calculando esta versión
+    ultimo = cache.get(CLAVE_ULTIMO)
+    if ultimo is not None:
+        return ultimo
+    for _intento in range(INTENTOS):
+        time.sleep(ESPERA)
+        datos = cache.get(clave)
+        if datos is not None:
+            return datos
+    return calcular()
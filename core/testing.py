@@ -0,0 +1,147 @@
+"""
+Base para las pruebas de presupuesto de consultas SQL de las vistas.
+
+Cada app declara en su tests.py el máximo de consultas de sus URLs con
+`assertPresupuesto`, que mide la solicitud con el conjunto de datos inicial,
+agrega más filas relacionadas con los mismos objetos (activos del mismo
+usuario y subcategoría, mantenimientos y movimientos del mismo activo, ...)
+y vuelve a medir. La cantidad debe respetar el presupuesto y no cambiar con
+las filas, de modo que una consulta por fila (N+1) hace fallar la prueba.
+
+Las mediciones se hacen con la caché vacía, es decir, en el peor caso
+(catálogos y tablero recalculados).
+"""
+import itertools
+import shutil
+import tempfile
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from activos.models import Activo, Categoria, HistorialMovimiento, SubCategoria, Ubicacion
+from mantenimientos.models import Mantenimiento
+from reportes.models import ReporteGenerado
+from usuarios.models import UsuarioAsignado
+
+
+class PresupuestoConsultasTestCase(TestCase):
+    """TestCase con un inventario de prueba y la aserción `assertPresupuesto`"""
+
+    # Filas agregadas entre la primera y la segunda medición
+    filas_extra = 5
+    _numeros = itertools.count()
+
+    @classmethod
+    def setUpClass(cls):
+        # Los PDF y la caché de reportes se escriben en un directorio temporal
+        cls.directorio_reportes = tempfile.mkdtemp()
+        cls.enterClassContext(override_settings(
+            REPORTES_DIR=cls.directorio_reportes,
+            REPORTES_CACHE_DIR=f'{cls.directorio_reportes}/cache',
+            REPORTES_WORKER_LOCAL=False,
+        ))
+        cls.addClassCleanup(shutil.rmtree, cls.directorio_reportes, ignore_errors=True)
+        super().setUpClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'clave')
+        cls.categoria = Categoria.objects.create(nombre='Cómputo')
+        cls.subcategoria = SubCategoria.objects.create(nombre='Laptop', categoria=cls.categoria)
+        cls.ubicacion = Ubicacion.objects.create(nombre='Sede')
+        cls.usuario = UsuarioAsignado.objects.create(
+            nombres='Ana', apellidos='Pérez', identificacion='BASE'
+        )
+        cls.activo = Activo.objects.create(
+            subcategoria=cls.subcategoria,
+            ubicacion=cls.ubicacion,
+            usuario_asignado=cls.usuario,
+            marca='Marca',
+            modelo='Modelo',
+            codigo_inventario='BASE',
+        )
+        cls.mantenimiento = cls.crear_mantenimiento(cls.activo)
+        cls.reporte = ReporteGenerado.objects.create(
+            tipo=ReporteGenerado.TipoReporte.GENERAL, usuario=cls.admin
+        )
+        cls.agregar_filas(3)
+
+    @classmethod
+    def crear_mantenimiento(cls, activo):
+        return Mantenimiento.objects.create(
+            activo=activo, tecnico='Técnico', telefono='123', descripcion='Revisión', costo=10
+        )
+
+    @classmethod
+    def agregar_filas(cls, cantidad):
+        """Agrega `cantidad` filas de cada tipo, la mitad ligadas a los objetos base"""
+        for _ in range(cantidad):
+            i = next(cls._numeros)
+            categoria = Categoria.objects.create(nombre=f'Categoría {i}')
+            subcategoria = SubCategoria.objects.create(nombre=f'Sub {i}', categoria=categoria)
+            ubicacion = Ubicacion.objects.create(nombre=f'Ubicación {i}')
+            usuario = UsuarioAsignado.objects.create(
+                nombres='Usuario', apellidos=str(i), identificacion=f'ID{i}'
+            )
+            base = i % 2 == 0
+            activo = Activo.objects.create(
+                subcategoria=cls.subcategoria if base else subcategoria,
+                ubicacion=cls.ubicacion if base else ubicacion,
+                usuario_asignado=cls.usuario if base else usuario,
+                marca='Marca',
+                modelo='Modelo',
+                codigo_inventario=f'COD{i:04d}',
+            )
+            cls.crear_mantenimiento(activo)
+            Mantenimiento.objects.create(
+                activo=cls.activo, tecnico=f'Técnico {i}', telefono='123',
+                descripcion='Revisión', costo=5,
+                estado=Mantenimiento.EstadoMantenimiento.FINALIZADO,
+            )
+            HistorialMovimiento.objects.create(
+                activo=cls.activo,
+                tipo_movimiento=HistorialMovimiento.TipoMovimiento.ACTUALIZACION,
+                descripcion=f'Cambio {i}',
+                usuario=cls.admin,
+            )
+            ReporteGenerado.objects.create(
+                tipo=ReporteGenerado.TipoReporte.NOTA_ENTREGA, usuario=cls.admin
+            )
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def medir(self, url, metodo='get', datos=None, estado=200):
+        """
+        Consultas de la solicitud, incluido el contenido de respuestas en
+        streaming. Los cambios que haga la solicitud se revierten, de modo
+        que las dos mediciones de `assertPresupuesto` parten del mismo estado.
+        """
+        if callable(datos):
+            datos = datos()
+        cache.clear()
+        with transaction.atomic():
+            with CaptureQueriesContext(connection) as consultas:
+                response = getattr(self.client, metodo)(url, datos)
+                if response.streaming:
+                    b''.join(response.streaming_content)
+            transaction.set_rollback(True)
+        self.assertEqual(response.status_code, estado, url)
+        return len(consultas)
+
+    def assertPresupuesto(self, url, maximo, metodo='get', datos=None, estado=200):
+        """
+        La solicitud hace a lo sumo `maximo` consultas, y las mismas con más
+        filas en la base de datos. `datos` puede ser una función para
+        calcularlos en cada medición (p. ej. todos los activos existentes).
+        """
+        antes = self.medir(url, metodo, datos, estado)
+        self.agregar_filas(self.filas_extra)
+        despues = self.medir(url, metodo, datos, estado)
+        self.assertLessEqual(antes, maximo, f'{url}: {antes} consultas (presupuesto {maximo})')
+        self.assertEqual(
+            despues, antes, f'{url}: {antes} consultas con pocas filas y {despues} con más filas'
+        )
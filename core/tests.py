@@ -1,3 +1,226 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.functional import SimpleLazyObject
+
+from activos import contadores
+from activos.forms import ActivoForm
+from activos.models import Activo, Categoria, SubCategoria, Ubicacion
+
+from . import catalogos, rendimiento, tablero
+from .middleware import PerformanceMiddleware
+from .testing import PresupuestoConsultasTestCase
+
+
+class PresupuestoConsultasTests(PresupuestoConsultasTestCase):
+    """Máximo de consultas SQL de las vistas de core (ver core.testing)"""
+
+    def test_inicio(self):
+        self.assertPresupuesto(reverse('core:home'), 5)
+
+    def test_rendimiento(self):
+        self.assertPresupuesto(reverse('core:rendimiento'), 2)
+
+    def test_login(self):
+        self.client.logout()
+        self.assertPresupuesto(reverse('core:login'), 0)
+
+
+class PerformanceMiddlewareTests(TestCase):
+    """Header Server-Timing y muestras de core.rendimiento por solicitud"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_user('usuario', password='clave')
+        cls.staff = User.objects.create_user('staff', password='clave', is_staff=True)
+
+    def setUp(self):
+        rendimiento.reiniciar()
+        self.addCleanup(rendimiento.reiniciar)
+
+    def test_header_solo_para_staff(self):
+        url = reverse('core:home')
+        self.client.force_login(self.usuario)
+        response = self.client.get(url)
+        self.assertNotIn('Server-Timing', response)
+        self.assertIn('Cookie', response['Vary'])
+
+        self.client.force_login(self.staff)
+        response = self.client.get(url)
+        self.assertRegex(
+            response['Server-Timing'],
+            r'^total;dur=[\d.]+, db;dur=[\d.]+;desc="\d+ consultas", tpl;dur=[\d.]+$',
+        )
+        self.assertIn('Cookie', response['Vary'])
+
+    @override_settings(RENDIMIENTO_SERVER_TIMING=True)
+    def test_header_activado_por_setting(self):
+        self.assertIn('Server-Timing', self.client.get(reverse('core:login')))
+
+    def test_usuario_dentro_de_la_medicion(self):
+        # La vista no lee el usuario: la consulta la hace el middleware y
+        # también debe contarse
+        request = RequestFactory().get('/')
+        request.user = SimpleLazyObject(lambda: User.objects.get(pk=self.staff.pk))
+        response = PerformanceMiddleware(lambda request: HttpResponse())(request)
+        self.assertIn('Server-Timing', response)
+        self.assertEqual(response['Vary'], 'Cookie')
+        self.assertEqual(rendimiento.estadisticas()[0]['consultas_promedio'], 1)
+
+    def test_muestras_de_la_solicitud(self):
+        self.client.force_login(self.usuario)
+        with CaptureQueriesContext(connection) as consultas:
+            self.client.get(reverse('core:home'))
+
+        [fila] = rendimiento.estadisticas()
+        self.assertEqual(fila['vista'], 'core:home')
+        self.assertEqual((fila['solicitudes'], fila['muestras']), (1, 1))
+        self.assertEqual(fila['consultas_promedio'], len(consultas))
+        self.assertGreater(fila['plantillas_promedio'], 0)
+        self.assertGreaterEqual(fila['maximo'], fila['sql_promedio'] + fila['plantillas_promedio'])
+
+
+class CatalogosTests(TestCase):
+    """Las opciones en caché de los catálogos se renuevan con cada cambio"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.computo = Categoria.objects.create(nombre='Cómputo')
+        cls.laptop = SubCategoria.objects.create(nombre='Laptop', categoria=cls.computo)
+        cls.sede = Ubicacion.objects.create(nombre='Sede')
+
+    def setUp(self):
+        # Las versiones de otras pruebas no deben servir opciones revertidas
+        cache.clear()
+
+    def cambio(self, funcion, *modelos):
+        """Ejecuta `funcion` y verifica que renueva la versión de `modelos`"""
+        anteriores = {modelo: catalogos.version(modelo) for modelo in modelos}
+        with self.captureOnCommitCallbacks(execute=True):
+            resultado = funcion()
+        for modelo, anterior in anteriores.items():
+            self.assertNotEqual(catalogos.version(modelo), anterior, modelo)
+        return resultado
+
+    def opciones_formulario(self, campo):
+        return [etiqueta for valor, etiqueta in ActivoForm().fields[campo].choices if valor]
+
+    def test_opciones_en_cache(self):
+        catalogos.opciones(Ubicacion)
+        with self.assertNumQueries(0):
+            self.assertEqual(catalogos.opciones(Ubicacion), [(self.sede.pk, 'Sede')])
+            self.assertEqual(self.opciones_formulario('ubicacion'), ['Sede'])
+
+    def test_alta_cambio_y_baja(self):
+        self.assertEqual(self.opciones_formulario('ubicacion'), ['Sede'])
+        bodega = self.cambio(lambda: Ubicacion.objects.create(nombre='Bodega'), Ubicacion)
+        self.assertEqual(self.opciones_formulario('ubicacion'), ['Bodega', 'Sede'])
+
+        bodega.nombre = 'Almacén'
+        self.cambio(bodega.save, Ubicacion)
+        self.assertEqual(self.opciones_formulario('ubicacion'), ['Almacén', 'Sede'])
+
+        self.cambio(bodega.delete, Ubicacion)
+        self.assertEqual(self.opciones_formulario('ubicacion'), ['Sede'])
+
+    def test_dependencias(self):
+        self.assertEqual(self.opciones_formulario('categoria'), ['Cómputo'])
+        self.assertEqual(catalogos.opciones(SubCategoria), [(self.laptop.pk, 'Cómputo - Laptop')])
+
+        # La etiqueta de la subcategoría incluye el nombre de la categoría
+        self.computo.nombre = 'Tecnología'
+        self.cambio(self.computo.save, Categoria, SubCategoria)
+        self.assertEqual(self.opciones_formulario('categoria'), ['Tecnología'])
+        self.assertEqual(catalogos.opciones(SubCategoria), [(self.laptop.pk, 'Tecnología - Laptop')])
+
+        silla = self.cambio(
+            lambda: SubCategoria.objects.create(nombre='Silla', categoria=self.computo), SubCategoria
+        )
+        self.assertIn((silla.pk, 'Tecnología - Silla'), catalogos.opciones(SubCategoria))
+        self.cambio(silla.delete, SubCategoria)
+        self.assertNotIn(silla.pk, dict(catalogos.opciones(SubCategoria)))
+
+    def test_sin_confirmar(self):
+        # La versión solo se renueva al confirmarse la transacción
+        anterior = catalogos.version(Ubicacion)
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            Ubicacion.objects.create(nombre='Bodega')
+        self.assertEqual(catalogos.version(Ubicacion), anterior)
+        self.assertTrue(callbacks)
+
+
+class TableroTests(TestCase):
+    """Caché del tablero de inicio versionada por el inventario"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.computo = Categoria.objects.create(nombre='Cómputo')
+        cls.laptop = SubCategoria.objects.create(nombre='Laptop', categoria=cls.computo)
+        cls.sede = Ubicacion.objects.create(nombre='Sede')
+        Activo.objects.create(
+            subcategoria=cls.laptop, ubicacion=cls.sede, marca='Marca', modelo='Modelo', codigo_inventario='COD1',
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def crear(self, codigo, **campos):
+        return Activo.objects.create(
+            subcategoria=self.laptop, ubicacion=self.sede, marca='Marca', modelo='Modelo',
+            codigo_inventario=codigo, **campos,
+        )
+
+    def candado(self):
+        return f'{tablero.PREFIJO}:{contadores.version_inventario()}:calculando'
+
+    def test_acierto(self):
+        datos = tablero.obtener()
+        self.assertEqual(datos['total_activos'], 1)
+        with self.assertNumQueries(0):
+            self.assertEqual(tablero.obtener(), datos)
+
+    def test_invalidacion(self):
+        tablero.obtener()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.crear('COD2', estado=Activo.EstadoActivo.EN_MANTENIMIENTO)
+        datos = tablero.obtener()
+        self.assertEqual((datos['total_activos'], datos['activos_mantenimiento']), (2, 1))
+
+        # Los nombres de los catálogos también forman parte del tablero
+        self.sede.nombre = 'Sede central'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.sede.save()
+        self.assertEqual(tablero.obtener()['activos_por_ubicacion'], [{'nombre': 'Sede central', 'total_activos': 2}])
+
+    def test_candado_sirve_el_ultimo(self):
+        anterior = tablero.obtener()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.crear('COD2')
+        # Otro proceso calcula la versión nueva: se sirve el último tablero
+        cache.add(self.candado(), True)
+        with self.assertNumQueries(0):
+            self.assertEqual(tablero.obtener(), anterior)
+
+    def test_candado_espera(self):
+        cache.add(self.candado(), True)
+        clave = f'{tablero.PREFIJO}:{contadores.version_inventario()}'
+        calculado = {'total_activos': 99}
+
+        # Sin tablero anterior se espera a que el otro proceso lo guarde
+        with mock.patch('core.tablero.time.sleep', side_effect=lambda _: cache.set(clave, calculado)) as sleep:
+            self.assertEqual(tablero.obtener(), calculado)
+        self.assertEqual(sleep.call_count, 1)
+
+    def test_candado_agota_la_espera(self):
+        cache.add(self.candado(), True)
+        # Si el otro proceso no termina a tiempo se calcula sin guardar
+        with mock.patch('core.tablero.time.sleep') as sleep:
+            self.assertEqual(tablero.obtener()['total_activos'], 1)
+        self.assertEqual(sleep.call_count, tablero.INTENTOS)
+        self.assertIsNone(cache.get(tablero.CLAVE_ULTIMO))
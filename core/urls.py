@@ -8,6 +8,9 @@ urlpatterns = [
     path('login/', views.LoginView.as_view(), name='login'),
     path('logout/', views.signout, name='logout'),
     
+    # Métricas de rendimiento por vista (solo staff)
+    path('rendimiento/', views.rendimiento_view, name='rendimiento'),
+    
     # URLs para probar manejo de errores (solo en desarrollo)
     path('test/404/', views.test_404_view, name='test-404'),
     path('test/500/', views.test_500_view, name='test-500'),
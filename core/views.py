@@ -1,8 +1,9 @@
 from django.shortcuts import render
 from django.views.generic import TemplateView
 from django.contrib.auth.mixins import LoginRequiredMixin
-from activos.models import Activo, Categoria, Ubicacion
-from django.db.models import Count
+from django.core.exceptions import PermissionDenied
+from django.conf import settings
+from . import rendimiento, tablero
 from django.contrib.auth.views import LoginView as DjangoLoginView
 from django.contrib.auth.forms import AuthenticationForm
 from django.contrib import messages
@@ -22,19 +23,9 @@ class HomeView(LoginRequiredMixin, TemplateView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
-        # Estadísticas generales
-        context['total_activos'] = Activo.objects.count()
-        context['activos_mantenimiento'] = Activo.objects.filter(estado='EM').count()
-        
-        # Activos por categoría
-        context['activos_por_categoria'] = Categoria.objects.annotate(
-            total=Count('subcategorias__activos')
-        ).order_by('-total')[:5]
-        
-        # Activos por ubicación
-        context['activos_por_ubicacion'] = Ubicacion.objects.annotate(
-            total=Count('activos')
-        ).order_by('-total')[:5]
+        # Totales, activos en mantenimiento y rankings por categoría y ubicación,
+        # desde la caché versionada por el inventario (ver core.tablero)
+        context.update(tablero.obtener())
         
         return context
 
@@ -54,6 +45,23 @@ def signout(request):
     return redirect('core:login')
 
 
+@login_required
+def rendimiento_view(request):
+    """Percentiles de tiempo por vista medidos en este proceso (solo staff)"""
+    if not request.user.is_staff:
+        raise PermissionDenied
+    
+    if request.method == 'POST':
+        rendimiento.reiniciar()
+        messages.success(request, 'Estadísticas de rendimiento reiniciadas.')
+        return redirect('core:rendimiento')
+    
+    return render(request, 'core/rendimiento.html', {
+        'estadisticas': rendimiento.estadisticas(),
+        'umbral_lento': getattr(settings, 'RENDIMIENTO_UMBRAL_LENTO_MS', 500),
+    })
+
+
 # ============== VISTAS DE MANEJO DE ERRORES ==============
 
 def custom_404_view(request, exception):
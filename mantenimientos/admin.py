@@ -7,6 +7,7 @@ class MantenimientoAdmin(admin.ModelAdmin):
     """Configuración del admin para Mantenimiento"""
     
     list_display = ['activo', 'tecnico', 'fecha', 'costo', 'estado', 'fecha_creacion']
+    list_select_related = ['activo']
     list_filter = ['estado', 'fecha', 'fecha_creacion']
     search_fields = ['activo__codigo_inventario', 'tecnico', 'descripcion']
     readonly_fields = ['fecha', 'fecha_creacion', 'fecha_actualizacion']
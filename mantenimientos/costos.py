@@ -0,0 +1,293 @@
+"""
+Resúmenes de costos de mantenimientos.
+
+- `ResumenCostoMensual` guarda, por año y mes de la fecha del mantenimiento,
+  la suma de costos y la cantidad de mantenimientos FINALIZADOS.
+- Cada `Activo` guarda la cantidad de mantenimientos, los abiertos, el costo
+  total, el costo finalizado y la fecha del último mantenimiento.
+
+Las señales de Mantenimiento (ver mantenimientos.signals) comparan los
+valores leídos de la base de datos con los guardados y aplican solo la
+diferencia con UPDATE ... SET campo = campo + delta, dentro de la misma
+transacción. Así los gastos y los totales por activo se leen sin agregar el
+historial. El comando `resumen_costos` permite verificar y reconstruir ambos.
+
+Los reportes y el listado de activos muestran el resumen por activo, por lo
+que cada cambio en él renueva la versión del inventario (ver
+activos.contadores.invalidar_inventario).
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Max, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, ExtractMonth, ExtractYear, Greatest
+
+from activos import contadores
+from activos.models import Activo
+
+from .filtros import rango_mes
+from .models import Mantenimiento, ResumenCostoMensual
+
+EN_PROCESO = Mantenimiento.EstadoMantenimiento.EN_PROCESO
+FINALIZADO = Mantenimiento.EstadoMantenimiento.FINALIZADO
+
+# Campos del resumen por activo que se ajustan con deltas
+CAMPOS_ACTIVO = (
+    'cantidad_mantenimientos',
+    'mantenimientos_abiertos',
+    'costo_mantenimiento_total',
+    'costo_mantenimiento_finalizado',
+)
+
+
+def aporte(valores):
+    """Retorna ((año, mes), costo) si el mantenimiento suma al resumen mensual, o None"""
+    if valores is None or valores['estado'] != FINALIZADO or valores['fecha'] is None:
+        return None
+    return (valores['fecha'].year, valores['fecha'].month), Decimal(valores['costo'])
+
+
+def aporte_activo(valores):
+    """Retorna {campo: valor} con lo que el mantenimiento suma al resumen de su activo"""
+    costo = Decimal(valores['costo'] or 0)
+    return {
+        'cantidad_mantenimientos': 1,
+        'mantenimientos_abiertos': int(valores['estado'] == EN_PROCESO),
+        'costo_mantenimiento_total': costo,
+        'costo_mantenimiento_finalizado': costo if valores['estado'] == FINALIZADO else 0,
+    }
+
+
+def aplicar_deltas(deltas):
+    """Aplica {(año, mes): (delta costo, delta cantidad)} al resumen"""
+    for (anio, mes), (costo, cantidad) in deltas.items():
+        if not costo and not cantidad:
+            continue
+        cambios = {
+            'costo_finalizado': F('costo_finalizado') + costo,
+            'cantidad_finalizados': F('cantidad_finalizados') + cantidad,
+        }
+        if ResumenCostoMensual.objects.filter(anio=anio, mes=mes).update(**cambios):
+            continue
+        try:
+            with transaction.atomic():
+                ResumenCostoMensual.objects.create(
+                    anio=anio, mes=mes, costo_finalizado=costo, cantidad_finalizados=max(cantidad, 0)
+                )
+        except IntegrityError:
+            # Otra transacción creó el mes al mismo tiempo
+            ResumenCostoMensual.objects.filter(anio=anio, mes=mes).update(**cambios)
+
+
+def _sumar(deltas, valor, signo):
+    if valor is not None:
+        mes, costo = valor
+        anterior_costo, anterior_cantidad = deltas[mes]
+        deltas[mes] = (anterior_costo + signo * costo, anterior_cantidad + signo)
+
+
+def aplicar_deltas_activos(deltas, recalcular_fecha=(), fechas_nuevas=None):
+    """
+    Aplica {activo_id: {campo: delta}} al resumen de los activos.
+
+    La fecha del último mantenimiento se recalcula desde el índice
+    (activo, -fecha) para `recalcular_fecha`; `fechas_nuevas` ({activo_id:
+    fecha}) solo puede adelantarla, sin consultar el historial.
+    """
+    fechas_nuevas = fechas_nuevas or {}
+    actualizados = False
+    for activo_id in set(deltas) | set(recalcular_fecha) | set(fechas_nuevas):
+        cambios = {
+            campo: F(campo) + delta
+            for campo, delta in deltas.get(activo_id, {}).items() if delta
+        }
+        if activo_id in recalcular_fecha:
+            cambios['fecha_ultimo_mantenimiento'] = Subquery(
+                Mantenimiento.objects.filter(activo_id=OuterRef('pk'))
+                .order_by('-fecha').values('fecha')[:1]
+            )
+        elif activo_id in fechas_nuevas:
+            fecha = Value(fechas_nuevas[activo_id])
+            cambios['fecha_ultimo_mantenimiento'] = Greatest(
+                Coalesce('fecha_ultimo_mantenimiento', fecha), fecha
+            )
+        if cambios:
+            actualizados = Activo.objects.filter(pk=activo_id).update(**cambios) or actualizados
+    if actualizados:
+        contadores.invalidar_inventario()
+
+
+def _valores_guardados(mantenimiento, created, update_fields):
+    """
+    Retorna (anterior, nuevo): los valores rastreados en la base de datos
+    antes y después del guardado (anterior es None si el registro es nuevo).
+    """
+    campos = Mantenimiento.campos_rastreados
+    actuales = {campo: getattr(mantenimiento, campo) for campo in campos}
+    originales = mantenimiento.valores_originales
+    if created or not originales:
+        return None, actuales
+    # Los campos que no se guardaron conservan su valor en la base de datos
+    guardados = mantenimiento._campos_guardados(update_fields)
+    return dict(originales), {
+        campo: actuales[campo] if campo in guardados else originales[campo]
+        for campo in campos
+    }
+
+
+def registrar_guardado(mantenimiento, created, update_fields=None):
+    """Ajusta los resúmenes según el estado anterior y el nuevo del mantenimiento"""
+    anterior, nuevo = _valores_guardados(mantenimiento, created, update_fields)
+    if anterior == nuevo:
+        return
+
+    deltas = defaultdict(lambda: (Decimal('0'), 0))
+    _sumar(deltas, aporte(anterior), -1)
+    _sumar(deltas, aporte(nuevo), 1)
+    aplicar_deltas(deltas)
+
+    por_activo = defaultdict(lambda: dict.fromkeys(CAMPOS_ACTIVO, 0))
+    for valores, signo in ((anterior, -1), (nuevo, 1)):
+        if valores is not None:
+            for campo, valor in aporte_activo(valores).items():
+                por_activo[valores['activo_id']][campo] += signo * valor
+
+    if anterior is None:
+        aplicar_deltas_activos(por_activo, fechas_nuevas={nuevo['activo_id']: nuevo['fecha']})
+    else:
+        recalcular = set()
+        if (anterior['activo_id'], anterior['fecha']) != (nuevo['activo_id'], nuevo['fecha']):
+            recalcular = {anterior['activo_id'], nuevo['activo_id']}
+        aplicar_deltas_activos(por_activo, recalcular_fecha=recalcular)
+
+
+def registrar_baja(mantenimiento):
+    """Descuenta de los resúmenes un mantenimiento eliminado"""
+    originales = mantenimiento.valores_originales or {}
+    valores = {
+        campo: originales.get(campo, getattr(mantenimiento, campo))
+        for campo in Mantenimiento.campos_rastreados
+    }
+    deltas = defaultdict(lambda: (Decimal('0'), 0))
+    _sumar(deltas, aporte(valores), -1)
+    aplicar_deltas(deltas)
+
+    por_activo = {valores['activo_id']: {
+        campo: -valor for campo, valor in aporte_activo(valores).items()
+    }}
+    aplicar_deltas_activos(por_activo, recalcular_fecha={valores['activo_id']})
+
+
+def gastos(anio, mes=None, periodo=None):
+    """
+    Retorna los gastos finalizados del mes actual, del año actual y del
+    período filtrado con una sola consulta al resumen.
+
+    `periodo` es un Q sobre los campos `anio`/`mes` del resumen; None
+    significa todo el historial.
+    """
+    totales = ResumenCostoMensual.objects.aggregate(
+        mes_actual=Sum('costo_finalizado', filter=Q(anio=anio, mes=mes)),
+        anio_actual=Sum('costo_finalizado', filter=Q(anio=anio)),
+        periodo=Sum('costo_finalizado', filter=periodo),
+    )
+    return {clave: valor or 0 for clave, valor in totales.items()}
+
+
+def _resumen_real():
+    """Agrupa los mantenimientos finalizados por año y mes"""
+    filas = (
+        Mantenimiento.objects.order_by()
+        .filter(estado=FINALIZADO)
+        .annotate(anio=ExtractYear('fecha'), mes=ExtractMonth('fecha'))
+        .values('anio', 'mes')
+        .annotate(costo=Sum('costo'), cantidad=Count('pk'))
+    )
+    return {(f['anio'], f['mes']): (f['costo'], f['cantidad']) for f in filas}
+
+
+def expresiones_resumen_activo(mantenimientos=None):
+    """
+    Expresiones {campo: subconsulta} que calculan el resumen de cada activo
+    desde su historial (para UPDATE o annotate sobre Activo).
+    """
+    mantenimientos = mantenimientos or Mantenimiento.objects
+    del_activo = mantenimientos.filter(activo_id=OuterRef('pk')).order_by().values('activo_id')
+
+    def agregado(expresion):
+        return Subquery(del_activo.annotate(valor=expresion).values('valor'))
+
+    return {
+        'cantidad_mantenimientos': Coalesce(agregado(Count('pk')), 0),
+        'mantenimientos_abiertos': Coalesce(agregado(Count('pk', filter=Q(estado=EN_PROCESO))), 0),
+        'costo_mantenimiento_total': Coalesce(agregado(Sum('costo')), Decimal('0')),
+        'costo_mantenimiento_finalizado': Coalesce(
+            agregado(Sum('costo', filter=Q(estado=FINALIZADO))), Decimal('0')
+        ),
+        'fecha_ultimo_mantenimiento': agregado(Max('fecha')),
+    }
+
+
+def verificar():
+    """
+    Compara los resúmenes con los mantenimientos.
+
+    Retorna una lista de tuplas (descripción, valor almacenado, valor real)
+    con las diferencias encontradas.
+    """
+    reales = _resumen_real()
+    almacenados = {
+        (r.anio, r.mes): (r.costo_finalizado, r.cantidad_finalizados)
+        for r in ResumenCostoMensual.objects.all()
+    }
+    diferencias = []
+    for clave in sorted(set(reales) | set(almacenados)):
+        real = reales.get(clave, (Decimal('0'), 0))
+        almacenado = almacenados.get(clave, (Decimal('0'), 0))
+        if real != almacenado:
+            diferencias.append((f'Mes {clave[1]:02d}/{clave[0]}', almacenado, real))
+
+    expresiones = expresiones_resumen_activo()
+    campos = list(expresiones)
+    activos = Activo.objects.order_by('pk').annotate(
+        **{f'real_{campo}': expresion for campo, expresion in expresiones.items()}
+    ).values_list('codigo_inventario', *campos, *(f'real_{campo}' for campo in campos))
+    for codigo, *valores in activos.iterator():
+        for campo, almacenado, real in zip(campos, valores, valores[len(campos):]):
+            if almacenado != real:
+                diferencias.append((f'Activo {codigo} ({campo})', almacenado, real))
+    return diferencias
+
+
+@transaction.atomic
+def recalcular(activo_ids=(), meses=()):
+    """
+    Recalcula desde los mantenimientos el resumen de los activos y de los
+    meses ((año, mes)) indicados; lo usan las operaciones masivas, que no
+    disparan señales.
+    """
+    if activo_ids:
+        Activo.objects.filter(pk__in=activo_ids).update(**expresiones_resumen_activo())
+        contadores.invalidar_inventario()
+    for anio, mes in meses:
+        inicio, fin = rango_mes(anio, mes)
+        totales = Mantenimiento.objects.filter(
+            estado=FINALIZADO, fecha__gte=inicio, fecha__lt=fin
+        ).aggregate(costo=Sum('costo'), cantidad=Count('pk'))
+        ResumenCostoMensual.objects.update_or_create(anio=anio, mes=mes, defaults={
+            'costo_finalizado': totales['costo'] or 0,
+            'cantidad_finalizados': totales['cantidad'],
+        })
+
+
+@transaction.atomic
+def reconstruir():
+    """Recalcula los resúmenes completos a partir de los mantenimientos"""
+    ResumenCostoMensual.objects.all().delete()
+    ResumenCostoMensual.objects.bulk_create([
+        ResumenCostoMensual(anio=anio, mes=mes, costo_finalizado=costo, cantidad_finalizados=cantidad)
+        for (anio, mes), (costo, cantidad) in _resumen_real().items()
+    ])
+    Activo.objects.update(**expresiones_resumen_activo())
+    contadores.invalidar_inventario()
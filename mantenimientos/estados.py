@@ -0,0 +1,81 @@
+"""
+Estado de los activos derivado de sus mantenimientos.
+
+Un activo con algún mantenimiento EN PROCESO debe estar EN MANTENIMIENTO, y
+uno EN MANTENIMIENTO sin mantenimientos abiertos vuelve a ACTIVO. En lugar
+de revisar cada activo por separado, `reconciliar_estado_activos` busca los
+activos desincronizados con una subconsulta EXISTS y los corrige con un
+único UPDATE, ajustando los contadores de inventario y el historial en lote.
+
+Se ejecuta al guardar o eliminar un mantenimiento, después de las
+operaciones masivas del QuerySet de Mantenimiento y desde el comando
+`reconciliar_estados` para todo el inventario.
+"""
+from collections import Counter
+
+from django.db.models import Case, Exists, OuterRef, Q, Value, When
+from django.utils import timezone
+
+from activos import contadores
+from activos.historial import CAMPOS_HISTORIAL, lote_historial
+from activos.models import Activo
+
+from .models import Mantenimiento
+
+EN_MANTENIMIENTO = Activo.EstadoActivo.EN_MANTENIMIENTO
+ACTIVO = Activo.EstadoActivo.ACTIVO
+
+
+def activos_desincronizados(ids=None):
+    """Activos cuyo estado no corresponde a sus mantenimientos abiertos"""
+    abierto = Mantenimiento.objects.filter(
+        activo_id=OuterRef('pk'), estado=Mantenimiento.EstadoMantenimiento.EN_PROCESO
+    )
+    queryset = Activo.objects.alias(abierto=Exists(abierto)).filter(
+        Q(abierto=True) & ~Q(estado=EN_MANTENIMIENTO)
+        | Q(abierto=False, estado=EN_MANTENIMIENTO)
+    )
+    if ids is not None:
+        queryset = queryset.filter(pk__in=ids)
+    return queryset
+
+
+def reconciliar_estado_activos(ids=None, usuario=None):
+    """
+    Corrige el estado de los activos `ids` (o de todos si es None).
+
+    Retorna {activo_id: nuevo estado} con los activos modificados.
+    """
+    if ids is not None:
+        ids = {pk for pk in ids if pk is not None}
+        if not ids:
+            return {}
+
+    with lote_historial(usuario) as lote:
+        filas = list(
+            activos_desincronizados(ids).select_for_update().values_list('pk', 'estado')
+        )
+        if not filas:
+            return {}
+
+        nuevos = {
+            pk: ACTIVO if estado == EN_MANTENIMIENTO else EN_MANTENIMIENTO
+            for pk, estado in filas
+        }
+        Activo.objects.filter(pk__in=nuevos).update(
+            estado=Case(
+                When(estado=EN_MANTENIMIENTO, then=Value(ACTIVO)),
+                default=Value(EN_MANTENIMIENTO),
+            ),
+            fecha_actualizacion=timezone.now(),
+        )
+
+        deltas = Counter()
+        nombre, tipo, _modelo = CAMPOS_HISTORIAL['estado']
+        for pk, anterior in filas:
+            deltas[('estado', anterior)] -= 1
+            deltas[('estado', nuevos[pk])] += 1
+            lote.agregar(pk, tipo, nombre, anterior, nuevos[pk])
+        contadores.aplicar_deltas(deltas)
+
+    return nuevos
@@ -0,0 +1,57 @@
+"""
+Filtros por período expresados como rangos de fechas semiabiertos.
+
+`fecha__month=m` y `fecha__year=a` se traducen a EXTRACT(...) sobre la
+columna, que no puede usar los índices sobre `fecha`. Aquí el período se
+convierte en condiciones `fecha >= inicio AND fecha < fin`, que sí los usan.
+"""
+from datetime import date
+
+from django.db.models import Max, Min, Q
+
+
+# El rango de un año termina el 1 de enero del siguiente, que debe existir
+AÑO_MAXIMO = date.max.year - 1
+
+
+def leer_periodo(params):
+    """Retorna (mes, año) como enteros, o None si falta o no es válido"""
+    mes = params.get('mes', '')
+    año = params.get('año', '')
+    mes = int(mes) if mes.isdecimal() and 1 <= int(mes) <= 12 else None
+    año = int(año) if año.isdecimal() and 1 <= int(año) <= AÑO_MAXIMO else None
+    return mes, año
+
+
+def rango_mes(año, mes):
+    """Retorna (inicio, fin) del mes, con el fin excluido"""
+    if mes == 12:
+        return date(año, 12, 1), date(año + 1, 1, 1)
+    return date(año, mes, 1), date(año, mes + 1, 1)
+
+
+def _rango(campo, inicio, fin):
+    return Q(**{f'{campo}__gte': inicio, f'{campo}__lt': fin})
+
+
+def filtro_periodo(queryset, mes=None, año=None, campo='fecha'):
+    """
+    Filtra el queryset por mes y/o año de `campo` usando rangos de fechas.
+
+    Un mes sin año se expande a un rango por cada año entre la primera y la
+    última fecha registradas (dos búsquedas en el índice).
+    """
+    if año is not None and mes is not None:
+        return queryset.filter(_rango(campo, *rango_mes(año, mes)))
+    if año is not None:
+        return queryset.filter(_rango(campo, date(año, 1, 1), date(año + 1, 1, 1)))
+    if mes is None:
+        return queryset
+
+    extremos = queryset.model._default_manager.aggregate(primera=Min(campo), ultima=Max(campo))
+    if extremos['primera'] is None:
+        return queryset.none()
+    condicion = Q()
+    for año in range(extremos['primera'].year, min(extremos['ultima'].year, AÑO_MAXIMO) + 1):
+        condicion |= _rango(campo, *rango_mes(año, mes))
+    return queryset.filter(condicion)
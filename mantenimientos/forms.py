@@ -1,4 +1,6 @@
 from django import forms
+from activos.models import Activo
+from core.autocompletar import AutocompletarSelect
 from .models import Mantenimiento
 
 
@@ -9,7 +11,7 @@ class MantenimientoForm(forms.ModelForm):
         model = Mantenimiento
         fields = ['activo', 'tecnico', 'telefono', 'descripcion', 'costo', 'estado']
         widgets = {
-            'activo': forms.Select(attrs={
+            'activo': AutocompletarSelect('activos:activo-autocompletar', attrs={
                 'class': 'form-select',
                 'readonly': True  # Se pasará desde la vista
             }),
@@ -54,9 +56,9 @@ class MantenimientoFilterForm(forms.Form):
         widget=forms.Select(attrs={'class': 'form-select'})
     )
     activo = forms.ModelChoiceField(
-        queryset=None,  # Se configurará en la vista
+        queryset=Activo.objects.all(),
         required=False,
-        widget=forms.Select(attrs={'class': 'form-select'}),
+        widget=AutocompletarSelect('activos:activo-autocompletar', attrs={'class': 'form-select'}),
         empty_label='Todos los activos'
     )
     buscar = forms.CharField(
@@ -82,10 +84,8 @@ class MantenimientoFilterForm(forms.Form):
     )
     
     def __init__(self, *args, **kwargs):
-        from activos.models import Activo
         from datetime import datetime
         super().__init__(*args, **kwargs)
-        self.fields['activo'].queryset = Activo.objects.all().order_by('codigo_inventario')
         
         # Generar años disponibles (del año actual hacia atrás 5 años)
         current_year = datetime.now().year
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from mantenimientos.estados import activos_desincronizados, reconciliar_estado_activos
+
+
+class Command(BaseCommand):
+    help = 'Reconcilia el estado de los activos con sus mantenimientos en proceso'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--activo',
+            type=int,
+            action='append',
+            dest='activos',
+            help='ID del activo a reconciliar (se puede repetir); por defecto, todos',
+        )
+        parser.add_argument(
+            '--verificar',
+            action='store_true',
+            help='Solo informa cuántos activos están desincronizados',
+        )
+
+    def handle(self, *args, **options):
+        if options['verificar']:
+            total = activos_desincronizados(options['activos']).count()
+            self.stdout.write(f'{total} activos desincronizados.')
+            return
+
+        nuevos = reconciliar_estado_activos(options['activos'])
+        self.stdout.write(self.style.SUCCESS(f'{len(nuevos)} activos reconciliados.'))
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from mantenimientos import costos
+
+
+class Command(BaseCommand):
+    help = 'Verifica (o reconstruye) los resúmenes de costos de mantenimientos (mensual y por activo)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reconstruir',
+            action='store_true',
+            help='Recalcula el resumen a partir de la tabla de mantenimientos',
+        )
+
+    def handle(self, *args, **options):
+        if options['reconstruir']:
+            costos.reconstruir()
+            self.stdout.write(self.style.SUCCESS('Resumen de costos reconstruido.'))
+            return
+
+        diferencias = costos.verificar()
+        if not diferencias:
+            self.stdout.write(self.style.SUCCESS('El resumen coincide con los mantenimientos.'))
+            return
+
+        for descripcion, almacenado, real in diferencias:
+            self.stdout.write(f'{descripcion}: almacenado={almacenado} real={real}')
+        raise CommandError(
+            f'{len(diferencias)} valores desincronizados. '
+            'Ejecute con --reconstruir para corregirlos.'
+        )
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 08:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activos', '0004_indices_paginacion'),
+        ('mantenimientos', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='mantenimiento',
+            index=models.Index(fields=['-fecha', '-id'], name='mantenimien_fecha_2ef9d4_idx'),
+        ),
+    ]
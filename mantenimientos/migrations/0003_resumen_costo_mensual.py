@@ -0,0 +1,51 @@
+# Generated by Django 5.2.7 on 2026-10-18 08:26
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import ExtractMonth, ExtractYear
+
+
+def calcular_resumen(apps, schema_editor):
+    """Inicializa el resumen con los mantenimientos finalizados existentes"""
+    Mantenimiento = apps.get_model('mantenimientos', 'Mantenimiento')
+    ResumenCostoMensual = apps.get_model('mantenimientos', 'ResumenCostoMensual')
+    filas = (
+        Mantenimiento.objects.order_by()
+        .filter(estado='FI')
+        .annotate(anio=ExtractYear('fecha'), mes=ExtractMonth('fecha'))
+        .values('anio', 'mes')
+        .annotate(costo=Sum('costo'), cantidad=Count('pk'))
+    )
+    ResumenCostoMensual.objects.bulk_create([
+        ResumenCostoMensual(
+            anio=f['anio'], mes=f['mes'], costo_finalizado=f['costo'], cantidad_finalizados=f['cantidad']
+        )
+        for f in filas
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mantenimientos', '0002_indices_paginacion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumenCostoMensual',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('anio', models.PositiveSmallIntegerField(verbose_name='Año')),
+                ('mes', models.PositiveSmallIntegerField(verbose_name='Mes')),
+                ('costo_finalizado', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Costo Finalizado')),
+                ('cantidad_finalizados', models.PositiveIntegerField(default=0, verbose_name='Mantenimientos Finalizados')),
+            ],
+            options={
+                'verbose_name': 'Resumen de Costo Mensual',
+                'verbose_name_plural': 'Resúmenes de Costo Mensual',
+                'ordering': ['-anio', '-mes'],
+                'constraints': [models.UniqueConstraint(fields=('anio', 'mes'), name='resumen_costo_mes_unico')],
+            },
+        ),
+        migrations.RunPython(calcular_resumen, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.7 on 2026-10-18 08:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activos', '0006_indice_fecha_actualizacion'),
+        ('mantenimientos', '0003_resumen_costo_mensual'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='mantenimiento',
+            name='mantenimien_estado_0cfa99_idx',
+        ),
+        migrations.AddIndex(
+            model_name='mantenimiento',
+            index=models.Index(fields=['estado', 'fecha'], name='mantenimien_estado_6aa92c_idx'),
+        ),
+    ]
@@ -1,11 +1,83 @@
-from django.db import models
+from django.db import models, transaction
 from django.core.exceptions import ValidationError
 from activos.models import Activo
+from core.rastreo import RastreoCambiosMixin
 
 
-class Mantenimiento(models.Model):
+class MantenimientoQuerySet(models.QuerySet):
+    """
+    QuerySet cuyas operaciones masivas (update, bulk_update, bulk_create), que
+    no disparan señales, recalculan los resúmenes de costos y reconcilian el
+    estado de los activos afectados al terminar.
+    
+    `bulk_update` se sobrescribe aunque Django lo implemente con `update()`:
+    así los resúmenes se recalculan una sola vez y no una por lote.
+    """
+    
+    # Campos cuyo cambio puede mover un mantenimiento a otro activo o mes
+    campos_ubicacion = {'activo', 'activo_id', 'fecha'}
+    
+    def _afectados(self):
+        """Retorna (ids de activos, {(año, mes)}) de los mantenimientos del queryset"""
+        base = self.order_by()
+        activos = set(base.values_list('activo_id', flat=True).distinct())
+        meses = {(dia.year, dia.month) for dia in base.dates('fecha', 'month')}
+        return activos, meses
+    
+    def _despues_de_cambios(self, activos, meses):
+        from . import costos, estados
+        costos.recalcular(activos, meses)
+        estados.reconciliar_estado_activos(activos)
+    
+    def update(self, **kwargs):
+        with transaction.atomic():
+            activos, meses = self._afectados()
+            ids = None
+            if self.campos_ubicacion & set(kwargs):
+                ids = list(self.values_list('pk', flat=True))
+            filas = super().update(**kwargs)
+            if filas:
+                if ids is not None:
+                    nuevos_activos, nuevos_meses = Mantenimiento.objects.filter(pk__in=ids)._afectados()
+                    activos |= nuevos_activos
+                    meses |= nuevos_meses
+                self._despues_de_cambios(activos, meses)
+        return filas
+    
+    update.alters_data = True
+    
+    def bulk_create(self, objs, *args, **kwargs):
+        with transaction.atomic():
+            objs = super().bulk_create(objs, *args, **kwargs)
+            self._despues_de_cambios(
+                {obj.activo_id for obj in objs},
+                {(obj.fecha.year, obj.fecha.month) for obj in objs if obj.fecha},
+            )
+        return objs
+    
+    bulk_create.alters_data = True
+    
+    def bulk_update(self, objs, fields, batch_size=None):
+        objs = list(objs)
+        ids = [obj.pk for obj in objs]
+        with transaction.atomic():
+            activos, meses = Mantenimiento.objects.filter(pk__in=ids)._afectados()
+            # QuerySet sin sobrescrituras: cada lote no recalcula por su cuenta
+            filas = models.QuerySet(self.model, using=self.db).bulk_update(objs, fields, batch_size)
+            if filas:
+                nuevos_activos, nuevos_meses = Mantenimiento.objects.filter(pk__in=ids)._afectados()
+                self._despues_de_cambios(activos | nuevos_activos, meses | nuevos_meses)
+        return filas
+    
+    bulk_update.alters_data = True
+
+
+class Mantenimiento(RastreoCambiosMixin, models.Model):
     """Registro de mantenimientos de activos"""
     
+    # Campos comparados por las señales que mantienen los resúmenes de costos
+    campos_rastreados = ('activo_id', 'estado', 'costo', 'fecha')
+    
     class EstadoMantenimiento(models.TextChoices):
         EN_PROCESO = 'EP', 'En proceso'
         FINALIZADO = 'FI', 'Finalizado'
@@ -36,13 +108,18 @@ class Mantenimiento(models.Model):
     fecha_creacion = models.DateTimeField(auto_now_add=True)
     fecha_actualizacion = models.DateTimeField(auto_now=True)
     
+    objects = MantenimientoQuerySet.as_manager()
+    
     class Meta:
         verbose_name = "Mantenimiento"
         verbose_name_plural = "Mantenimientos"
         ordering = ['-fecha']
         indexes = [
             models.Index(fields=['activo', '-fecha']),
-            models.Index(fields=['estado']),
+            # Filtros por estado y período (rangos de fecha); también sirve para estado solo
+            models.Index(fields=['estado', 'fecha']),
+            # Orden del listado y rangos de fecha sin estado
+            models.Index(fields=['-fecha', '-id']),
         ]
     
     def __str__(self):
@@ -50,30 +127,27 @@ class Mantenimiento(models.Model):
     
     def save(self, *args, **kwargs):
         """
-        Sobrescribimos save() para actualizar automáticamente el estado del activo
+        Sobrescribimos save() para reconciliar el estado del activo (y del
+        anterior, si el mantenimiento cambió de activo)
         """
-        # Guardar el mantenimiento primero
-        super().save(*args, **kwargs)
+        from .estados import reconciliar_estado_activos
+        
+        anterior = (self.valores_originales or {}).get('activo_id')
+        with transaction.atomic():
+            # Guardar el mantenimiento primero (los resúmenes de costos se ajustan en post_save)
+            super().save(*args, **kwargs)
+            nuevos = reconciliar_estado_activos({self.activo_id, anterior})
         
-        # Actualizar el estado del activo según el estado del mantenimiento
-        if self.estado == self.EstadoMantenimiento.EN_PROCESO:
-            # Si el mantenimiento está en proceso, el activo pasa a "En Mantenimiento"
-            if self.activo.estado != Activo.EstadoActivo.EN_MANTENIMIENTO:
-                self.activo.estado = Activo.EstadoActivo.EN_MANTENIMIENTO
-                self.activo.save(update_fields=['estado', 'fecha_actualizacion'])
+        # Mantener sincronizado el activo ya cargado en la instancia
+        if self.activo_id in nuevos and Mantenimiento.activo.is_cached(self):
+            self.activo.estado = nuevos[self.activo_id]
+            self.activo.guardar_valores_originales(['estado'])
         
-        elif self.estado == self.EstadoMantenimiento.FINALIZADO:
-            # Si el mantenimiento finalizó, verificar si hay otros mantenimientos en proceso
-            mantenimientos_en_proceso = Mantenimiento.objects.filter(
-                activo=self.activo,
-                estado=self.EstadoMantenimiento.EN_PROCESO
-            ).exclude(pk=self.pk).exists()
-            
-            # Solo volver a "Activo" si no hay otros mantenimientos en proceso
-            if not mantenimientos_en_proceso:
-                if self.activo.estado == Activo.EstadoActivo.EN_MANTENIMIENTO:
-                    self.activo.estado = Activo.EstadoActivo.ACTIVO
-                    self.activo.save(update_fields=['estado', 'fecha_actualizacion'])
+        self.guardar_valores_originales(kwargs.get('update_fields'))
+    
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            return super().delete(*args, **kwargs)
     
     def clean(self):
         """Validaciones personalizadas"""
@@ -81,4 +155,31 @@ class Mantenimiento(models.Model):
         
         # Validar que el costo sea positivo
         if self.costo is not None and self.costo < 0:
-            raise ValidationError({'costo': 'El costo no puede ser negativo.'})
\ No newline at end of file
+            raise ValidationError({'costo': 'El costo no puede ser negativo.'})
+
+
+class ResumenCostoMensual(models.Model):
+    """
+    Costo de los mantenimientos finalizados por mes, mantenido por
+    mantenimientos.costos a partir de las señales de Mantenimiento
+    """
+    anio = models.PositiveSmallIntegerField(verbose_name='Año')
+    mes = models.PositiveSmallIntegerField(verbose_name='Mes')
+    costo_finalizado = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0,
+        verbose_name='Costo Finalizado'
+    )
+    cantidad_finalizados = models.PositiveIntegerField(default=0, verbose_name='Mantenimientos Finalizados')
+    
+    class Meta:
+        verbose_name = "Resumen de Costo Mensual"
+        verbose_name_plural = "Resúmenes de Costo Mensual"
+        ordering = ['-anio', '-mes']
+        constraints = [
+            models.UniqueConstraint(fields=['anio', 'mes'], name='resumen_costo_mes_unico'),
+        ]
+    
+    def __str__(self):
+        return f"{self.mes:02d}/{self.anio}: {self.costo_finalizado}"
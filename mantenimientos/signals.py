@@ -0,0 +1,28 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from activos.models import Activo
+
+from . import costos
+from .estados import reconciliar_estado_activos
+from .models import Mantenimiento
+
+
+@receiver(post_save, sender=Mantenimiento)
+def actualizar_resumen_costos(sender, instance, created, update_fields, raw, **kwargs):
+    """Ajusta el resumen mensual de costos al crear o modificar un mantenimiento"""
+    if raw:
+        return
+    costos.registrar_guardado(instance, created, update_fields)
+
+
+@receiver(post_delete, sender=Mantenimiento)
+def descontar_resumen_costos(sender, instance, origin=None, **kwargs):
+    """
+    Descuenta el mantenimiento eliminado del resumen mensual de costos y
+    reconcilia el estado de su activo
+    """
+    costos.registrar_baja(instance)
+    # Si se está eliminando el propio activo no hay estado que corregir
+    if getattr(origin, 'model', type(origin)) is not Activo:
+        reconciliar_estado_activos([instance.activo_id])
@@ -1,3 +1,313 @@
+from datetime import date
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from activos import contadores
+from activos.models import Activo, Categoria, SubCategoria, Ubicacion
+from core.testing import PresupuestoConsultasTestCase
+
+from . import costos
+from .estados import activos_desincronizados
+from .filtros import AÑO_MAXIMO, leer_periodo
+from .models import Mantenimiento, ResumenCostoMensual
+
+
+class AdminMantenimientoTests(TestCase):
+    """La lista del admin no debe consultar el activo de cada mantenimiento"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'clave')
+        categoria = Categoria.objects.create(nombre='Cómputo')
+        cls.subcategoria = SubCategoria.objects.create(nombre='Laptop', categoria=categoria)
+        cls.ubicacion = Ubicacion.objects.create(nombre='Sede')
+        cls.agregar_mantenimientos(0)
+
+    @classmethod
+    def agregar_mantenimientos(cls, inicio, cantidad=3):
+        for i in range(inicio, inicio + cantidad):
+            activo = Activo.objects.create(
+                subcategoria=cls.subcategoria,
+                ubicacion=cls.ubicacion,
+                marca='Marca',
+                modelo='Modelo',
+                codigo_inventario=f'COD{i:03d}',
+            )
+            Mantenimiento.objects.create(
+                activo=activo, tecnico='Técnico', telefono='123', descripcion='Revisión', costo=10
+            )
+
+    def contar_lista(self):
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get(reverse('admin:mantenimientos_mantenimiento_changelist'))
+        self.assertEqual(response.status_code, 200)
+        return len(consultas)
+
+    def test_lista_consultas_constantes(self):
+        self.client.force_login(self.admin)
+        antes = self.contar_lista()
+        self.agregar_mantenimientos(100, cantidad=5)
+        self.assertEqual(self.contar_lista(), antes)
+
+
+class PresupuestoConsultasTests(PresupuestoConsultasTestCase):
+    """Máximo de consultas SQL de cada vista de mantenimientos (ver core.testing)"""
+
+    def test_lista(self):
+        url = reverse('mantenimientos:mantenimiento-list')
+        self.assertPresupuesto(url, 6)
+        self.assertPresupuesto(url + '?estado=EP', 6)
+        self.assertPresupuesto(url + f'?activo={self.activo.pk}', 8)
+
+    def test_mantenimiento(self):
+        pk = self.mantenimiento.pk
+        self.assertPresupuesto(reverse('mantenimientos:mantenimiento-create'), 2)
+        self.assertPresupuesto(reverse('mantenimientos:mantenimiento-detail', args=[pk]), 3)
+        self.assertPresupuesto(reverse('mantenimientos:mantenimiento-update', args=[pk]), 4)
+
+    def test_finalizar(self):
+        url = reverse('mantenimientos:mantenimiento-finalizar', args=[self.mantenimiento.pk])
+        self.assertPresupuesto(url, 16, 'post', estado=302)
+
+    def test_finalizar_varios(self):
+        url = reverse('mantenimientos:mantenimiento-finalizar-varios')
+        self.assertPresupuesto(url, 23, 'post', lambda: {
+            'mantenimientos_seleccionados': [
+                str(pk) for pk in Mantenimiento.objects.values_list('pk', flat=True)
+            ],
+        }, estado=302)
+
+
+class FiltroPeriodoTests(PresupuestoConsultasTestCase):
+    """Los filtros de mes y año aceptan solo años con un rango de fechas válido"""
+
+    def test_leer_periodo(self):
+        self.assertEqual(leer_periodo({'mes': '12', 'año': str(AÑO_MAXIMO)}), (12, AÑO_MAXIMO))
+        self.assertEqual(leer_periodo({'mes': '13', 'año': '9999'}), (None, None))
+        self.assertEqual(leer_periodo({'mes': '0', 'año': '0'}), (None, None))
+        # isdigit() acepta '²', que int() no convierte
+        self.assertEqual(leer_periodo({'mes': '²', 'año': '2²'}), (None, None))
+
+    def test_año_limite(self):
+        url = reverse('mantenimientos:mantenimiento-list')
+        for params in ('?año=9999&mes=12', '?año=9999', f'?año={AÑO_MAXIMO}&mes=12', '?año=²&mes=²'):
+            response = self.client.get(url + params)
+            self.assertEqual(response.status_code, 200, params)
+
+
+class OperacionesMasivasTests(TestCase):
+    """
+    Las operaciones masivas del QuerySet de Mantenimiento, que no disparan
+    señales, mantienen el estado de los activos, los contadores y los
+    resúmenes de costos.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'clave')
+        subcategoria = SubCategoria.objects.create(
+            nombre='Laptop', categoria=Categoria.objects.create(nombre='Cómputo')
+        )
+        ubicacion = Ubicacion.objects.create(nombre='Sede')
+        cls.activos = [
+            Activo.objects.create(
+                subcategoria=subcategoria, ubicacion=ubicacion,
+                marca='Marca', modelo='Modelo', codigo_inventario=f'COD{i}',
+            )
+            for i in range(3)
+        ]
+
+    def nuevo(self, activo, costo=10, **campos):
+        return Mantenimiento(
+            activo=activo, tecnico='Técnico', telefono='123', descripcion='Revisión',
+            costo=Decimal(costo), **campos,
+        )
+
+    def estados(self):
+        return list(
+            Activo.objects.filter(pk__in=[a.pk for a in self.activos])
+            .order_by('pk').values_list('estado', flat=True)
+        )
+
+    def assertConsistente(self):
+        self.assertFalse(activos_desincronizados().exists())
+        self.assertEqual(contadores.verificar(), [])
+        self.assertEqual(costos.verificar(), [])
+
+    def test_bulk_create(self):
+        Mantenimiento.objects.bulk_create([
+            self.nuevo(self.activos[0]),
+            self.nuevo(self.activos[0], estado=Mantenimiento.EstadoMantenimiento.FINALIZADO),
+            self.nuevo(self.activos[1], estado=Mantenimiento.EstadoMantenimiento.FINALIZADO),
+        ])
+        EM, AC = Activo.EstadoActivo.EN_MANTENIMIENTO, Activo.EstadoActivo.ACTIVO
+        self.assertEqual(self.estados(), [EM, AC, AC])
+        self.assertConsistente()
+
+    def test_update_estado(self):
+        Mantenimiento.objects.bulk_create([self.nuevo(activo, 12.5) for activo in self.activos])
+        self.assertEqual(set(self.estados()), {Activo.EstadoActivo.EN_MANTENIMIENTO})
+
+        Mantenimiento.objects.filter(activo__in=self.activos[:2]).update(
+            estado=Mantenimiento.EstadoMantenimiento.FINALIZADO
+        )
+        EM, AC = Activo.EstadoActivo.EN_MANTENIMIENTO, Activo.EstadoActivo.ACTIVO
+        self.assertEqual(self.estados(), [AC, AC, EM])
+        self.assertConsistente()
+
+    def test_update_activo(self):
+        # Mover mantenimientos abiertos a otro activo corrige a ambos
+        Mantenimiento.objects.bulk_create([self.nuevo(self.activos[0]), self.nuevo(self.activos[0])])
+        Mantenimiento.objects.filter(activo=self.activos[0]).update(activo=self.activos[2])
+        EM, AC = Activo.EstadoActivo.EN_MANTENIMIENTO, Activo.EstadoActivo.ACTIVO
+        self.assertEqual(self.estados(), [AC, AC, EM])
+        self.assertConsistente()
+
+    def test_bulk_update(self):
+        mantenimientos = Mantenimiento.objects.bulk_create(
+            [self.nuevo(activo) for activo in self.activos for _ in range(2)]
+        )
+        for mantenimiento in mantenimientos[:4]:
+            mantenimiento.estado = Mantenimiento.EstadoMantenimiento.FINALIZADO
+            mantenimiento.costo = Decimal('7.25')
+
+        # Varios lotes, pero los resúmenes se recalculan una sola vez
+        with mock.patch.object(costos, 'recalcular', wraps=costos.recalcular) as recalcular:
+            filas = Mantenimiento.objects.bulk_update(mantenimientos, ['estado', 'costo'], batch_size=2)
+        self.assertEqual(filas, 6)
+        recalcular.assert_called_once()
+
+        EM, AC = Activo.EstadoActivo.EN_MANTENIMIENTO, Activo.EstadoActivo.ACTIVO
+        self.assertEqual(self.estados(), [AC, AC, EM])
+        self.assertConsistente()
+
+    def test_finalizar_varios(self):
+        mantenimientos = Mantenimiento.objects.bulk_create([self.nuevo(activo) for activo in self.activos])
+        self.client.force_login(self.admin)
+        response = self.client.post(reverse('mantenimientos:mantenimiento-finalizar-varios'), {
+            'mantenimientos_seleccionados': ['²'] + [str(m.pk) for m in mantenimientos[1:]],
+            'next': 'https://otro.example.com/',
+        })
+        self.assertRedirects(
+            response, reverse('mantenimientos:mantenimiento-list'), fetch_redirect_response=False
+        )
+        EM, AC = Activo.EstadoActivo.EN_MANTENIMIENTO, Activo.EstadoActivo.ACTIVO
+        self.assertEqual(self.estados(), [EM, AC, AC])
+        self.assertConsistente()
+
+
+class ResumenCostosTests(TestCase):
+    """Los resúmenes mantenidos por las señales coinciden con los mantenimientos"""
+
+    FINALIZADO = Mantenimiento.EstadoMantenimiento.FINALIZADO
+
+    @classmethod
+    def setUpTestData(cls):
+        subcategoria = SubCategoria.objects.create(
+            nombre='Laptop', categoria=Categoria.objects.create(nombre='Cómputo')
+        )
+        ubicacion = Ubicacion.objects.create(nombre='Sede')
+        cls.activo, cls.otro = [
+            Activo.objects.create(
+                subcategoria=subcategoria, ubicacion=ubicacion,
+                marca='Marca', modelo='Modelo', codigo_inventario=f'COD{i}',
+            )
+            for i in range(2)
+        ]
+
+    def crear(self, activo=None, costo='10', **campos):
+        return Mantenimiento.objects.create(
+            activo=activo or self.activo, tecnico='Técnico', telefono='123',
+            descripcion='Revisión', costo=Decimal(costo), **campos,
+        )
+
+    def assertResumenes(self):
+        almacenados = {
+            (r.anio, r.mes): (r.costo_finalizado, r.cantidad_finalizados)
+            for r in ResumenCostoMensual.objects.all() if r.cantidad_finalizados
+        }
+        self.assertEqual(almacenados, costos._resumen_real())
+        self.assertEqual(self.resumen_activos(), self.resumen_activos(reales=True))
+        self.assertEqual(costos.verificar(), [])
+
+    def resumen_activos(self, reales=False):
+        """Campos de resumen de cada activo, guardados o calculados desde el historial"""
+        expresiones = costos.expresiones_resumen_activo()
+        activos = Activo.objects.order_by('pk')
+        if reales:
+            activos = activos.annotate(**{f'real_{campo}': valor for campo, valor in expresiones.items()})
+            return list(activos.values_list(*(f'real_{campo}' for campo in expresiones)))
+        return list(activos.values_list(*expresiones))
+
+    def test_alta(self):
+        self.crear()
+        self.crear(costo='20.50', estado=self.FINALIZADO)
+        self.crear(self.otro, costo='4.25', estado=self.FINALIZADO)
+        self.assertResumenes()
+        hoy = date.today()
+        self.assertEqual(
+            ResumenCostoMensual.objects.get(anio=hoy.year, mes=hoy.month).costo_finalizado,
+            Decimal('24.75'),
+        )
+
+    def test_cambio_de_costo(self):
+        mantenimiento = self.crear(estado=self.FINALIZADO)
+        mantenimiento.costo = Decimal('35.50')
+        mantenimiento.save()
+        self.assertResumenes()
+
+        # Un guardado parcial de otro campo no cambia el costo guardado
+        mantenimiento.costo = Decimal('99')
+        mantenimiento.save(update_fields=['tecnico'])
+        self.assertResumenes()
+
+    def test_cambio_de_mes(self):
+        mantenimiento = self.crear(estado=self.FINALIZADO)
+        mantenimiento.fecha = date(2020, 2, 15)
+        mantenimiento.save()
+        self.assertResumenes()
+        self.assertTrue(ResumenCostoMensual.objects.filter(anio=2020, mes=2, cantidad_finalizados=1).exists())
+
+    def test_cambio_de_estado(self):
+        mantenimiento = self.crear(costo='12.25')
+        self.assertResumenes()
+        mantenimiento.estado = self.FINALIZADO
+        mantenimiento.save()
+        self.assertResumenes()
+        mantenimiento.estado = Mantenimiento.EstadoMantenimiento.EN_PROCESO
+        mantenimiento.save(update_fields=['estado'])
+        self.assertResumenes()
+
+    def test_resumen_del_activo(self):
+        self.crear(costo='10')
+        finalizado = self.crear(costo='2.50', estado=self.FINALIZADO)
+        activo = Activo.objects.get(pk=self.activo.pk)
+        self.assertEqual(activo.cantidad_mantenimientos, 2)
+        self.assertEqual(activo.mantenimientos_abiertos, 1)
+        self.assertEqual(activo.costo_mantenimiento_total, Decimal('12.50'))
+        self.assertEqual(activo.costo_mantenimiento_finalizado, Decimal('2.50'))
+        self.assertEqual(activo.fecha_ultimo_mantenimiento, date.today())
+
+        # Mover un mantenimiento antiguo a otro activo ajusta los dos
+        finalizado.fecha = date(2020, 2, 15)
+        finalizado.activo = self.otro
+        finalizado.save()
+        self.assertResumenes()
+        self.assertEqual(
+            Activo.objects.get(pk=self.otro.pk).fecha_ultimo_mantenimiento, date(2020, 2, 15)
+        )
 
-# Create your tests here.
+    def test_baja(self):
+        finalizado = self.crear(estado=self.FINALIZADO)
+        abierto = self.crear(self.otro)
+        # Se descuenta lo guardado, no los cambios pendientes en memoria
+        finalizado.costo = Decimal('500')
+        finalizado.delete()
+        abierto.delete()
+        self.assertResumenes()
@@ -18,4 +18,7 @@ urlpatterns = [
     
     # Finalizar mantenimiento
     path('<int:pk>/finalizar/', views.finalizar_mantenimiento, name='mantenimiento-finalizar'),
+    
+    # Finalizar varios mantenimientos
+    path('finalizar/', views.finalizar_mantenimientos, name='mantenimiento-finalizar-varios'),
 ]
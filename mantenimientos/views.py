@@ -3,19 +3,27 @@ from django.urls import reverse_lazy
 from django.views.generic import ListView, CreateView, UpdateView, DetailView
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib import messages
-from django.db.models import Q, Sum, Case, When, DecimalField
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
 from django.http import HttpResponseRedirect
 from activos.models import Activo
+from activos.historial import lote_historial
+from . import costos
+from .filtros import filtro_periodo, leer_periodo
 from .models import Mantenimiento
 from .forms import MantenimientoForm, MantenimientoFilterForm
 from django.contrib.auth.decorators import login_required
+from django.views.decorators.http import require_POST
+from core.navegacion import url_de_retorno
+from core.paginacion import CursorPaginationMixin
 
-class MantenimientoListView(LoginRequiredMixin, ListView):
+class MantenimientoListView(LoginRequiredMixin, CursorPaginationMixin, ListView):
     """Vista de lista de mantenimientos"""
     model = Mantenimiento
     template_name = 'mantenimientos/mantenimiento_list.html'
     context_object_name = 'mantenimientos'
     paginate_by = 25
+    cursor_ordering = ['-fecha', '-id']
     
     def get_queryset(self):
         queryset = super().get_queryset().select_related('activo__subcategoria__categoria', 'activo__ubicacion')
@@ -24,8 +32,7 @@ class MantenimientoListView(LoginRequiredMixin, ListView):
         estado = self.request.GET.get('estado', '')
         activo_id = self.request.GET.get('activo', '')
         buscar = self.request.GET.get('buscar', '')
-        mes = self.request.GET.get('mes', '')
-        año = self.request.GET.get('año', '')
+        mes, año = leer_periodo(self.request.GET)
         
         if estado:
             queryset = queryset.filter(estado=estado)
@@ -37,66 +44,45 @@ class MantenimientoListView(LoginRequiredMixin, ListView):
                 Q(descripcion__icontains=buscar) |
                 Q(activo__codigo_inventario__icontains=buscar)
             )
-        if mes:
-            queryset = queryset.filter(fecha__month=mes)
-        if año:
-            queryset = queryset.filter(fecha__year=año)
         
-        return queryset
+        # Mes/año como rangos de fechas, para que usen los índices sobre fecha
+        return filtro_periodo(queryset, mes, año)
     
     def get_context_data(self, **kwargs):
-        from datetime import datetime
         context = super().get_context_data(**kwargs)
         context['filter_form'] = MantenimientoFilterForm(self.request.GET or None)
         
-        # Estadísticas generales (sobre la data filtrada)
-        queryset = self.get_queryset()
-        context['total_mantenimientos'] = queryset.count()
-        context['mantenimientos_en_proceso'] = queryset.filter(estado=Mantenimiento.EstadoMantenimiento.EN_PROCESO).count()
-        context['mantenimientos_finalizados'] = queryset.filter(estado=Mantenimiento.EstadoMantenimiento.FINALIZADO).count()
-        
-        # Costos separados por estado (SOLO de la data filtrada)
-        en_proceso_queryset = queryset.filter(estado=Mantenimiento.EstadoMantenimiento.EN_PROCESO)
-        finalizados_queryset = queryset.filter(estado=Mantenimiento.EstadoMantenimiento.FINALIZADO)
-        
-        context['costo_en_proceso'] = en_proceso_queryset.aggregate(total=Sum('costo'))['total'] or 0
-        context['costo_finalizado'] = finalizados_queryset.aggregate(total=Sum('costo'))['total'] or 0
-        context['costo_total'] = context['costo_en_proceso'] + context['costo_finalizado']
-        
-        # Estadísticas globales (sin filtros de estado, solo fecha)
-        # Queryset base para estadísticas temporales
-        all_mantenimientos = Mantenimiento.objects.all()
-        
-        # Filtrar por mes/año si están presentes
-        mes = self.request.GET.get('mes', '')
-        año = self.request.GET.get('año', '')
-        
-        if mes:
-            all_mantenimientos = all_mantenimientos.filter(fecha__month=mes)
-        if año:
-            all_mantenimientos = all_mantenimientos.filter(fecha__year=año)
-        
-        # Costos este mes (mes actual)
-        current_month = datetime.now().month
-        current_year = datetime.now().year
-        
-        mantenimientos_mes_actual = Mantenimiento.objects.filter(
-            fecha__month=current_month,
-            fecha__year=current_year,
-            estado=Mantenimiento.EstadoMantenimiento.FINALIZADO
+        # Estadísticas generales y costos por estado (sobre la data filtrada), en una consulta
+        en_proceso = Q(estado=Mantenimiento.EstadoMantenimiento.EN_PROCESO)
+        finalizado = Q(estado=Mantenimiento.EstadoMantenimiento.FINALIZADO)
+        estadisticas = self.object_list.order_by().aggregate(
+            total=Count('pk'),
+            en_proceso=Count('pk', filter=en_proceso),
+            finalizados=Count('pk', filter=finalizado),
+            costo_en_proceso=Sum('costo', filter=en_proceso),
+            costo_finalizado=Sum('costo', filter=finalizado),
         )
-        context['gastos_mes_actual'] = mantenimientos_mes_actual.aggregate(total=Sum('costo'))['total'] or 0
+        context['total_mantenimientos'] = estadisticas['total']
+        context['mantenimientos_en_proceso'] = estadisticas['en_proceso']
+        context['mantenimientos_finalizados'] = estadisticas['finalizados']
+        context['costo_en_proceso'] = estadisticas['costo_en_proceso'] or 0
+        context['costo_finalizado'] = estadisticas['costo_finalizado'] or 0
+        context['costo_total'] = context['costo_en_proceso'] + context['costo_finalizado']
         
-        # Costos este año
-        mantenimientos_año_actual = Mantenimiento.objects.filter(
-            fecha__year=current_year,
-            estado=Mantenimiento.EstadoMantenimiento.FINALIZADO
-        )
-        context['gastos_año_actual'] = mantenimientos_año_actual.aggregate(total=Sum('costo'))['total'] or 0
+        # Gastos reales (solo finalizados) desde el resumen mensual de costos:
+        # mes y año actuales, y período filtrado por mes/año (sin otros filtros)
+        periodo = Q()
+        mes, año = leer_periodo(self.request.GET)
+        if mes is not None:
+            periodo &= Q(mes=mes)
+        if año is not None:
+            periodo &= Q(anio=año)
         
-        # Total de costos finalizados del período filtrado
-        finalizados_periodo = all_mantenimientos.filter(estado=Mantenimiento.EstadoMantenimiento.FINALIZADO)
-        context['total_gastado_periodo'] = finalizados_periodo.aggregate(total=Sum('costo'))['total'] or 0
+        hoy = timezone.localdate()
+        gastos = costos.gastos(hoy.year, hoy.month, periodo or None)
+        context['gastos_mes_actual'] = gastos['mes_actual']
+        context['gastos_año_actual'] = gastos['anio_actual']
+        context['total_gastado_periodo'] = gastos['periodo']
         
         return context
 
@@ -123,8 +109,10 @@ class MantenimientoCreateView(LoginRequiredMixin, CreateView):
         return context
     
     def form_valid(self, form):
+        with lote_historial(self.request.user):
+            response = super().form_valid(form)
         messages.success(self.request, '✅ Mantenimiento agregado correctamente.')
-        return super().form_valid(form)
+        return response
     
     def get_success_url(self):
         """Redirigir al detalle del activo si viene de ahí"""
@@ -142,8 +130,10 @@ class MantenimientoUpdateView(LoginRequiredMixin, UpdateView):
     success_url = reverse_lazy('mantenimientos:mantenimiento-list')
     
     def form_valid(self, form):
+        with lote_historial(self.request.user):
+            response = super().form_valid(form)
         messages.success(self.request, '✅ Mantenimiento actualizado correctamente.')
-        return super().form_valid(form)
+        return response
 
 class MantenimientoDetailView(LoginRequiredMixin, DetailView):
     """Vista de detalle de un mantenimiento"""
@@ -161,7 +151,8 @@ def finalizar_mantenimiento(request, pk):
     
     if mantenimiento.estado == Mantenimiento.EstadoMantenimiento.EN_PROCESO:
         mantenimiento.estado = Mantenimiento.EstadoMantenimiento.FINALIZADO
-        mantenimiento.save()
+        with lote_historial(request.user):
+            mantenimiento.save()
         messages.success(
             request, 
             f'✅ Mantenimiento finalizado correctamente. Costo aplicado: ${mantenimiento.costo}'
@@ -170,4 +161,22 @@ def finalizar_mantenimiento(request, pk):
         messages.warning(request, '⚠️ Este mantenimiento ya está finalizado.')
     
     # Redirigir a la página anterior o a la lista
-    return HttpResponseRedirect(request.META.get('HTTP_REFERER', reverse_lazy('mantenimientos:mantenimiento-list')))
\ No newline at end of file
+    return HttpResponseRedirect(url_de_retorno(request, 'mantenimientos:mantenimiento-list'))
+
+@login_required
+@require_POST
+def finalizar_mantenimientos(request):
+    """Finaliza los mantenimientos seleccionados con un único UPDATE"""
+    ids = [pk for pk in request.POST.getlist('mantenimientos_seleccionados') if pk.isdecimal()]
+    
+    with lote_historial(request.user):
+        finalizados = Mantenimiento.objects.filter(
+            pk__in=ids, estado=Mantenimiento.EstadoMantenimiento.EN_PROCESO
+        ).update(estado=Mantenimiento.EstadoMantenimiento.FINALIZADO, fecha_actualizacion=timezone.now())
+    
+    if finalizados:
+        messages.success(request, f'✅ {finalizados} mantenimiento(s) finalizado(s) correctamente.')
+    else:
+        messages.warning(request, '⚠️ No se seleccionaron mantenimientos en proceso.')
+    
+    return HttpResponseRedirect(url_de_retorno(request, 'mantenimientos:mantenimiento-list'))
@@ -4,4 +4,13 @@ from django.apps import AppConfig
 class ReportesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'reportes'
-    verbose_name = 'Reportes'
\ No newline at end of file
+    verbose_name = 'Reportes'
+
+    def ready(self):
+        # El motor PDF y su tema se cargan en el primer uso salvo que se pida
+        # precargarlos en el proceso maestro (p. ej. gunicorn --preload) antes
+        # de crear los workers
+        from django.conf import settings
+        if getattr(settings, 'REPORTES_PRECARGAR_PDF', False):
+            from . import pdf
+            pdf.tema()
@@ -0,0 +1,183 @@
+"""
+Benchmark del motor de reportes PDF (ver el comando `benchmark_reportes`).
+
+Construye con `construir_pdf` el reporte general y la nota de entrega sobre
+los primeros N activos (por pk) de la base de datos, con el mismo contexto
+que arma el worker de reportes. Para cada caso mide:
+
+- el tiempo total (mediana de varias repeticiones, sin instrumentar),
+- el pico de memoria asignada por Python (tracemalloc, en una corrida aparte)
+  y el RSS máximo del proceso,
+- el tamaño del PDF, sus páginas y las páginas por segundo.
+
+Los resultados se guardan en JSON junto con las versiones y el commit, para
+comparar corridas en el tiempo. Para volúmenes grandes, generar antes los
+datos con `generar_datos_sinteticos`.
+"""
+import io
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import django
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from activos.models import Activo
+
+from .models import ReporteGenerado
+from .tareas import construir_contexto
+from .utils import construir_pdf
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+TAMANOS = (10, 1000, 10000, 50000)
+TIPOS = {
+    'general': ReporteGenerado.TipoReporte.GENERAL,
+    'nota_entrega': ReporteGenerado.TipoReporte.NOTA_ENTREGA,
+}
+# Cada página del PDF es un objeto /Type /Page (el árbol es /Type /Pages)
+_PAGINA = re.compile(rb'/Type\s*/Page\b')
+
+
+def contexto(tipo, pks):
+    """Contexto del PDF de `tipo` para los activos con pk en el rango [primero, último]"""
+    filtros = {}
+    if tipo == ReporteGenerado.TipoReporte.NOTA_ENTREGA:
+        filtros = {'responsable_entrega': 'Benchmark', 'observaciones': 'Entrega de prueba'}
+    reporte = ReporteGenerado(tipo=tipo, filtros_aplicados=filtros, fecha_generacion=timezone.now())
+    context = construir_contexto(reporte)
+    # Un rango de pk en lugar de id__in: SQLite limita los parámetros por consulta
+    rango = {'pk__gte': pks[0], 'pk__lte': pks[-1]}
+    if tipo == ReporteGenerado.TipoReporte.NOTA_ENTREGA:
+        context['activos'] = Activo.objects.filter(**rango)
+    else:
+        context['activos'] = context['activos'].filter(**rango)
+    return context
+
+
+def construir(tipo, pks):
+    buffer = io.BytesIO()
+    construir_pdf(contexto(tipo, pks), buffer)
+    return buffer.getvalue()
+
+
+def contar_paginas(pdf):
+    return len(_PAGINA.findall(pdf))
+
+
+def max_rss_mb():
+    """RSS máximo del proceso hasta ahora (no disponible en Windows)"""
+    if resource is None:
+        return None
+    maximo = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux lo informa en KiB y macOS en bytes
+    return round(maximo / (2 ** 20 if sys.platform == 'darwin' else 2 ** 10), 1)
+
+
+def medir(tipo, pks, repeticiones=3):
+    """Métricas de un caso: `repeticiones` corridas cronometradas y una con tracemalloc"""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        pdf = construir(tipo, pks)
+        tiempos.append(time.perf_counter() - inicio)
+
+    tracemalloc.start()
+    try:
+        construir(tipo, pks)
+        _actual, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    mediana = statistics.median(tiempos)
+    paginas = contar_paginas(pdf)
+    return {
+        'tiempo_s': round(mediana, 4),
+        'tiempo_min_s': round(min(tiempos), 4),
+        'pico_memoria_mb': round(pico / 2 ** 20, 1),
+        'max_rss_mb': max_rss_mb(),
+        'bytes': len(pdf),
+        'paginas': paginas,
+        'paginas_por_segundo': round(paginas / mediana, 1) if mediana else None,
+    }
+
+
+def _commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def entorno():
+    """Datos de la corrida que permiten comparar resultados en el tiempo"""
+    import reportlab
+
+    return {
+        'fecha': timezone.localtime().isoformat(timespec='seconds'),
+        'commit': _commit(),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'reportlab': reportlab.Version,
+        'base_de_datos': connection.vendor,
+        'plataforma': platform.platform(),
+    }
+
+
+def ejecutar(tamanos=TAMANOS, tipos=tuple(TIPOS), repeticiones=3, al_medir=None):
+    """
+    Mide cada tipo de reporte con cada tamaño disponible. Los tamaños mayores
+    que la cantidad de activos se omiten. `al_medir(resultado)` se llama
+    después de cada caso.
+    """
+    pks = list(Activo.objects.order_by('pk').values_list('pk', flat=True)[:max(tamanos)])
+    resultados = []
+    if pks:
+        # Calentamiento: fuentes, imágenes e importaciones de ReportLab
+        construir(TIPOS[tipos[0]], pks[:1])
+
+    for filas in sorted(tamanos):
+        for nombre in tipos:
+            resultado = {'tipo': nombre, 'filas': filas, 'repeticiones': repeticiones}
+            if filas > len(pks):
+                resultado['omitido'] = f'solo hay {len(pks)} activos'
+            else:
+                resultado.update(medir(TIPOS[nombre], pks[:filas], repeticiones))
+            resultados.append(resultado)
+            if al_medir is not None:
+                al_medir(resultado)
+
+    return {'entorno': entorno(), 'resultados': resultados}
+
+
+def comparar(anterior, actual):
+    """
+    Variación porcentual de tiempo, memoria y tamaño respecto de una corrida
+    anterior, por (tipo, filas) presentes en ambas.
+    """
+    previos = {
+        (r['tipo'], r['filas']): r for r in anterior['resultados'] if 'omitido' not in r
+    }
+    variaciones = []
+    for resultado in actual['resultados']:
+        previo = previos.get((resultado['tipo'], resultado['filas']))
+        if previo is None or 'omitido' in resultado:
+            continue
+        variacion = {'tipo': resultado['tipo'], 'filas': resultado['filas']}
+        for campo in ('tiempo_s', 'pico_memoria_mb', 'bytes'):
+            if previo[campo]:
+                variacion[campo] = round((resultado[campo] - previo[campo]) / previo[campo] * 100, 1)
+        variaciones.append(variacion)
+    return variaciones
@@ -0,0 +1,169 @@
+"""
+Caché en disco de los reportes PDF, direccionada por contenido.
+
+La clave de un reporte es el SHA-256 de su tipo, los filtros normalizados,
+la fecha (que aparece impresa en el documento) y una versión de los datos
+del inventario. Cualquier cambio en los activos o en los catálogos que se
+imprimen cambia la versión, de modo que nunca se sirve un PDF desactualizado
+y no hace falta invalidar entradas: las obsoletas simplemente dejan de
+usarse y salen por antigüedad.
+
+Los archivos se guardan en `settings.REPORTES_CACHE_DIR`. Cada acierto
+actualiza el mtime del archivo y, al superar `REPORTES_CACHE_MAX_MB`, se
+eliminan los menos usados recientemente (LRU por mtime). Los archivos se
+abren antes de servirlos, de modo que una depuración concurrente no afecta
+a una respuesta en curso; si el archivo ya no existe se genera de nuevo.
+"""
+import hashlib
+import json
+import os
+
+from django.conf import settings
+from django.db.models import Count, Max, Sum
+from django.http import FileResponse, HttpResponseNotModified
+from django.utils import timezone
+
+from activos import contadores
+from activos.busqueda import normalizar_texto
+from activos.models import Activo, ContadorEstado
+from usuarios.models import UsuarioAsignado
+
+EXTENSION = '.pdf'
+
+
+def directorio_cache():
+    directorio = getattr(
+        settings, 'REPORTES_CACHE_DIR', settings.BASE_DIR / 'reportes_generados' / 'cache'
+    )
+    os.makedirs(directorio, exist_ok=True)
+    return directorio
+
+
+def limite_bytes():
+    return getattr(settings, 'REPORTES_CACHE_MAX_MB', 200) * 1024 * 1024
+
+
+def version_datos():
+    """
+    Versión de los datos que se imprimen en los reportes.
+
+    Combina la última modificación de activos y usuarios (columnas indexadas,
+    que también cambian con las actualizaciones masivas), el total de activos
+    según los contadores de inventario (cubre las bajas) y la versión del
+    inventario, que se renueva al modificar los catálogos (ver
+    activos.contadores), en lugar de recorrer sus nombres en cada solicitud.
+    """
+    activos = Activo.objects.aggregate(ultimo=Max('fecha_actualizacion'))
+    usuarios = UsuarioAsignado.objects.aggregate(ultimo=Max('fecha_actualizacion'), total=Count('pk'))
+    total = ContadorEstado.objects.aggregate(total=Sum('total'))['total']
+
+    return [
+        activos['ultimo'].isoformat() if activos['ultimo'] else None,
+        total,
+        usuarios['ultimo'].isoformat() if usuarios['ultimo'] else None,
+        usuarios['total'],
+        contadores.version_inventario(),
+    ]
+
+
+def normalizar_filtros(filtros):
+    """Descarta filtros vacíos y normaliza el término de búsqueda"""
+    normalizados = {}
+    for clave, valor in filtros.items():
+        valor = str(valor).strip()
+        if clave == 'buscar':
+            valor = normalizar_texto(valor)
+        if valor:
+            normalizados[clave] = valor
+    return normalizados
+
+
+def clave_reporte(tipo, filtros):
+    """Clave (hash hexadecimal) del reporte para los datos actuales"""
+    contenido = json.dumps({
+        'tipo': tipo,
+        'filtros': normalizar_filtros(filtros),
+        'fecha': timezone.localdate().isoformat(),
+        'version': version_datos(),
+    }, sort_keys=True)
+    return hashlib.sha256(contenido.encode()).hexdigest()
+
+
+def _ruta(clave):
+    return os.path.join(directorio_cache(), clave + EXTENSION)
+
+
+def obtener(clave):
+    """Retorna el PDF en caché abierto para lectura, o None si no existe"""
+    ruta = _ruta(clave)
+    try:
+        # Marca el acceso para la política LRU
+        os.utime(ruta)
+        return open(ruta, 'rb')
+    except FileNotFoundError:
+        return None
+
+
+def guardar(clave, construir):
+    """
+    Genera el PDF con `construir(destino)` y lo guarda en la caché.
+
+    Retorna el archivo guardado, abierto para lectura.
+    """
+    ruta = _ruta(clave)
+    temporal = f'{ruta}.{os.getpid()}.tmp'
+    try:
+        construir(temporal)
+        os.replace(temporal, ruta)
+        archivo = open(ruta, 'rb')
+    finally:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+    depurar()
+    return archivo
+
+
+def depurar(limite=None):
+    """Elimina los archivos menos usados hasta quedar bajo el límite de tamaño"""
+    limite = limite_bytes() if limite is None else limite
+    archivos = []
+    total = 0
+    with os.scandir(directorio_cache()) as entradas:
+        for entrada in entradas:
+            if not entrada.name.endswith(EXTENSION):
+                continue
+            info = entrada.stat()
+            archivos.append((info.st_mtime, info.st_size, entrada.path))
+            total += info.st_size
+
+    archivos.sort()
+    for _mtime, tamano, ruta in archivos:
+        if total <= limite:
+            break
+        try:
+            os.remove(ruta)
+        except OSError:
+            # Ya eliminado por otro proceso, o abierto (Windows)
+            continue
+        total -= tamano
+
+
+def respuesta(request, clave, filename, construir):
+    """
+    Sirve el PDF de `clave` desde la caché, generándolo con `construir(destino)`
+    si no está, con ETag y Content-Length, o 304 si el cliente ya lo tiene.
+    """
+    etag = f'"{clave}"'
+    if etag in request.headers.get('If-None-Match', ''):
+        response = HttpResponseNotModified()
+        response['ETag'] = etag
+        return response
+
+    archivo = obtener(clave)
+    if archivo is None:
+        archivo = guardar(clave, construir)
+    response = FileResponse(archivo, as_attachment=True, filename=filename,
+                            content_type='application/pdf')
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
@@ -0,0 +1,87 @@
+"""
+Exportación de activos en CSV y JSON Lines.
+
+Las filas se leen con `values_list(...).iterator(chunk_size=...)` (cursor del
+lado del servidor en PostgreSQL) y se envían con `StreamingHttpResponse` a
+medida que se generan, por lo que exportar todo el inventario usa memoria
+constante y la descarga empieza de inmediato.
+"""
+import csv
+import json
+
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from activos.models import Activo
+
+# Tamaño de cada bloque leído del cursor
+TAMANO_BLOQUE = 2000
+
+# (clave JSON, encabezado CSV, campo) de cada columna exportada
+COLUMNAS = [
+    ('codigo_inventario', 'Código', 'codigo_inventario'),
+    ('categoria', 'Categoría', 'subcategoria__categoria__nombre'),
+    ('subcategoria', 'Subcategoría', 'subcategoria__nombre'),
+    ('marca', 'Marca', 'marca'),
+    ('modelo', 'Modelo', 'modelo'),
+    ('numero_serial', 'Serial', 'numero_serial'),
+    ('ubicacion', 'Ubicación', 'ubicacion__nombre'),
+    ('estado', 'Estado', 'estado'),
+    ('usuario_asignado', 'Usuario Asignado', 'usuario_asignado__nombres'),
+    ('observaciones', 'Observaciones', 'observaciones'),
+    ('fecha_creacion', 'Fecha de Registro', 'fecha_creacion'),
+]
+
+# Campos leídos de la base de datos; el último completa el nombre del usuario
+_CAMPOS = [campo for _clave, _encabezado, campo in COLUMNAS] + ['usuario_asignado__apellidos']
+
+
+class Echo:
+    """Objeto tipo archivo que retorna lo escrito en lugar de guardarlo"""
+
+    def write(self, valor):
+        return valor
+
+
+def filas_activos(queryset):
+    """Genera una lista de valores por activo, en el orden de COLUMNAS"""
+    estados = dict(Activo.EstadoActivo.choices)
+    i_estado = _CAMPOS.index('estado')
+    i_nombres = _CAMPOS.index('usuario_asignado__nombres')
+    i_fecha = _CAMPOS.index('fecha_creacion')
+
+    for valores in queryset.values_list(*_CAMPOS).iterator(chunk_size=TAMANO_BLOQUE):
+        fila = list(valores[:len(COLUMNAS)])
+        fila[i_estado] = estados.get(fila[i_estado], fila[i_estado])
+        if fila[i_nombres] is not None:
+            fila[i_nombres] = f'{fila[i_nombres]} {valores[-1]}'
+        fila[i_fecha] = timezone.localtime(fila[i_fecha]).isoformat(timespec='seconds')
+        yield fila
+
+
+def _generar_csv(queryset):
+    escritor = csv.writer(Echo())
+    # BOM para que Excel reconozca la codificación UTF-8
+    yield '\ufeff' + escritor.writerow([encabezado for _clave, encabezado, _campo in COLUMNAS])
+    for fila in filas_activos(queryset):
+        yield escritor.writerow(fila)
+
+
+def _generar_jsonl(queryset):
+    claves = [clave for clave, _encabezado, _campo in COLUMNAS]
+    for fila in filas_activos(queryset):
+        yield json.dumps(dict(zip(claves, fila)), ensure_ascii=False) + '\n'
+
+
+FORMATOS = {
+    'csv': (_generar_csv, 'text/csv; charset=utf-8'),
+    'jsonl': (_generar_jsonl, 'application/x-ndjson; charset=utf-8'),
+}
+
+
+def respuesta_exportacion(queryset, formato, nombre_archivo):
+    """Retorna una StreamingHttpResponse con los activos en el formato dado"""
+    generador, content_type = FORMATOS[formato]
+    response = StreamingHttpResponse(generador(queryset), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{nombre_archivo}.{formato}"'
+    return response
@@ -0,0 +1,98 @@
+import json
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from reportes import benchmark
+
+
+def porcentaje(valor):
+    return '-' if valor is None else f'{valor:+.1f}'
+
+
+class Command(BaseCommand):
+    help = 'Mide tiempo, memoria, tamaño y páginas por segundo de los reportes PDF'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--filas',
+            type=int,
+            nargs='+',
+            default=list(benchmark.TAMANOS),
+            help='Cantidades de activos por reporte',
+        )
+        parser.add_argument(
+            '--tipo',
+            choices=list(benchmark.TIPOS),
+            action='append',
+            dest='tipos',
+            help='Reporte a medir (se puede repetir); por defecto, todos',
+        )
+        parser.add_argument(
+            '--repeticiones',
+            type=int,
+            default=3,
+            help='Corridas cronometradas por caso (se informa la mediana)',
+        )
+        parser.add_argument(
+            '--salida',
+            help='Archivo JSON de resultados; por defecto, benchmarks/reportes_<fecha>.json',
+        )
+        parser.add_argument(
+            '--comparar',
+            metavar='JSON',
+            help='Resultados anteriores con los que comparar esta corrida',
+        )
+
+    def handle(self, *args, **options):
+        anterior = None
+        if options['comparar']:
+            try:
+                with open(options['comparar'], encoding='utf-8') as archivo:
+                    anterior = json.load(archivo)
+            except (OSError, ValueError) as e:
+                raise CommandError(f'No se pudo leer {options["comparar"]}: {e}')
+
+        self.stdout.write(
+            f'{"tipo":<14}{"filas":>8}{"tiempo s":>11}{"pico MB":>10}{"RSS MB":>9}'
+            f'{"bytes":>12}{"páginas":>9}{"pág/s":>9}'
+        )
+        resultados = benchmark.ejecutar(
+            options['filas'],
+            tuple(options['tipos'] or benchmark.TIPOS),
+            options['repeticiones'],
+            al_medir=self.mostrar,
+        )
+
+        salida = options['salida'] or os.path.join(
+            settings.BASE_DIR, 'benchmarks',
+            f'reportes_{timezone.localtime().strftime("%Y%m%d_%H%M%S")}.json',
+        )
+        os.makedirs(os.path.dirname(os.path.abspath(salida)), exist_ok=True)
+        with open(salida, 'w', encoding='utf-8') as archivo:
+            json.dump(resultados, archivo, ensure_ascii=False, indent=2)
+        self.stdout.write(self.style.SUCCESS(f'Resultados guardados en {salida}'))
+
+        if anterior is not None:
+            self.stdout.write(f'Variación respecto de {options["comparar"]} (%):')
+            for variacion in benchmark.comparar(anterior, resultados):
+                self.stdout.write(
+                    f'  {variacion["tipo"]:<14}{variacion["filas"]:>8}  '
+                    f'tiempo {porcentaje(variacion.get("tiempo_s")):>7}  '
+                    f'memoria {porcentaje(variacion.get("pico_memoria_mb")):>7}  '
+                    f'bytes {porcentaje(variacion.get("bytes")):>7}'
+                )
+
+    def mostrar(self, resultado):
+        if 'omitido' in resultado:
+            self.stdout.write(
+                f'{resultado["tipo"]:<14}{resultado["filas"]:>8}  omitido: {resultado["omitido"]}'
+            )
+            return
+        self.stdout.write(
+            f'{resultado["tipo"]:<14}{resultado["filas"]:>8}{resultado["tiempo_s"]:>11.3f}'
+            f'{resultado["pico_memoria_mb"]:>10.1f}{resultado["max_rss_mb"] or "-":>9}'
+            f'{resultado["bytes"]:>12}{resultado["paginas"]:>9}{resultado["paginas_por_segundo"]:>9}'
+        )
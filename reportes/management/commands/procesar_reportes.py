@@ -0,0 +1,61 @@
+import threading
+
+from django.core.management.base import BaseCommand
+
+from reportes import tareas
+
+
+class Command(BaseCommand):
+    help = 'Procesa la cola de reportes PDF pendientes con un grupo de workers locales'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=2,
+            help='Cantidad de hilos que procesan reportes en paralelo',
+        )
+        parser.add_argument(
+            '--continuo',
+            action='store_true',
+            help='Sigue esperando nuevos trabajos en lugar de terminar con la cola vacía',
+        )
+        parser.add_argument(
+            '--intervalo',
+            type=float,
+            default=2,
+            help='Segundos entre consultas a la cola en modo continuo',
+        )
+        parser.add_argument(
+            '--liberar-colgados',
+            type=int,
+            metavar='MINUTOS',
+            help='Reencola los trabajos que llevan más de MINUTOS minutos procesándose',
+        )
+
+    def handle(self, *args, **options):
+        if options['liberar_colgados'] is not None:
+            liberados = tareas.liberar_colgados(options['liberar_colgados'])
+            self.stdout.write(f'{liberados} trabajos devueltos a la cola.')
+
+        detener = threading.Event() if options['continuo'] else None
+        hilos = [
+            threading.Thread(
+                target=tareas.ejecutar_worker,
+                args=(detener, options['intervalo']),
+                name=f'reportes-worker-{i}',
+            )
+            for i in range(max(options['workers'], 1))
+        ]
+        for hilo in hilos:
+            hilo.start()
+        try:
+            for hilo in hilos:
+                hilo.join()
+        except KeyboardInterrupt:
+            if detener is not None:
+                detener.set()
+            for hilo in hilos:
+                hilo.join()
+
+        self.stdout.write(self.style.SUCCESS('Cola de reportes procesada.'))
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.7 on 2026-10-18 08:22
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reportes', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reportegenerado',
+            name='estado',
+            field=models.CharField(choices=[('PE', 'Pendiente'), ('PR', 'Procesando'), ('CO', 'Completado'), ('ER', 'Error')], default='PE', max_length=2, verbose_name='Estado'),
+        ),
+        migrations.AddField(
+            model_name='reportegenerado',
+            name='fecha_fin',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Fin del Procesamiento'),
+        ),
+        migrations.AddField(
+            model_name='reportegenerado',
+            name='fecha_inicio',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Inicio del Procesamiento'),
+        ),
+        migrations.AddField(
+            model_name='reportegenerado',
+            name='mensaje_error',
+            field=models.TextField(blank=True, verbose_name='Mensaje de Error'),
+        ),
+        migrations.AlterField(
+            model_name='reportegenerado',
+            name='cantidad_activos',
+            field=models.PositiveIntegerField(default=0, verbose_name='Cantidad de Activos'),
+        ),
+        migrations.AddIndex(
+            model_name='reportegenerado',
+            index=models.Index(fields=['estado', 'fecha_generacion'], name='reportes_cola_idx'),
+        ),
+    ]
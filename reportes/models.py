@@ -9,6 +9,12 @@ class ReporteGenerado(models.Model):
         GENERAL = 'GE', 'Reporte General de Activos'
         NOTA_ENTREGA = 'NE', 'Nota de Entrega'
     
+    class EstadoReporte(models.TextChoices):
+        PENDIENTE = 'PE', 'Pendiente'
+        PROCESANDO = 'PR', 'Procesando'
+        COMPLETADO = 'CO', 'Completado'
+        ERROR = 'ER', 'Error'
+    
     tipo = models.CharField(
         max_length=2,
         choices=TipoReporte.choices,
@@ -27,17 +33,34 @@ class ReporteGenerado(models.Model):
         blank=True,
         verbose_name='Filtros Aplicados'
     )
-    cantidad_activos = models.PositiveIntegerField(verbose_name='Cantidad de Activos')
+    cantidad_activos = models.PositiveIntegerField(default=0, verbose_name='Cantidad de Activos')
     archivo_nombre = models.CharField(
         max_length=255,
         blank=True,
         verbose_name='Nombre del Archivo'
     )
+    estado = models.CharField(
+        max_length=2,
+        choices=EstadoReporte.choices,
+        default=EstadoReporte.PENDIENTE,
+        verbose_name='Estado'
+    )
+    mensaje_error = models.TextField(blank=True, verbose_name='Mensaje de Error')
+    fecha_inicio = models.DateTimeField(null=True, blank=True, verbose_name='Inicio del Procesamiento')
+    fecha_fin = models.DateTimeField(null=True, blank=True, verbose_name='Fin del Procesamiento')
     
     class Meta:
         verbose_name = "Reporte Generado"
         verbose_name_plural = "Reportes Generados"
         ordering = ['-fecha_generacion']
+        indexes = [
+            # Cola de trabajos: los pendientes más antiguos primero
+            models.Index(fields=['estado', 'fecha_generacion'], name='reportes_cola_idx'),
+        ]
     
     def __str__(self):
-        return f"{self.get_tipo_display()} - {self.fecha_generacion.strftime('%d/%m/%Y %H:%M')}"
\ No newline at end of file
+        return f"{self.get_tipo_display()} - {self.fecha_generacion.strftime('%d/%m/%Y %H:%M')}"
+    
+    @property
+    def terminado(self):
+        return self.estado in (self.EstadoReporte.COMPLETADO, self.EstadoReporte.ERROR)
@@ -0,0 +1,486 @@
+"""
+Motor de los reportes PDF institucionales (ReportLab).
+
+Importar este módulo carga buena parte de ReportLab, por lo que solo se
+importa al generar el primer PDF (ver `reportes.utils.construir_pdf`) o, si
+`REPORTES_PRECARGAR_PDF` está activo, al iniciar la aplicación, para que un
+servidor que carga la app antes de crear sus workers (p. ej. gunicorn
+--preload) lo comparta entre ellos.
+"""
+import bisect
+import io
+import itertools
+import os
+import threading
+from django.conf import settings
+from django.http import HttpResponse
+from django.db.models import QuerySet
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch, cm
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Flowable, HRFlowable
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER, TA_RIGHT
+from reportlab.lib.utils import ImageReader
+
+from activos.models import Activo
+
+_tema = None
+_tema_lock = threading.Lock()
+
+
+class Logo(Flowable):
+    """
+    Dibuja una imagen ya decodificada (ImageReader) con un tamaño fijo
+    
+    A diferencia de `Image`, no abre el archivo en cada reporte: la imagen
+    del tema se comparte entre reportes e hilos y solo se lee.
+    """
+    
+    def __init__(self, imagen, width, height):
+        super().__init__()
+        self.imagen = imagen
+        self.width = width
+        self.height = height
+        self.hAlign = 'CENTER'
+    
+    def wrap(self, availWidth, availHeight):
+        return self.width, self.height
+    
+    def draw(self):
+        self.canv.drawImage(self.imagen, 0, 0, self.width, self.height, mask='auto')
+
+
+class Tema:
+    """
+    Estilos de párrafo, estilos de tabla y logo de los reportes
+    
+    Se construye una sola vez por proceso (ver `tema()`) y se comparte entre
+    todos los reportes, incluso los que se generan en paralelo, por lo que
+    sus atributos no deben modificarse.
+    """
+    
+    def __init__(self):
+        styles = getSampleStyleSheet()
+        
+        # Estilo para el título principal
+        self.titulo = ParagraphStyle(
+            'InstitutionalTitle',
+            parent=styles['Heading1'],
+            fontSize=20,
+            spaceAfter=20,
+            alignment=TA_CENTER,
+            textColor=colors.HexColor('#32407b'),
+            fontName='Helvetica-Bold'
+        )
+        
+        # Estilo para subtítulos
+        self.subtitulo = ParagraphStyle(
+            'InstitutionalSubtitle',
+            parent=styles['Heading2'],
+            fontSize=14,
+            spaceAfter=15,
+            textColor=colors.HexColor('#32407b'),
+            fontName='Helvetica-Bold'
+        )
+        
+        # Estilo para texto normal
+        self.normal = ParagraphStyle(
+            'InstitutionalNormal',
+            parent=styles['Normal'],
+            fontSize=10,
+            spaceAfter=6,
+            fontName='Helvetica'
+        )
+        
+        # Estilo para información del reporte
+        self.info = ParagraphStyle(
+            'ReportInfo',
+            parent=styles['Normal'],
+            fontSize=9,
+            spaceAfter=4,
+            fontName='Helvetica'
+        )
+        
+        # Estilo para los datos de la empresa del encabezado
+        self.empresa = ParagraphStyle('EmpresaInfo', alignment=TA_RIGHT)
+        
+        # TODO: Reemplazar con el logo oficial de PALDACA
+        logo_path = os.path.join(settings.BASE_DIR, 'core', 'static', 'core', 'img', 'logo_paldaca.png')
+        self.logo = ImageReader(logo_path)
+        # Decodificar ahora: los reportes solo leen los píxeles ya convertidos
+        self.logo.getRGBData()
+        self.logo.getSize()
+        
+        self.tabla_encabezado = TableStyle([
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 10),
+        ])
+        
+        self.tabla_informacion = TableStyle([
+            ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#f8f9fa')),
+            ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+            ('ALIGN', (0, 0), (0, -1), 'LEFT'),
+            ('ALIGN', (1, 0), (1, -1), 'LEFT'),
+            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+            ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
+            ('FONTSIZE', (0, 0), (-1, -1), 9),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+            ('BACKGROUND', (1, 0), (1, -1), colors.white),
+            ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#dee2e6')),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ])
+        
+        self.tabla_activos = TableStyle([
+            # Estilo del encabezado
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#32407b')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 9),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
+            ('TOPPADDING', (0, 0), (-1, 0), 8),
+            
+            # Estilo del contenido
+            ('BACKGROUND', (0, 1), (-1, -1), colors.white),
+            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+            ('FONTSIZE', (0, 1), (-1, -1), 8),
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#dee2e6')),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f8f9fa')]),
+            ('TOPPADDING', (0, 1), (-1, -1), 6),
+            ('BOTTOMPADDING', (0, 1), (-1, -1), 6),
+        ])
+        
+        self.tabla_firmas = TableStyle([
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 10),
+            ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#32407b')),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('MINROWHEIGHT', (0, 0), (-1, -1), 25),
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#f8f9fa')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.HexColor('#32407b')),
+        ])
+
+
+def tema():
+    """Tema de los reportes del proceso; se construye en el primer uso"""
+    global _tema
+    if _tema is None:
+        with _tema_lock:
+            if _tema is None:
+                _tema = Tema()
+    return _tema
+
+
+def generar_pdf(template_name, context, filename):
+    """
+    Genera un PDF institucional moderno usando reportlab
+    
+    Args:
+        template_name: Nombre del template HTML (no se usa en esta implementación)
+        context: Contexto con los datos
+        filename: Nombre del archivo PDF
+    
+    Returns:
+        HttpResponse con el PDF
+    """
+    # Crear un buffer para el PDF
+    buffer = io.BytesIO()
+    construir_pdf(context, buffer)
+    
+    # Obtener el contenido del buffer
+    pdf_content = buffer.getvalue()
+    buffer.close()
+    
+    # Crear respuesta HTTP
+    response = HttpResponse(pdf_content, content_type='application/pdf')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    
+    return response
+
+
+def construir_pdf(context, destino):
+    """
+    Construye el PDF institucional y lo escribe en `destino`
+    
+    Args:
+        context: Contexto con los datos
+        destino: Ruta del archivo o un objeto tipo archivo (p. ej. BytesIO)
+    """
+    # Crear el documento PDF con márgenes equilibrados
+    doc = SimpleDocTemplate(
+        destino,
+        pagesize=A4,
+        rightMargin=2*cm,
+        leftMargin=2*cm,
+        topMargin=3*cm,
+        bottomMargin=2*cm
+    )
+    
+    # Estilos, estilos de tabla y logo compartidos por todos los reportes
+    estilos = tema()
+    
+    # Leer las filas de la tabla una sola vez; el total sale de ellas
+    filas = filas_activos(context.get('activos', []))
+    context['total_activos'] = len(filas)
+    
+    # Construir el contenido del PDF
+    story = []
+    
+    # 1. ENCABEZADO INSTITUCIONAL
+    header_elements = crear_encabezado_institucional()
+    story.extend(header_elements)
+    story.append(Spacer(1, 20))
+    
+    # 2. TÍTULO DEL REPORTE
+    if context.get('responsable_entrega'):
+        story.append(Paragraph("NOTA DE ENTREGA DE ACTIVOS", estilos.titulo))
+    else:
+        story.append(Paragraph("REPORTE DE ACTIVOS", estilos.titulo))
+    
+    story.append(Spacer(1, 15))
+    
+    # 3. INFORMACIÓN GENERAL DEL REPORTE
+    story.append(crear_informacion_reporte(context, estilos.info))
+    story.append(Spacer(1, 20))
+    
+    # 4. TABLA DE ACTIVOS
+    if filas:
+        story.append(crear_tabla_activos(filas))
+        story.append(Spacer(1, 20))
+    
+    # 5. SECCIÓN DE FIRMAS (solo para nota de entrega)
+    if context.get('responsable_entrega'):
+        firmas_elements = crear_seccion_firmas(context, estilos.subtitulo)
+        story.extend(firmas_elements)
+    
+    # 6. PIE DE PÁGINA
+    story.append(crear_pie_pagina(context, estilos.normal))
+    
+    # Construir el PDF
+    doc.build(story)
+
+
+def crear_encabezado_institucional():
+    """Crea el encabezado institucional con logo y datos de la empresa"""
+    
+    estilos = tema()
+    logo = Logo(estilos.logo, width=2*inch, height=0.8*inch)
+    
+    # Datos de la empresa
+    empresa_data = [
+        ['CONSORCIO PALDACA'],
+        ['Sistema de Gestión de Activos'],
+        ['Reporte Institucional']
+    ]
+    
+    empresa_text = ''
+    for linea in empresa_data:
+        empresa_text += f'<font color="#32407b" size="12"><b>{linea[0]}</b></font><br/>'
+    
+    empresa_paragraph = Paragraph(empresa_text, estilos.empresa)
+    
+    # Crear tabla del encabezado
+    header_data = [[logo, empresa_paragraph]]
+    header_table = Table(header_data, colWidths=[3*inch, 3*inch])
+    header_table.setStyle(estilos.tabla_encabezado)
+    
+    # Línea divisoria
+    line = HRFlowable(width="100%", thickness=2, color=colors.HexColor('#32407b'))
+    
+    return [header_table, line]
+
+
+def crear_informacion_reporte(context, info_style):
+    """Crea la sección de información del reporte"""
+    
+    info_data = [
+        ['Fecha de generación:', context.get('fecha_generacion', '')],
+        ['Total de activos:', str(context.get('total_activos', 0))],
+    ]
+    
+    if context.get('responsable_entrega'):
+        info_data.append(['Responsable de entrega:', context['responsable_entrega']])
+    
+    if context.get('observaciones'):
+        info_data.append(['Observaciones:', context['observaciones']])
+    
+    # Crear tabla de información
+    info_table = Table(info_data, colWidths=[2.5*inch, 3.5*inch])
+    info_table.setStyle(tema().tabla_informacion)
+    
+    return info_table
+
+
+# Campos leídos para cada fila de la tabla de activos
+CAMPOS_TABLA = (
+    'codigo_inventario',
+    'subcategoria__nombre',
+    'marca',
+    'modelo',
+    'numero_serial',
+    'ubicacion__nombre',
+    'estado',
+    'usuario_asignado__nombres',
+    'usuario_asignado__apellidos',
+)
+
+# Tamaño de cada bloque leído de la base de datos
+TAMANO_BLOQUE = 2000
+
+
+def filas_activos(activos):
+    """
+    Convierte los activos en las filas (tuplas de texto) de la tabla del PDF
+    
+    Un queryset se lee como una proyección `values_list` por bloques, sin
+    construir instancias del modelo; también se aceptan listas de activos.
+    """
+    estados = dict(Activo.EstadoActivo.choices)
+    
+    if isinstance(activos, QuerySet):
+        valores = activos.select_related(None).values_list(*CAMPOS_TABLA).iterator(
+            chunk_size=TAMANO_BLOQUE
+        )
+    else:
+        valores = (
+            (a.codigo_inventario, a.subcategoria.nombre, a.marca, a.modelo, a.numero_serial,
+             a.ubicacion.nombre, a.estado,
+             a.usuario_asignado.nombres if a.usuario_asignado else None,
+             a.usuario_asignado.apellidos if a.usuario_asignado else None)
+            for a in activos
+        )
+    
+    return [
+        (
+            codigo,
+            subcategoria,
+            marca,
+            modelo,
+            serial or 'N/A',
+            ubicacion,
+            estados.get(estado, estado),
+            f"{nombres} {apellidos}" if nombres is not None else 'Sin asignar',
+        )
+        for codigo, subcategoria, marca, modelo, serial, ubicacion, estado, nombres, apellidos in valores
+    ]
+
+
+# Encabezados y anchos de columna de la tabla de activos
+ENCABEZADOS_TABLA = ('Código', 'Categoría', 'Marca', 'Modelo', 'Serial', 'Ubicación', 'Estado', 'Usuario')
+ANCHOS_TABLA = (0.9*inch, 0.9*inch, 0.5*inch, 1.1*inch, 0.8*inch, 1.0*inch, 1.0*inch, 0.8*inch)
+
+# Alto de las filas según `Tema.tabla_activos`: interlineado por defecto de
+# las celdas (12) más el padding. El texto de las celdas no se ajusta al
+# ancho, así que el alto de una fila solo depende de sus líneas
+ALTO_ENCABEZADO = 12 + 8 + 10
+ALTO_LINEA = 12
+PADDING_FILA = 6 + 6
+
+
+class TablaActivos(Flowable):
+    """
+    Tabla de activos que se divide en una tabla por página
+    
+    Dividir una única `Table` con todo el inventario obliga a ReportLab a
+    recalcular y copiar las filas restantes en cada página, lo que crece más
+    que linealmente con la cantidad de activos. Aquí los altos de las filas
+    se calculan una sola vez y cada `split` arma solo la tabla de la página
+    (con el encabezado repetido) y un resto que comparte las mismas filas.
+    """
+    
+    def __init__(self, filas, altos=None, acumulados=None, inicio=0):
+        super().__init__()
+        self.filas = filas
+        if altos is None:
+            altos = [ALTO_LINEA * (1 + max(valor.count('\n') for valor in fila)) + PADDING_FILA for fila in filas]
+            acumulados = list(itertools.accumulate(altos, initial=0))
+        self.altos = altos
+        # acumulados[i]: alto de las primeras i filas
+        self.acumulados = acumulados
+        self.inicio = inicio
+        self.hAlign = 'CENTER'
+    
+    def tabla(self, fin):
+        """Tabla de las filas [inicio, fin) con el encabezado"""
+        tabla = Table(
+            [ENCABEZADOS_TABLA, *self.filas[self.inicio:fin]],
+            normalizedData=1,
+            colWidths=ANCHOS_TABLA,
+            rowHeights=[ALTO_ENCABEZADO, *self.altos[self.inicio:fin]],
+            repeatRows=1,
+        )
+        tabla.setStyle(tema().tabla_activos)
+        return tabla
+    
+    def wrap(self, availWidth, availHeight):
+        self.width = sum(ANCHOS_TABLA)
+        self.height = ALTO_ENCABEZADO + self.acumulados[-1] - self.acumulados[self.inicio]
+        return self.width, self.height
+    
+    def split(self, availWidth, availHeight):
+        # Última fila que entra en el espacio disponible junto al encabezado
+        limite = self.acumulados[self.inicio] + availHeight - ALTO_ENCABEZADO
+        fin = bisect.bisect_right(self.acumulados, limite) - 1
+        if fin <= self.inicio:
+            return []
+        if fin >= len(self.filas):
+            return [self.tabla(len(self.filas))]
+        return [self.tabla(fin), TablaActivos(self.filas, self.altos, self.acumulados, fin)]
+    
+    def draw(self):
+        tabla = self.tabla(len(self.filas))
+        tabla.wrapOn(self.canv, self.width, self.height)
+        tabla.drawOn(self.canv, 0, 0)
+
+
+def crear_tabla_activos(filas):
+    """Crea la tabla profesional de activos a partir de las filas ya proyectadas"""
+    
+    # Las filas ya son texto sin valores nulos: no hace falta normalizarlas
+    return TablaActivos(filas)
+
+
+def crear_seccion_firmas(context, subtitle_style):
+    """Crea la sección de firmas para nota de entrega"""
+    
+    story = []
+    story.append(Paragraph("FIRMAS DE ENTREGA Y RECEPCIÓN", subtitle_style))
+    story.append(Spacer(1, 20))
+    
+    # Tabla de firmas profesional
+    signature_data = [
+        ['ENTREGA', 'RECEPCIÓN'],
+        ['', ''],
+        ['Responsable:', 'Recibe:'],
+        [context['responsable_entrega'], '_____________________'],
+        ['', ''],
+        ['Firma y sello:', 'Firma y sello:'],
+        ['', ''],
+        ['', ''],
+        ['', ''],
+        ['Fecha: _______________', 'Fecha: _______________']
+    ]
+    
+    signature_table = Table(signature_data, colWidths=[3*inch, 3*inch])
+    signature_table.setStyle(tema().tabla_firmas)
+    
+    story.append(signature_table)
+    return story
+
+
+def crear_pie_pagina(context, normal_style):
+    """Crea el pie de página institucional"""
+    
+    footer_text = f"""
+    <para align="center">
+    <font size="8" color="#666666">
+    Este documento fue generado automáticamente por el Sistema de Gestión de Activos de Consorcio PALDACA<br/>
+    Fecha: {context.get('fecha_generacion', '')} | Total de registros: {context.get('total_activos', 0)}
+    </font>
+    </para>
+    """
+    
+    return Paragraph(footer_text, normal_style)
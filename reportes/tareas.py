@@ -0,0 +1,210 @@
+"""
+Cola de reportes PDF procesada en segundo plano.
+
+Cada solicitud asíncrona crea un `ReporteGenerado` en estado PENDIENTE con
+sus parámetros en `filtros_aplicados`. Los workers (hilos de este proceso o
+del comando `procesar_reportes`) reclaman los trabajos con
+`SELECT ... FOR UPDATE SKIP LOCKED` seguido de un UPDATE condicional, de
+modo que varios workers pueden compartir la tabla sin tomar el mismo
+trabajo. El PDF se escribe en `settings.REPORTES_DIR` y la fila registra el
+archivo, la cantidad de activos y el resultado. No se necesita un broker.
+"""
+import logging
+import os
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, connection, transaction
+from django.utils import timezone
+
+from activos.busqueda import filtrar_activos
+from activos.models import Activo
+
+from .models import ReporteGenerado
+from .utils import construir_pdf, formatear_fecha
+
+logger = logging.getLogger(__name__)
+
+Estado = ReporteGenerado.EstadoReporte
+Tipo = ReporteGenerado.TipoReporte
+
+PREFIJOS = {
+    Tipo.GENERAL: 'reporte_activos',
+    Tipo.NOTA_ENTREGA: 'nota_entrega',
+}
+
+# Worker local: un solo hilo por proceso, despertado por `_hay_trabajo`
+_hilo_local = None
+_hilo_lock = threading.Lock()
+_hay_trabajo = threading.Event()
+
+
+def directorio_reportes():
+    directorio = getattr(settings, 'REPORTES_DIR', settings.BASE_DIR / 'reportes_generados')
+    os.makedirs(directorio, exist_ok=True)
+    return directorio
+
+
+def ruta_archivo(reporte):
+    return os.path.join(directorio_reportes(), reporte.archivo_nombre)
+
+
+def encolar_reporte(tipo, filtros, usuario=None):
+    """Crea el trabajo y, si está habilitado, despierta al worker local"""
+    reporte = ReporteGenerado.objects.create(
+        tipo=tipo,
+        filtros_aplicados=filtros,
+        usuario=usuario if usuario is not None and usuario.is_authenticated else None,
+    )
+    if getattr(settings, 'REPORTES_WORKER_LOCAL', False):
+        transaction.on_commit(iniciar_worker_local)
+    return reporte
+
+
+def reclamar_reporte():
+    """
+    Toma el trabajo pendiente más antiguo y lo marca como PROCESANDO.
+
+    Retorna None si no hay trabajos disponibles.
+    """
+    with transaction.atomic():
+        reporte = (
+            ReporteGenerado.objects.select_for_update(skip_locked=True)
+            .filter(estado=Estado.PENDIENTE)
+            .order_by('fecha_generacion', 'id')
+            .first()
+        )
+        if reporte is None:
+            return None
+        ahora = timezone.now()
+        # El UPDATE condicional protege a los motores sin SKIP LOCKED (SQLite)
+        reclamado = ReporteGenerado.objects.filter(
+            pk=reporte.pk, estado=Estado.PENDIENTE
+        ).update(estado=Estado.PROCESANDO, fecha_inicio=ahora)
+        if not reclamado:
+            return None
+    reporte.estado = Estado.PROCESANDO
+    reporte.fecha_inicio = ahora
+    return reporte
+
+
+def construir_contexto(reporte):
+    """Arma el contexto del PDF a partir de los parámetros guardados"""
+    filtros = reporte.filtros_aplicados or {}
+    activos = Activo.objects.all()
+    fecha = formatear_fecha(timezone.localdate(reporte.fecha_generacion))
+
+    if reporte.tipo == Tipo.NOTA_ENTREGA:
+        return {
+            'activos': activos.filter(id__in=filtros.get('activos', [])),
+            'fecha_entrega': fecha,
+            'responsable_entrega': filtros.get('responsable_entrega', ''),
+            'observaciones': filtros.get('observaciones', ''),
+        }
+
+    return {
+        'activos': filtrar_activos(activos, filtros),
+        'fecha_generacion': fecha,
+        'filtros_aplicados': ', '.join(f"{k}: {v}" for k, v in filtros.items()) or None,
+    }
+
+
+def procesar_reporte(reporte):
+    """Genera el PDF de un trabajo reclamado y registra el resultado"""
+    try:
+        context = construir_contexto(reporte)
+        timestamp = timezone.localtime(reporte.fecha_generacion).strftime("%Y%m%d_%H%M%S")
+        nombre = f"{PREFIJOS[reporte.tipo]}_{timestamp}_{reporte.pk}.pdf"
+        ruta = os.path.join(directorio_reportes(), nombre)
+
+        # Se escribe a un temporal para no exponer un archivo a medio generar
+        temporal = f"{ruta}.tmp"
+        construir_pdf(context, temporal)
+        os.replace(temporal, ruta)
+    except Exception as e:
+        logger.exception('Error al generar el reporte %s', reporte.pk)
+        ReporteGenerado.objects.filter(pk=reporte.pk).update(
+            estado=Estado.ERROR, mensaje_error=str(e), fecha_fin=timezone.now()
+        )
+        return False
+
+    ReporteGenerado.objects.filter(pk=reporte.pk).update(
+        estado=Estado.COMPLETADO,
+        archivo_nombre=nombre,
+        cantidad_activos=context['total_activos'],
+        fecha_fin=timezone.now(),
+    )
+    return True
+
+
+def procesar_pendientes():
+    """Procesa trabajos hasta vaciar la cola; retorna cuántos se procesaron"""
+    procesados = 0
+    while True:
+        try:
+            reporte = reclamar_reporte()
+        except DatabaseError:
+            # Un error al reclamar no debe detener al worker; se reintenta luego
+            logger.exception('Error al reclamar un reporte de la cola')
+            return procesados
+        if reporte is None:
+            return procesados
+        procesar_reporte(reporte)
+        procesados += 1
+
+
+def liberar_colgados(minutos):
+    """Devuelve a la cola los trabajos que llevan demasiado tiempo PROCESANDO"""
+    limite = timezone.now() - timedelta(minutes=minutos)
+    return ReporteGenerado.objects.filter(
+        estado=Estado.PROCESANDO, fecha_inicio__lt=limite
+    ).update(estado=Estado.PENDIENTE, fecha_inicio=None)
+
+
+def ejecutar_worker(detener=None, intervalo=2):
+    """
+    Bucle de un worker: vacía la cola y espera `intervalo` segundos.
+
+    Sin `detener` (threading.Event) termina al quedar la cola vacía.
+    """
+    try:
+        while True:
+            close_old_connections()
+            procesar_pendientes()
+            if detener is None or detener.wait(intervalo):
+                return
+    finally:
+        connection.close()
+
+
+def _worker_local():
+    global _hilo_local
+    try:
+        while True:
+            _hay_trabajo.clear()
+            close_old_connections()
+            procesar_pendientes()
+            with _hilo_lock:
+                # Un trabajo encolado durante la pasada vuelve a activar la bandera
+                if not _hay_trabajo.is_set():
+                    _hilo_local = None
+                    return
+    except Exception:
+        logger.exception('El worker local de reportes terminó por un error')
+    finally:
+        # Si el hilo termina por un error, el próximo trabajo inicia otro
+        with _hilo_lock:
+            if _hilo_local is threading.current_thread():
+                _hilo_local = None
+        connection.close()
+
+
+def iniciar_worker_local():
+    """Despierta al worker local, iniciándolo si no hay uno activo"""
+    global _hilo_local
+    with _hilo_lock:
+        _hay_trabajo.set()
+        if _hilo_local is None or not _hilo_local.is_alive():
+            _hilo_local = threading.Thread(target=_worker_local, name='reportes-worker', daemon=True)
+            _hilo_local.start()
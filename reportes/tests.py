@@ -1,3 +1,539 @@
-from django.test import TestCase
+import csv
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone as dt_timezone
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import DatabaseError
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from activos.models import Activo, Categoria, SubCategoria, Ubicacion
+from core.testing import PresupuestoConsultasTestCase
+from mantenimientos.models import Mantenimiento
+from usuarios.models import UsuarioAsignado
+
+from . import cache as cache_reportes
+from . import tareas
+from .models import ReporteGenerado
+from .tareas import ruta_archivo
+
+
+class PresupuestoConsultasTests(PresupuestoConsultasTestCase):
+    """Máximo de consultas SQL de cada vista de reportes (ver core.testing)"""
+
+    def test_reporte_activos(self):
+        url = reverse('reportes:reporte-activos')
+        self.assertPresupuesto(url, 6)
+        self.assertPresupuesto(url + f'?categoria={self.categoria.pk}', 6)
+        self.assertPresupuesto(url + '?asincrono=1', 3, estado=302)
+
+    def test_exportar(self):
+        for formato in ('csv', 'jsonl'):
+            self.assertPresupuesto(reverse('reportes:exportar-activos', args=[formato]), 3)
+
+    def test_nota_entrega(self):
+        self.assertPresupuesto(reverse('reportes:nota-entrega'), 3, 'post', lambda: {
+            'activos_seleccionados': [str(pk) for pk in Activo.objects.values_list('pk', flat=True)],
+        })
+
+    def test_reportes_generados(self):
+        pk = self.reporte.pk
+        self.assertPresupuesto(reverse('reportes:reporte-list'), 3)
+        self.assertPresupuesto(reverse('reportes:reporte-estado', args=[pk]), 3)
+
+    def test_descargar(self):
+        self.reporte.estado = ReporteGenerado.EstadoReporte.COMPLETADO
+        self.reporte.archivo_nombre = 'reporte.pdf'
+        self.reporte.save()
+        with open(ruta_archivo(self.reporte), 'wb') as archivo:
+            archivo.write(b'%PDF-1.4')
+        self.assertPresupuesto(reverse('reportes:reporte-descargar', args=[self.reporte.pk]), 3)
+
+
+def tiempos_importacion(modulo):
+    """
+    {módulo: tiempo acumulado en µs} según `python -X importtime` al importar
+    `modulo` en un proceso nuevo, después de django.setup()
+    """
+    resultado = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import django; django.setup(); import {modulo}'],
+        cwd=settings.BASE_DIR, env=os.environ, capture_output=True, text=True, check=True,
+    )
+    tiempos = {}
+    for linea in resultado.stderr.splitlines():
+        if not linea.startswith('import time:'):
+            continue
+        _propio, acumulado, nombre = linea[len('import time:'):].split('|')
+        if acumulado.strip().isdigit():
+            tiempos[nombre.strip()] = int(acumulado)
+    return tiempos
+
+
+class TiempoImportacionTests(SimpleTestCase):
+    """
+    ReportLab solo se importa al generar un PDF (ver reportes.pdf); las URLs,
+    que carga cada worker, y los comandos que no generan PDF no deben pagarlo.
+    """
+
+    # Presupuesto para importar las URLs tras django.setup() (~50 ms sin
+    # ReportLab, ~150 ms con él en una máquina de desarrollo). Depende de la
+    # máquina, por lo que solo se verifica con SSAPI_MEDIR_IMPORTACION=1; la
+    # ausencia de ReportLab se verifica siempre.
+    PRESUPUESTO_URLS_US = 250_000
+
+    def assertSinReportlab(self, tiempos):
+        cargados = sorted(nombre for nombre in tiempos if nombre.split('.')[0] == 'reportlab')
+        self.assertEqual(cargados, [])
+
+    def test_urls(self):
+        tiempos = tiempos_importacion('SSAPI.urls')
+        self.assertSinReportlab(tiempos)
+        if os.environ.get('SSAPI_MEDIR_IMPORTACION'):
+            self.assertLessEqual(tiempos['SSAPI.urls'], self.PRESUPUESTO_URLS_US)
+
+    def test_worker_de_reportes(self):
+        self.assertSinReportlab(tiempos_importacion('reportes.management.commands.procesar_reportes'))
+
+    def test_motor_pdf(self):
+        # Control: el motor sí carga ReportLab
+        tiempos = tiempos_importacion('reportes.pdf')
+        self.assertIn('reportlab.platypus', tiempos)
+
+
+class TemaPdfTests(SimpleTestCase):
+    """El tema de los reportes se construye una vez y se comparte entre hilos"""
+
+    def setUp(self):
+        from reportlab import rl_config
+
+        # PDF sin fecha ni identificador aleatorio, para comparar los bytes
+        rl_config.invariant, anterior = 1, rl_config.invariant
+        self.addCleanup(setattr, rl_config, 'invariant', anterior)
+
+    def construir(self, cantidad):
+        from .pdf import construir_pdf
+
+        activos = [
+            Activo(
+                subcategoria=SubCategoria(nombre='Laptop'), ubicacion=Ubicacion(nombre='Sede'),
+                marca='Marca', modelo='Modelo', codigo_inventario=f'COD{i:04d}',
+            )
+            for i in range(cantidad)
+        ]
+        buffer = io.BytesIO()
+        construir_pdf({'activos': activos, 'fecha_generacion': '01/01/2025'}, buffer)
+        return buffer.getvalue()
+
+    def test_tema_unico(self):
+        from .pdf import tema
+
+        self.assertIs(tema(), tema())
+
+    def test_reportes_concurrentes(self):
+        esperado = self.construir(80)
+        with ThreadPoolExecutor(max_workers=4) as ejecutor:
+            pdfs = list(ejecutor.map(self.construir, [80] * 8))
+        self.assertEqual(pdfs, [esperado] * 8)
+
+
+class TablaActivosTests(SimpleTestCase):
+    """La tabla de activos se divide por página con altos precalculados"""
+
+    def filas(self, cantidad):
+        return [
+            (f'COD{i:04d}', 'Laptop', 'Marca', 'Modelo\nSerie X' if i % 7 == 0 else 'Modelo',
+             'N/A', 'Sede', 'Activo', 'Sin asignar')
+            for i in range(cantidad)
+        ]
+
+    def test_altos_como_reportlab(self):
+        from reportlab.platypus import Table
+
+        from .pdf import ENCABEZADOS_TABLA, ANCHOS_TABLA, TablaActivos, tema
+
+        filas = self.filas(20)
+        tabla = Table([ENCABEZADOS_TABLA, *filas], colWidths=ANCHOS_TABLA)
+        tabla.setStyle(tema().tabla_activos)
+        tabla.wrap(sum(ANCHOS_TABLA), 10_000)
+        precalculada = TablaActivos(filas)
+        self.assertEqual(precalculada.tabla(len(filas))._rowHeights, tabla._rowHeights)
+
+    def test_una_tabla_por_pagina(self):
+        from reportlab.pdfgen.canvas import Canvas
+        from reportlab.platypus import Table
+
+        from .pdf import TablaActivos
+
+        filas = self.filas(500)
+        resto = TablaActivos(filas)
+        paginas = []
+        while True:
+            partes = resto.splitOn(Canvas(io.BytesIO()), 450, 700)
+            self.assertIsInstance(partes[0], Table)
+            partes[0].wrap(450, 700)
+            self.assertLessEqual(partes[0]._height, 700)
+            paginas.append(partes[0]._cellvalues)
+            if len(partes) == 1:
+                break
+            resto = partes[1]
+        # Cada página repite el encabezado y ninguna fila se pierde ni se repite
+        self.assertTrue(all(pagina[0] == paginas[0][0] for pagina in paginas))
+        self.assertEqual([tuple(fila) for pagina in paginas for fila in pagina[1:]], filas)
+        self.assertGreater(len(paginas), 10)
+
+
+class WorkerLocalTests(SimpleTestCase):
+    """Un worker local que termina por un error no impide iniciar otro"""
+
+    def test_reinicio_tras_error(self):
+        continuar = threading.Event()
+
+        def fallar():
+            continuar.wait(5)
+            raise DatabaseError('conexión perdida')
+
+        with mock.patch.object(tareas, 'procesar_pendientes', side_effect=fallar):
+            with self.assertLogs('reportes.tareas', 'ERROR'):
+                tareas.iniciar_worker_local()
+                hilo = tareas._hilo_local
+                continuar.set()
+                hilo.join(5)
+        self.assertFalse(hilo.is_alive())
+        self.assertIsNone(tareas._hilo_local)
+
+        with mock.patch.object(tareas, 'procesar_pendientes', return_value=0) as procesar:
+            tareas.iniciar_worker_local()
+            hilo = tareas._hilo_local
+            if hilo is not None:
+                hilo.join(5)
+        procesar.assert_called()
+        self.assertIsNone(tareas._hilo_local)
+
+
+class ColaReportesTests(TestCase):
+    """Ciclo de un trabajo de la cola: reclamo, resultado y liberación de colgados"""
+
+    @classmethod
+    def setUpTestData(cls):
+        subcategoria = SubCategoria.objects.create(
+            nombre='Laptop', categoria=Categoria.objects.create(nombre='Cómputo')
+        )
+        ubicacion = Ubicacion.objects.create(nombre='Sede')
+        cls.activos = [
+            Activo.objects.create(
+                subcategoria=subcategoria, ubicacion=ubicacion,
+                marca='Marca', modelo='Modelo', codigo_inventario=f'COD{i}',
+            )
+            for i in range(3)
+        ]
+
+    def setUp(self):
+        # Un directorio por prueba: los pk se repiten entre pruebas
+        self.directorio_reportes = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directorio_reportes, ignore_errors=True)
+        configuracion = override_settings(
+            REPORTES_DIR=self.directorio_reportes, REPORTES_WORKER_LOCAL=False,
+        )
+        configuracion.enable()
+        self.addCleanup(configuracion.disable)
+
+    def test_completado(self):
+        general = tareas.encolar_reporte(ReporteGenerado.TipoReporte.GENERAL, {})
+        nota = tareas.encolar_reporte(ReporteGenerado.TipoReporte.NOTA_ENTREGA, {
+            'activos': [self.activos[0].pk], 'responsable_entrega': 'Ana',
+        })
+
+        self.assertEqual(tareas.procesar_pendientes(), 2)
+        self.assertEqual(tareas.procesar_pendientes(), 0)
+
+        for reporte, cantidad in ((general, 3), (nota, 1)):
+            reporte.refresh_from_db()
+            self.assertEqual(reporte.estado, ReporteGenerado.EstadoReporte.COMPLETADO)
+            self.assertEqual(reporte.cantidad_activos, cantidad)
+            self.assertIsNotNone(reporte.fecha_inicio)
+            self.assertIsNotNone(reporte.fecha_fin)
+            with open(ruta_archivo(reporte), 'rb') as archivo:
+                self.assertEqual(archivo.read(5), b'%PDF-')
+
+    def test_error(self):
+        reporte = tareas.encolar_reporte(ReporteGenerado.TipoReporte.GENERAL, {})
+        with mock.patch.object(tareas, 'construir_pdf', side_effect=OSError('disco lleno')):
+            with self.assertLogs('reportes.tareas', 'ERROR'):
+                self.assertEqual(tareas.procesar_pendientes(), 1)
+
+        reporte.refresh_from_db()
+        self.assertEqual(reporte.estado, ReporteGenerado.EstadoReporte.ERROR)
+        self.assertEqual(reporte.mensaje_error, 'disco lleno')
+        self.assertEqual(reporte.archivo_nombre, '')
+        self.assertEqual(os.listdir(self.directorio_reportes), [])
+
+    def test_reclamar_en_orden(self):
+        primero = tareas.encolar_reporte(ReporteGenerado.TipoReporte.GENERAL, {})
+        segundo = tareas.encolar_reporte(ReporteGenerado.TipoReporte.GENERAL, {})
+
+        self.assertEqual(tareas.reclamar_reporte().pk, primero.pk)
+        self.assertEqual(tareas.reclamar_reporte().pk, segundo.pk)
+        self.assertIsNone(tareas.reclamar_reporte())
+        self.assertEqual(
+            ReporteGenerado.objects.filter(estado=ReporteGenerado.EstadoReporte.PROCESANDO).count(), 2
+        )
+
+    def test_liberar_colgados(self):
+        colgado = tareas.encolar_reporte(ReporteGenerado.TipoReporte.GENERAL, {})
+        reciente = tareas.encolar_reporte(ReporteGenerado.TipoReporte.GENERAL, {})
+        tareas.reclamar_reporte()
+        tareas.reclamar_reporte()
+        ReporteGenerado.objects.filter(pk=colgado.pk).update(
+            fecha_inicio=timezone.now() - timedelta(minutes=30)
+        )
+
+        self.assertEqual(tareas.liberar_colgados(10), 1)
+        colgado.refresh_from_db()
+        reciente.refresh_from_db()
+        self.assertEqual(colgado.estado, ReporteGenerado.EstadoReporte.PENDIENTE)
+        self.assertIsNone(colgado.fecha_inicio)
+        self.assertEqual(reciente.estado, ReporteGenerado.EstadoReporte.PROCESANDO)
+
+        # El trabajo liberado vuelve a procesarse
+        self.assertEqual(tareas.procesar_pendientes(), 1)
+        colgado.refresh_from_db()
+        self.assertEqual(colgado.estado, ReporteGenerado.EstadoReporte.COMPLETADO)
+
+
+class ExportacionActivosTests(TestCase):
+    """Exportación de los activos filtrados en CSV y JSON Lines"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'clave')
+        subcategoria = SubCategoria.objects.create(
+            nombre='Laptop', categoria=Categoria.objects.create(nombre='Cómputo')
+        )
+        sede = Ubicacion.objects.create(nombre='Sede')
+        usuario = UsuarioAsignado.objects.create(nombres='Ana', apellidos='Pérez', identificacion='1')
+        for i, (codigo, estado, usuario_asignado, observaciones) in enumerate([
+            ('COD1', Activo.EstadoActivo.ACTIVO, usuario, 'Pantalla "rota", teclado'),
+            ('COD2', Activo.EstadoActivo.ACTIVO, None, None),
+            ('COD3', Activo.EstadoActivo.INACTIVO, None, ''),
+        ]):
+            activo = Activo.objects.create(
+                subcategoria=subcategoria, ubicacion=sede, usuario_asignado=usuario_asignado,
+                marca='Marca', modelo='Modelo', codigo_inventario=codigo, estado=estado,
+                observaciones=observaciones,
+            )
+            # 03:30 UTC es el día anterior en America/Caracas (UTC-4)
+            Activo.objects.filter(pk=activo.pk).update(
+                fecha_creacion=datetime(2024, 1, 15 + i, 3, 30, tzinfo=dt_timezone.utc)
+            )
+
+    def exportar(self, formato):
+        self.client.force_login(self.admin)
+        response = self.client.get(
+            reverse('reportes:exportar-activos', args=[formato]), {'estado': Activo.EstadoActivo.ACTIVO}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(f'.{formato}"', response['Content-Disposition'])
+        return b''.join(response.streaming_content).decode('utf-8')
+
+    def test_csv(self):
+        contenido = self.exportar('csv')
+        self.assertTrue(contenido.startswith('\ufeff'))
+        filas = list(csv.reader(io.StringIO(contenido[1:])))
+        self.assertEqual(filas, [
+            [
+                'Código', 'Categoría', 'Subcategoría', 'Marca', 'Modelo', 'Serial', 'Ubicación',
+                'Estado', 'Usuario Asignado', 'Observaciones', 'Fecha de Registro',
+            ],
+            [
+                'COD2', 'Cómputo', 'Laptop', 'Marca', 'Modelo', '', 'Sede',
+                'Activo', '', '', '2024-01-15T23:30:00-04:00',
+            ],
+            [
+                'COD1', 'Cómputo', 'Laptop', 'Marca', 'Modelo', '', 'Sede',
+                'Activo', 'Ana Pérez', 'Pantalla "rota", teclado', '2024-01-14T23:30:00-04:00',
+            ],
+        ])
+
+    def test_jsonl(self):
+        lineas = self.exportar('jsonl').splitlines()
+        self.assertEqual([json.loads(linea) for linea in lineas], [
+            {
+                'codigo_inventario': 'COD2', 'categoria': 'Cómputo', 'subcategoria': 'Laptop',
+                'marca': 'Marca', 'modelo': 'Modelo', 'numero_serial': None, 'ubicacion': 'Sede',
+                'estado': 'Activo', 'usuario_asignado': None, 'observaciones': None,
+                'fecha_creacion': '2024-01-15T23:30:00-04:00',
+            },
+            {
+                'codigo_inventario': 'COD1', 'categoria': 'Cómputo', 'subcategoria': 'Laptop',
+                'marca': 'Marca', 'modelo': 'Modelo', 'numero_serial': None, 'ubicacion': 'Sede',
+                'estado': 'Activo', 'usuario_asignado': 'Ana Pérez',
+                'observaciones': 'Pantalla "rota", teclado', 'fecha_creacion': '2024-01-14T23:30:00-04:00',
+            },
+        ])
+
+    def test_formato_no_soportado(self):
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse('reportes:exportar-activos', args=['xml']))
+        self.assertEqual(response.status_code, 404)
+
+
+class CacheReportesTests(TestCase):
+    """Caché en disco de los reportes PDF"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'clave')
+        cls.subcategoria = SubCategoria.objects.create(
+            nombre='Laptop', categoria=Categoria.objects.create(nombre='Cómputo')
+        )
+        cls.ubicacion = Ubicacion.objects.create(nombre='Sede')
+        cls.usuario = UsuarioAsignado.objects.create(nombres='Ana', apellidos='Pérez', identificacion='1')
+        cls.activo = Activo.objects.create(
+            subcategoria=cls.subcategoria, ubicacion=cls.ubicacion, usuario_asignado=cls.usuario,
+            marca='Marca', modelo='Modelo', codigo_inventario='COD',
+        )
+
+    def setUp(self):
+        directorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directorio, ignore_errors=True)
+        configuracion = override_settings(REPORTES_CACHE_DIR=directorio)
+        configuracion.enable()
+        self.addCleanup(configuracion.disable)
+        self.construidos = 0
+
+    def construir(self, destino):
+        self.construidos += 1
+        with open(destino, 'wb') as archivo:
+            archivo.write(b'%PDF-' + b'x' * 1000)
+
+    def servir(self, clave, **headers):
+        response = cache_reportes.respuesta(
+            RequestFactory().get('/', headers=headers), clave, 'reporte.pdf', self.construir
+        )
+        if response.status_code == 200:
+            contenido = b''.join(response.streaming_content)
+            response.close()
+            self.assertTrue(contenido.startswith(b'%PDF-'))
+        return response
+
+    def clave(self):
+        return cache_reportes.clave_reporte(ReporteGenerado.TipoReporte.GENERAL, {'buscar': ' Laptop '})
+
+    def test_acierto_y_fallo(self):
+        clave = self.clave()
+        self.assertIsNone(cache_reportes.obtener(clave))
+        self.servir(clave)
+        self.servir(clave)
+        self.assertEqual(self.construidos, 1)
+
+        # Los filtros se normalizan: los equivalentes comparten la entrada
+        equivalente = cache_reportes.clave_reporte(ReporteGenerado.TipoReporte.GENERAL, {
+            'buscar': 'laptop', 'estado': '',
+        })
+        self.assertEqual(equivalente, clave)
+        otra = cache_reportes.clave_reporte(ReporteGenerado.TipoReporte.GENERAL, {'estado': 'AC'})
+        self.assertNotEqual(otra, clave)
+
+        response = self.servir(clave, if_none_match=f'"{clave}"')
+        self.assertEqual(response.status_code, 304)
+
+    def test_invalidacion(self):
+        claves = {self.clave()}
+
+        def cambio(funcion):
+            with self.captureOnCommitCallbacks(execute=True):
+                funcion()
+            clave = self.clave()
+            self.assertNotIn(clave, claves)
+            claves.add(clave)
+
+        self.activo.marca = 'Otra'
+        cambio(self.activo.save)
+        cambio(lambda: Activo.objects.filter(pk=self.activo.pk).update(
+            modelo='Masivo', fecha_actualizacion=timezone.now() + timedelta(seconds=1)
+        ))
+        self.usuario.nombres = 'Ana María'
+        cambio(self.usuario.save)
+        self.subcategoria.nombre = 'Portátil'
+        cambio(self.subcategoria.save)
+        self.ubicacion.nombre = 'Sede central'
+        cambio(self.ubicacion.save)
+        cambio(Activo.objects.get(pk=self.activo.pk).delete)
+
+    def test_invalidacion_por_costos(self):
+        # El resumen de costos del activo se escribe con UPDATE, sin tocar
+        # su fecha de actualización
+        def clave():
+            return cache_reportes.clave_reporte(ReporteGenerado.TipoReporte.GENERAL, {'costo_min': '50'})
+
+        claves = {clave()}
+
+        def cambio(funcion):
+            with self.captureOnCommitCallbacks(execute=True):
+                funcion()
+            nueva = clave()
+            self.assertNotIn(nueva, claves)
+            claves.add(nueva)
+
+        mantenimiento = Mantenimiento(
+            activo=self.activo, tecnico='Técnico', telefono='1', descripcion='Revisión', costo=40,
+        )
+        cambio(mantenimiento.save)
+        mantenimiento.costo = 60
+        cambio(mantenimiento.save)
+        cambio(lambda: Mantenimiento.objects.filter(pk=mantenimiento.pk).update(costo=80))
+        cambio(mantenimiento.delete)
+
+    def test_depuracion(self):
+        claves = [
+            cache_reportes.clave_reporte(ReporteGenerado.TipoReporte.GENERAL, {'estado': str(i)})
+            for i in range(3)
+        ]
+        for i, clave in enumerate(claves):
+            self.servir(clave)
+            # mtime distintos y crecientes para un orden LRU determinista
+            os.utime(cache_reportes._ruta(clave), (1_000_000 + i, 1_000_000 + i))
+        # Un acierto renueva la entrada más antigua
+        cache_reportes.obtener(claves[0]).close()
+
+        cache_reportes.depurar(limite=2500)
+        restantes = {clave for clave in claves if os.path.exists(cache_reportes._ruta(clave))}
+        self.assertEqual(restantes, {claves[0], claves[2]})
+
+    def test_entrada_depurada_se_regenera(self):
+        clave = self.clave()
+        self.servir(clave)
+        # Otro proceso depura la entrada: se trata como un fallo
+        os.remove(cache_reportes._ruta(clave))
+        self.assertEqual(self.servir(clave).status_code, 200)
+        self.assertEqual(self.construidos, 2)
+
+        # Un archivo ya abierto se sirve aunque se depure antes de enviarlo
+        archivo = cache_reportes.obtener(clave)
+        cache_reportes.depurar(limite=0)
+        self.assertEqual(archivo.read(5), b'%PDF-')
+        archivo.close()
+
+    def test_vista(self):
+        self.client.force_login(self.admin)
+        url = reverse('reportes:reporte-activos')
+        primera = self.client.get(url)
+        self.assertEqual(primera.status_code, 200)
+        b''.join(primera.streaming_content)
+        # La entrada se depura antes de la siguiente solicitud: se regenera
+        cache_reportes.depurar(limite=0)
+        segunda = self.client.get(url)
+        self.assertEqual(segunda.status_code, 200)
+        self.assertEqual(segunda['ETag'], primera['ETag'])
+        self.assertTrue(b''.join(segunda.streaming_content).startswith(b'%PDF-'))
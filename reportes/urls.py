@@ -7,7 +7,15 @@ urlpatterns = [
     # Reporte general de activos
     path('activos/', views.generar_reporte_activos, name='reporte-activos'),
     
+    # Exportación de activos (CSV / JSON Lines)
+    path('activos/exportar/<str:formato>/', views.exportar_activos, name='exportar-activos'),
+    
     # Nota de entrega
     path('nota-entrega/', views.generar_nota_entrega, name='nota-entrega'),
     
+    # Reportes generados en segundo plano
+    path('generados/', views.reporte_list, name='reporte-list'),
+    path('generados/<int:pk>/estado/', views.estado_reporte, name='reporte-estado'),
+    path('generados/<int:pk>/descargar/', views.descargar_reporte, name='reporte-descargar'),
+    
 ]
@@ -1,10 +1,16 @@
 from django.shortcuts import render, get_object_or_404, redirect
+from django.http import FileResponse, Http404, JsonResponse
+from django.urls import reverse
 from django.contrib import messages
-from django.db.models import Q
 from django.utils import timezone
 from datetime import datetime
 from activos.models import Activo
-from .utils import generar_pdf, formatear_fecha, obtener_filtros_aplicados
+from activos.busqueda import filtrar_activos
+from . import cache as cache_reportes
+from .exportacion import FORMATOS, respuesta_exportacion
+from .models import ReporteGenerado
+from .tareas import encolar_reporte, ruta_archivo
+from .utils import construir_pdf, generar_pdf, formatear_fecha, obtener_filtros_aplicados
 from django.contrib.auth.decorators import login_required
 
 @login_required
@@ -16,59 +22,56 @@ def generar_reporte_activos(request):
         # Obtener filtros de la request
         filtros = obtener_filtros_aplicados(request)
         
-        # Construir queryset con los mismos filtros que la vista de activos
-        queryset = Activo.objects.select_related(
-            'subcategoria__categoria', 
-            'ubicacion', 
-            'usuario_asignado'
-        ).all()
-        
-        # Aplicar filtros
-        categoria_id = request.GET.get('categoria', '')
-        subcategoria_id = request.GET.get('subcategoria', '')
-        ubicacion_id = request.GET.get('ubicacion', '')
-        estado = request.GET.get('estado', '')
-        usuario_asignado_id = request.GET.get('usuario_asignado', '')
-        buscar = request.GET.get('buscar', '')
-        
-        if categoria_id:
-            queryset = queryset.filter(subcategoria__categoria_id=categoria_id)
-        if subcategoria_id:
-            queryset = queryset.filter(subcategoria_id=subcategoria_id)
-        if ubicacion_id:
-            queryset = queryset.filter(ubicacion_id=ubicacion_id)
-        if estado:
-            queryset = queryset.filter(estado=estado)
-        if usuario_asignado_id:
-            queryset = queryset.filter(usuario_asignado_id=usuario_asignado_id)
-        if buscar:
-            queryset = queryset.filter(
-                Q(codigo_inventario__icontains=buscar) |
-                Q(marca__icontains=buscar) |
-                Q(modelo__icontains=buscar) |
-                Q(numero_serial__icontains=buscar)
-            )
-        
-        # Preparar contexto para el template
-        context = {
-            'activos': queryset,
-            'fecha_generacion': formatear_fecha(timezone.now().date()),
-            'filtros_aplicados': ', '.join([f"{k}: {v}" for k, v in filtros.items()]) if filtros else None,
-        }
+        # En modo asíncrono el PDF se genera en segundo plano
+        if request.GET.get('asincrono'):
+            encolar_reporte(ReporteGenerado.TipoReporte.GENERAL, filtros, request.user)
+            messages.info(request, 'El reporte se está generando. Podrá descargarlo desde "Mis reportes".')
+            return redirect('reportes:reporte-list')
         
         # Generar nombre del archivo
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"reporte_activos_{timestamp}.pdf"
         
-        
-        # Generar y retornar el PDF
-        return generar_pdf('reportes/reporte_activos.html', context, filename)
+        def construir(destino):
+            # Construir queryset con los mismos filtros que la vista de activos
+            # (el PDF lee una proyección de columnas, sin instancias del modelo)
+            queryset = Activo.objects.all()
+            
+            # Aplicar filtros
+            queryset = filtrar_activos(queryset, request.GET)
+            
+            # Preparar contexto para el template
+            context = {
+                'activos': queryset,
+                'fecha_generacion': formatear_fecha(timezone.localdate()),
+                'filtros_aplicados': ', '.join([f"{k}: {v}" for k, v in filtros.items()]) if filtros else None,
+            }
+            construir_pdf(context, destino)
+        
+        # Un reporte idéntico sobre los mismos datos se sirve desde la caché;
+        # si no está (o se depuró mientras tanto) se genera y se guarda
+        clave = cache_reportes.clave_reporte(ReporteGenerado.TipoReporte.GENERAL, filtros)
+        return cache_reportes.respuesta(request, clave, filename, construir)
         
     except Exception as e:
         messages.error(request, f'Error al generar el reporte: {str(e)}')
         return redirect('activos:activo-list')
 
 
+
+@login_required
+def exportar_activos(request, formato):
+    """
+    Exporta en CSV o JSON Lines los activos filtrados, enviando las filas a
+    medida que se leen de la base de datos
+    """
+    if formato not in FORMATOS:
+        raise Http404('Formato de exportación no soportado')
+
+    queryset = filtrar_activos(Activo.objects.all(), request.GET)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return respuesta_exportacion(queryset, formato, f"activos_{timestamp}")
+
 @login_required
 def generar_nota_entrega(request):
     """
@@ -83,16 +86,21 @@ def generar_nota_entrega(request):
             return redirect('activos:activo-list')
         
         # Obtener los activos seleccionados
-        activos = Activo.objects.select_related(
-            'subcategoria__categoria', 
-            'ubicacion', 
-            'usuario_asignado'
-        ).filter(id__in=activos_ids)
+        activos = Activo.objects.filter(id__in=activos_ids)
         
         # Obtener datos adicionales del formulario
         responsable_entrega = request.POST.get('responsable_entrega', '')
         observaciones = request.POST.get('observaciones', '')
         
+        if request.POST.get('asincrono'):
+            encolar_reporte(ReporteGenerado.TipoReporte.NOTA_ENTREGA, {
+                'activos': [int(pk) for pk in activos_ids],
+                'responsable_entrega': responsable_entrega,
+                'observaciones': observaciones,
+            }, request.user)
+            messages.info(request, 'La nota de entrega se está generando. Podrá descargarla desde "Mis reportes".')
+            return redirect('reportes:reporte-list')
+        
         # Preparar contexto para el template
         context = {
             'activos': activos,
@@ -113,3 +121,60 @@ def generar_nota_entrega(request):
         messages.error(request, f'Error al generar la nota de entrega: {str(e)}')
         return redirect('activos:activo-list')
 
+
+def _reportes_visibles(request):
+    """Los usuarios ven sus propios reportes; el personal ve todos"""
+    queryset = ReporteGenerado.objects.select_related('usuario')
+    if not request.user.is_staff:
+        queryset = queryset.filter(usuario=request.user)
+    return queryset
+
+
+def _estado_json(reporte):
+    return {
+        'id': reporte.pk,
+        'estado': reporte.estado,
+        'estado_display': reporte.get_estado_display(),
+        'terminado': reporte.terminado,
+        'cantidad_activos': reporte.cantidad_activos,
+        'error': reporte.mensaje_error,
+        'url_descarga': (
+            reverse('reportes:reporte-descargar', args=[reporte.pk])
+            if reporte.estado == ReporteGenerado.EstadoReporte.COMPLETADO else None
+        ),
+    }
+
+
+@login_required
+def reporte_list(request):
+    """
+    Lista los reportes generados en segundo plano
+    """
+    reportes = _reportes_visibles(request)[:50]
+    return render(request, 'reportes/reporte_list.html', {'reportes': reportes})
+
+
+@login_required
+def estado_reporte(request, pk):
+    """
+    Retorna en JSON el estado de un reporte (consultado periódicamente por la lista)
+    """
+    reporte = get_object_or_404(_reportes_visibles(request), pk=pk)
+    return JsonResponse(_estado_json(reporte))
+
+
+@login_required
+def descargar_reporte(request, pk):
+    """
+    Descarga el PDF de un reporte completado
+    """
+    reporte = get_object_or_404(
+        _reportes_visibles(request),
+        pk=pk,
+        estado=ReporteGenerado.EstadoReporte.COMPLETADO,
+    )
+    try:
+        archivo = open(ruta_archivo(reporte), 'rb')
+    except FileNotFoundError:
+        raise Http404('El archivo del reporte ya no está disponible')
+    return FileResponse(archivo, as_attachment=True, filename=reporte.archivo_nombre)
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-18 08:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('usuarios', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='usuarioasignado',
+            index=models.Index(fields=['apellidos', 'nombres', 'id'], name='usuarios_us_apellid_e84adf_idx'),
+        ),
+    ]
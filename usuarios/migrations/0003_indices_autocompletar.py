@@ -0,0 +1,30 @@
+# Generated by Django 5.2.7 on 2026-10-18 10:13
+
+import core.indices
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.db import migrations
+
+# Índices de prefijo para el autocompletado (ver core.indices)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('usuarios', '0002_indices_paginacion'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='usuarioasignado',
+            index=core.indices.IndicePrefijo(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('nombres'), name='text_pattern_ops'), name='usuarios_nombres_prefijo'),
+        ),
+        migrations.AddIndex(
+            model_name='usuarioasignado',
+            index=core.indices.IndicePrefijo(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('apellidos'), name='text_pattern_ops'), name='usuarios_apellidos_prefijo'),
+        ),
+        migrations.AddIndex(
+            model_name='usuarioasignado',
+            index=core.indices.IndicePrefijo(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('identificacion'), name='text_pattern_ops'), name='usuarios_identif_prefijo'),
+        ),
+    ]
@@ -1,5 +1,7 @@
 from django.db import models
 
+from core.indices import indice_prefijo
+
 
 class UsuarioAsignado(models.Model):
     """Persona que puede ser asignada a un activo (sin autenticación)"""
@@ -21,6 +23,13 @@ class UsuarioAsignado(models.Model):
         verbose_name = "Usuario Asignado"
         verbose_name_plural = "Usuarios Asignados"
         ordering = ['apellidos', 'nombres']
+        indexes = [
+            models.Index(fields=['apellidos', 'nombres', 'id']),
+            # Autocompletado por prefijo (ver core.indices)
+            indice_prefijo('nombres', 'usuarios_nombres_prefijo'),
+            indice_prefijo('apellidos', 'usuarios_apellidos_prefijo'),
+            indice_prefijo('identificacion', 'usuarios_identif_prefijo'),
+        ]
     
     def __str__(self):
         return f"{self.nombres} {self.apellidos}"
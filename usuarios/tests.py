@@ -1,3 +1,77 @@
+from django.contrib.auth.models import User
 from django.test import TestCase
+from django.urls import reverse
 
-# Create your tests here.
+from core.autocompletar import LIMITE
+from core.testing import PresupuestoConsultasTestCase
+
+from .models import UsuarioAsignado
+
+
+class PresupuestoConsultasTests(PresupuestoConsultasTestCase):
+    """Máximo de consultas SQL de cada vista de usuarios (ver core.testing)"""
+
+    def test_buscador(self):
+        url = reverse('usuarios:usuario-search')
+        self.assertPresupuesto(url, 4)
+        self.assertPresupuesto(url + '?buscar=usuario', 4)
+        self.assertPresupuesto(url + '?paginacion=cursor', 4)
+
+    def test_usuario(self):
+        pk = self.usuario.pk
+        self.assertPresupuesto(reverse('usuarios:usuario-profile', args=[pk]), 4)
+        self.assertPresupuesto(reverse('usuarios:usuario-create'), 2)
+        self.assertPresupuesto(reverse('usuarios:usuario-update', args=[pk]), 3)
+        self.assertPresupuesto(reverse('usuarios:usuario-delete', args=[pk]), 3)
+        self.assertPresupuesto(reverse('usuarios:usuario-autocompletar') + '?q=usu', 3)
+
+
+class AutocompletarUsuariosTests(TestCase):
+    """Endpoint JSON del selector de usuarios (ver core.autocompletar)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'clave')
+        for nombres, apellidos, identificacion in [
+            ('Ana María', 'Pérez', 'V-100'),
+            ('Luis', 'Pérez', 'V-200'),
+            ('Ana', 'Gómez', 'E-300'),
+        ]:
+            UsuarioAsignado.objects.create(nombres=nombres, apellidos=apellidos, identificacion=identificacion)
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def buscar(self, q):
+        response = self.client.get(reverse('usuarios:usuario-autocompletar'), {'q': q})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def textos(self, q):
+        return [r['texto'] for r in self.buscar(q)['resultados']]
+
+    def test_formato(self):
+        usuario = UsuarioAsignado.objects.get(identificacion='E-300')
+        self.assertEqual(self.buscar('gómez'), {
+            'resultados': [{'id': usuario.pk, 'texto': 'Ana Gómez'}],
+            'mas': False,
+        })
+
+    def test_cada_palabra_por_prefijo(self):
+        # Ordenados por apellidos y nombres
+        self.assertEqual(self.textos('ana'), ['Ana Gómez', 'Ana María Pérez'])
+        self.assertEqual(self.textos('ana pér'), ['Ana María Pérez'])
+        self.assertEqual(self.textos('v-'), ['Ana María Pérez', 'Luis Pérez'])
+        self.assertEqual(self.textos('ría'), [])
+
+    def test_limite(self):
+        UsuarioAsignado.objects.bulk_create([
+            UsuarioAsignado(nombres='Usuario', apellidos=f'{i:02d}', identificacion=f'U-{i}')
+            for i in range(LIMITE)
+        ])
+        datos = self.buscar('usuario')
+        self.assertEqual(len(datos['resultados']), LIMITE)
+        self.assertFalse(datos['mas'])
+        datos = self.buscar('')
+        self.assertEqual(len(datos['resultados']), LIMITE)
+        self.assertTrue(datos['mas'])
@@ -14,4 +14,7 @@ urlpatterns = [
     path('crear/', views.UsuarioCreateView.as_view(), name='usuario-create'),
     path('<int:pk>/editar/', views.UsuarioUpdateView.as_view(), name='usuario-update'),
     path('<int:pk>/eliminar/', views.UsuarioDeleteView.as_view(), name='usuario-delete'),
+    
+    # Autocompletado para los formularios de activos
+    path('autocompletar/', views.autocompletar_usuarios, name='usuario-autocompletar'),
 ]
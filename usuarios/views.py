@@ -4,22 +4,29 @@ from django.views.generic import (
     ListView, DetailView, CreateView, UpdateView, DeleteView
 )
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.db.models import Q
+from django.db.models import Count, Q
 from django.http import JsonResponse
 from .models import UsuarioAsignado
 from .forms import UsuarioForm
+from core.autocompletar import respuesta_autocompletar, terminos
+from core.paginacion import CursorPaginationMixin
 
 
-class UsuarioSearchView(ListView):
+class UsuarioSearchView(CursorPaginationMixin, ListView):
     """Vista principal con buscador de usuarios"""
     model = UsuarioAsignado
     template_name = 'usuarios/usuario_search.html'
     context_object_name = 'usuarios'
     paginate_by = 10
+    cursor_ordering = ['apellidos', 'nombres', 'id']
     
     def get_queryset(self):
-        queryset = super().get_queryset().filter(activo=True)
+        # Con GROUP BY Django no aplica el orden del Meta
+        queryset = super().get_queryset().filter(activo=True).annotate(
+            total_activos=Count('activos')
+        ).order_by('apellidos', 'nombres')
         buscar = self.request.GET.get('buscar')
         
         if buscar:
@@ -45,13 +52,9 @@ class UsuarioProfileView(DetailView):
     template_name = 'usuarios/usuario_profile.html'
     context_object_name = 'usuario'
     
-    def get_queryset(self):
-        return super().get_queryset().prefetch_related('activos__subcategoria__categoria', 'activos__ubicacion')
-    
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        usuario = self.get_object()
-        context['activos_asignados'] = usuario.activos.all().select_related(
+        context['activos_asignados'] = self.object.activos.select_related(
             'subcategoria__categoria', 'ubicacion'
         )
         return context
@@ -87,6 +90,9 @@ class UsuarioDeleteView(DeleteView):
     template_name = 'usuarios/usuario_confirm_delete.html'
     success_url = reverse_lazy('usuarios:usuario-search')
     
+    def get_queryset(self):
+        return super().get_queryset().annotate(total_activos=Count('activos'))
+    
     def delete(self, request, *args, **kwargs):
         self.object = self.get_object()
         
@@ -97,3 +103,16 @@ class UsuarioDeleteView(DeleteView):
         
         messages.success(self.request, 'Usuario eliminado exitosamente.')
         return super().delete(request, *args, **kwargs)
+
+
+@login_required
+def autocompletar_usuarios(request):
+    """Usuarios cuyo nombre, apellido o identificación empieza por cada palabra buscada (JSON)"""
+    queryset = UsuarioAsignado.objects.only('nombres', 'apellidos').order_by('apellidos', 'nombres', 'id')
+    for termino in terminos(request):
+        queryset = queryset.filter(
+            Q(nombres__istartswith=termino) |
+            Q(apellidos__istartswith=termino) |
+            Q(identificacion__istartswith=termino)
+        )
+    return respuesta_autocompletar(queryset)